@@ -1,822 +1,2912 @@
-import pandas as pd
-import csv
-import os
-import json
-import hashlib
-from datetime import date, datetime, timedelta
-
-# --- 1. CONFIGURACIÓN Y CONSTANTES DEL SISTEMA ---
-
-ARCHIVO_CSV = "AutoRegister.csv"
-ID_COUNTER_FILE = "id_counter.txt"
-ESTADO_INICIAL_NOTA = "N/A" # Marca para notas no publicadas
-
-# Definición del esquema de columnas (Usado para inicializar DataFrames vacíos)
-COLUMNS = [
-    'ID_REGISTRO', 'estudiante_ID', 'profesor_ID', 'periodo', 
-    'fecha_publicacion', 'estado_publicacion', 'estado_revision', 
-    'P_NOTA_FINAL', 'P_METODO_ENS', 'P_DETALLES_JSON', 
-    'promedio_general'
-]
-
-# Constantes del Ministerio de Educación Dominicano (MINERD)
-PERIODOS_DIAS_LECTIVOS = 45 # Usado para calcular la fecha de vencimiento del periodo.
-
-# Definición de pesos ponderados (debe sumar 1.0 o 100%)
-PESOS_CALIFICACION = {
-    'Participacion': 0.18,   # 18%
-    'Cuaderno': 0.135,        # 13.5%
-    'Practica': 0.18,        # 18%
-    'Exposicion': 0.18,      # 18%
-    'prueba_mensual': 0.225,  # 22.5%
-    'asistencia': 0.10,      # 10%
-}
-CALIFICACION_CAMPOS = list(PESOS_CALIFICACION.keys())
-
-# Escala de calificación estándar (Asumida por solicitud del usuario)
-ESCALA_CALIFICACION = {
-    93: 'A', 90: 'A-',
-    87: 'B+', 83: 'B', 80: 'B-',
-    77: 'C+', 73: 'C', 70: 'C-',
-    60: 'D',
-    0: 'F'
-}
-
-# Definición de roles y permisos
-ROLES = {
-    'DIRECTOR': 'Director/a',
-    'REGISTRO': 'Encargada de Registro',
-    'ADMIN': 'Administración',
-    'PROFESOR': 'Profesor/a',
-    'ESTUDIANTE': 'Estudiante'
-}
-
-PERMISOS_ROLES = {
-    # Permisos: 'llenar_notas', 'publicar_notas', 'modificar_publicada', 'administrar_usuarios', 'anular_alerta'
-    ROLES['DIRECTOR']: {'ver_todo': True, 'llenar_notas': True, 'publicar_notas': True, 'modificar_publicada': True, 'administrar_usuarios': True, 'anular_alerta': True, 'suspender_expulsar': True, 'modificar_post_7d': False},
-    ROLES['REGISTRO']: {'ver_todo': True, 'llenar_notas': False, 'publicar_notas': False, 'modificar_publicada': True, 'administrar_usuarios': False, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
-    ROLES['ADMIN']: {'ver_todo': True, 'llenar_notas': False, 'publicar_notas': False, 'modificar_publicada': False, 'administrar_usuarios': True, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
-    ROLES['PROFESOR']: {'ver_todo': True, 'llenar_notas': True, 'publicar_notas': True, 'modificar_publicada': False, 'administrar_usuarios': False, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
-    ROLES['ESTUDIANTE']: {'ver_todo': False, 'llenar_notas': False, 'publicar_notas': False, 'modificar_publicada': False, 'administrar_usuarios': False, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
-}
-
-# Datos de Usuario Mock para probar la jerarquía (ID: Rol)
-USUARIOS_MOCK = {
-    '0': ROLES['DIRECTOR'],    # Directora (ID 0)
-    '1': ROLES['REGISTRO'],    # Encargada de Registro (ID 1)
-    '2': ROLES['ADMIN'],       # Administración (ID 2)
-    '101': ROLES['PROFESOR'],  # Profesor Juan (ID 101)
-    '102': ROLES['PROFESOR'],  # Profesora María (ID 102)
-    '2001': ROLES['ESTUDIANTE'], # Estudiante A (ID 2001)
-    '2002': ROLES['ESTUDIANTE'], # Estudiante B (ID 2002)
-}
-
-# --- 2. CLASE PARA GESTIÓN DE ID's ---
-
-def get_max_mock_id(users_mock):
-    """Obtiene el ID numérico más alto de los usuarios mock."""
-    max_id = -1
-    for user_id in users_mock.keys():
-        try:
-            # Convertimos a int para comparar. Si no es un número, lo ignoramos.
-            current_id = int(user_id)
-            if current_id > max_id:
-                max_id = current_id
-        except ValueError:
-            continue
-    # Devolvemos el ID más alto. Si no hay, devolvemos -1.
-    return max_id
-
-class GeneradorIDs:
-    """
-    Clase para manejar la generación de IDs numéricos secuenciales
-    para usuarios y IDs alfanuméricos hashed para registros.
-    """
-    def __init__(self, counter_file=ID_COUNTER_FILE, mock_users=USUARIOS_MOCK):
-        self.counter_file = counter_file
-        self.mock_users = mock_users
-        self._initialize_counter()
-
-    def _initialize_counter(self):
-        """
-        Garantiza que el contador persistente comience en un valor 
-        mayor que el ID más alto de los usuarios mock, evitando duplicación.
-        """
-        max_mock_id = get_max_mock_id(self.mock_users)
-        
-        # El valor mínimo seguro para empezar a generar nuevos IDs
-        min_safe_start = max_mock_id
-        
-        # Si el archivo existe, leemos su valor
-        if os.path.exists(self.counter_file):
-            try:
-                with open(self.counter_file, 'r') as f:
-                    last_id_persisted = int(f.read().strip())
-                # Usamos el mayor entre el ID persistido y el ID mock más alto
-                # Esto asegura que si el mock ID es 2002 y el persistido es 100,
-                # comenzaremos en 2002.
-                if last_id_persisted < min_safe_start:
-                    print(f"Advertencia: Contador desfasado ({last_id_persisted}). Reiniciando contador a {min_safe_start} para evitar colisiones.")
-                    self._save_counter(min_safe_start)
-                
-            except (ValueError, IOError):
-                # Si el archivo está corrupto o vacío, lo reiniciamos al valor seguro
-                self._save_counter(min_safe_start)
-        else:
-            # Si el archivo no existe, lo creamos con el valor seguro
-            self._save_counter(min_safe_start)
-
-    def _save_counter(self, value):
-        """Guarda el valor actual del contador en el archivo."""
-        try:
-            with open(self.counter_file, 'w') as f:
-                f.write(str(value))
-        except IOError as e:
-            print(f"Error al escribir en el archivo de contador de IDs: {e}")
-
-    def generar_id_secuencial(self):
-        """Genera un ID numérico secuencial que persiste en un archivo."""
-        current_id = -1
-        try:
-            # 1. Leer el último ID
-            with open(self.counter_file, 'r') as f:
-                current_id = int(f.read().strip())
-        except (FileNotFoundError, ValueError, IOError) as e:
-            # Si hay algún error, significa que la inicialización falló o el archivo
-            # se corrompió, pero como ya se inicializó, esto es un fallback.
-            print(f"Error al leer contador, re-inicializando: {e}")
-            self._initialize_counter()
-            try:
-                 with open(self.counter_file, 'r') as f:
-                    current_id = int(f.read().strip())
-            except Exception:
-                # Caso extremo si todo falla, devolver None.
-                return None
-            
-        new_id = current_id + 1
-        
-        # 2. Guardar el nuevo ID
-        self._save_counter(new_id)
-            
-        return str(new_id)
-
-    @staticmethod
-    def generar_id_registro(data_tuple):
-        """Genera un ID alfanumérico corto (hash) a partir de los datos."""
-        # Unimos los datos clave (ID estudiante, periodo, profesor) en una cadena
-        data_str = "".join(map(str, data_tuple))
-        # Usamos SHA256 y tomamos los primeros 8 caracteres para un ID corto y único
-        return hashlib.sha256(data_str.encode()).hexdigest()[:8]
-
-# Instancia del generador (Ahora se inicializa de forma segura)
-id_manager = GeneradorIDs()
-
-# --- 3. FUNCIONES DE GESTIÓN DE DATOS (CSV/Pandas) ---
-
-def inicializar_csv():
-    """Crea el archivo CSV con los encabezados si no existe."""
-    if not os.path.exists(ARCHIVO_CSV):
-        # Usamos la constante COLUMNS definida globalmente
-        
-        try:
-            # Crear un DataFrame vacío y guardarlo para crear el archivo con encabezados
-            df_vacio = pd.DataFrame(columns=COLUMNS)
-            df_vacio.to_csv(ARCHIVO_CSV, index=False, encoding='utf-8')
-            print(f"Archivo de registro '{ARCHIVO_CSV}' inicializado.")
-        except Exception as e:
-            print(f"Error al inicializar el CSV: {e}")
-
-def cargar_datos():
-    """Carga los datos del CSV a un DataFrame de Pandas."""
-    try:
-        if not os.path.exists(ARCHIVO_CSV):
-            inicializar_csv()
-            # Si se acaba de inicializar, la lectura del CSV debe realizarse
-            
-        df = pd.read_csv(ARCHIVO_CSV, encoding='utf-8')
-        
-        # Validación extra: si el DF está vacío después de la lectura, asegurarse de que tiene las columnas.
-        if df.empty and df.shape[1] < len(COLUMNS):
-             return pd.DataFrame(columns=COLUMNS)
-            
-        # FIX CLAVE: Convertir columnas de ID a string para evitar errores de tipo al filtrar
-        if 'profesor_ID' in df.columns:
-            df['profesor_ID'] = df['profesor_ID'].astype(str)
-        if 'estudiante_ID' in df.columns:
-            df['estudiante_ID'] = df['estudiante_ID'].astype(str)
-            
-        # Llenamos valores nulos de las columnas de notas para evitar errores de tipo
-        df['P_NOTA_FINAL'] = df['P_NOTA_FINAL'].fillna(ESTADO_INICIAL_NOTA)
-        df['promedio_general'] = df['promedio_general'].fillna(ESTADO_INICIAL_NOTA)
-        return df
-        
-    except pd.errors.EmptyDataError:
-        print("El archivo CSV está vacío, se cargará un DataFrame vacío.")
-        # FIX: Devolver un DataFrame vacío pero con las columnas correctas.
-        return pd.DataFrame(columns=COLUMNS)
-        
-    except Exception as e:
-        print(f"Error al cargar los datos: {e}")
-        # FIX: Devolver un DataFrame vacío con las columnas correctas como fallback.
-        return pd.DataFrame(columns=COLUMNS)
-
-def guardar_datos(df):
-    """Guarda el DataFrame en el archivo CSV."""
-    try:
-        df.to_csv(ARCHIVO_CSV, index=False, encoding='utf-8')
-        return True
-    except Exception as e:
-        print(f"Error al guardar los datos: {e}")
-        return False
-
-# --- 4. FUNCIONES DE UTILIDAD Y CÁLCULO ---
-
-def verificar_permiso(user_id, accion):
-    """Verifica si el usuario tiene permiso para realizar una acción."""
-    if user_id not in USUARIOS_MOCK:
-        print("Error: Usuario no encontrado.")
-        return False
-        
-    rol = USUARIOS_MOCK[user_id]
-    
-    if accion in PERMISOS_ROLES[rol]:
-        return PERMISOS_ROLES[rol][accion]
-        
-    return False
-
-def calcular_nota_final(detalles):
-    """Calcula la nota final (0-100) usando los pesos ponderados."""
-    nota_final = 0
-    for campo, peso in PESOS_CALIFICACION.items():
-        try:
-            # Asumimos que los valores en detalles están entre 0 y 100
-            valor = float(detalles.get(campo, 0)) 
-            nota_final += valor * peso
-        except ValueError:
-            # Manejo de error si el valor no es numérico
-            print(f"Advertencia: El valor de '{campo}' no es numérico y se tratará como 0.")
-    return round(nota_final, 2)
-
-def convertir_a_letra(nota):
-    """Convierte la nota numérica a la escala tradicional (A+, A, F, etc.)."""
-    nota = float(nota)
-    for limite, letra in sorted(ESCALA_CALIFICACION.items(), reverse=True):
-        if nota >= limite:
-            return letra
-    return 'F' # Fallback
-
-def check_alerts(df, user_id):
-    """Verifica y muestra alertas de periodos incompletos o vencidos."""
-    rol = USUARIOS_MOCK.get(user_id)
-    
-    # Solo Profesores, Admin, Director, Registro reciben alertas
-    if rol not in [ROLES['PROFESOR'], ROLES['ADMIN'], ROLES['DIRECTOR'], ROLES['REGISTRO']]:
-        return
-        
-    alertas = []
-    
-    # Simulación del periodo actual (en una app real se obtendría del sistema)
-    periodo_actual = 'P1' # Asumimos P1 para el ejemplo
-    
-    # 1. Alerta de campos obligatorios sin llenar (Metodología/Nota)
-    registros_pendientes = df[
-        (df['profesor_ID'] == user_id) & 
-        (df['periodo'] == periodo_actual) &
-        (df['estado_publicacion'] == False) & # En borrador
-        (df['P_METODO_ENS'].isnull())
-    ]
-    
-    if not registros_pendientes.empty:
-        alertas.append(f"¡ALERTA! Tienes {len(registros_pendientes)} calificaciones en borrador para el {periodo_actual} sin el 'Método de Enseñanza' obligatorio. No se podrán publicar.")
-
-    # 2. Alerta de periodo vencido 
-    
-    if rol in [ROLES['DIRECTOR'], ROLES['ADMIN']]:
-        # Para el ejemplo, alertamos si el periodo P1 no está publicado en general
-        if df[(df['periodo'] == 'P1') & (df['estado_publicacion'] == True)].empty:
-            alertas.append("¡ALERTA ADMINISTRATIVA! El Periodo P1 no ha sido publicado. Esto debe corregirse para pasar al siguiente periodo.")
-
-    if alertas:
-        print("\n" + "="*50)
-        print(f"ALERTA DEL SISTEMA - Usuario {rol} ({user_id}):")
-        for a in alertas:
-            print(f"-> {a}")
-        print("="*50 + "\n")
-
-
-# --- 5. LÓGICA DE INTERACCIÓN POR TERMINAL (MENÚS Y FLUJOS) ---
-
-def menu_login():
-    """
-    Menú de inicio de sesión.
-    Permite salir del sistema escribiendo 'X'.
-    """
-    print("\n--- Sistema de Calificaciones Académicas ---")
-    print("Inicie sesión con su ID de usuario o escriba 'X' para salir.")
-    
-    while True:
-        # Convertir a mayúsculas para manejar 'x' o 'X'
-        user_id = input("Ingrese su ID de Usuario: ").strip().upper() 
-        
-        if user_id == 'X':
-            print("Saliendo del sistema.")
-            # Retornar None, None para indicar que se debe romper el bucle principal
-            return None, None 
-            
-        if user_id in USUARIOS_MOCK:
-            rol = USUARIOS_MOCK[user_id]
-            print(f"\nBienvenido/a, {rol} (ID: {user_id}).")
-            return user_id, rol
-        else:
-            print("ID no válido. Intente de nuevo o escriba 'X' para salir.")
-
-def gestionar_calificaciones(df, user_id, periodo='P1'):
-    """
-    Permite al profesor llenar, guardar y publicar calificaciones para múltiples estudiantes.
-    """
-    
-    if not verificar_permiso(user_id, 'llenar_notas'):
-        print("Permiso denegado: No tienes permiso para llenar calificaciones.")
-        return df
-
-    print(f"\n--- GESTIÓN DE CALIFICACIONES - PERIODO {periodo} ---")
-    
-    # Simulación de estudiantes en el curso del profesor (para el ejemplo, todos los estudiantes)
-    estudiantes_ids = [k for k, v in USUARIOS_MOCK.items() if v == ROLES['ESTUDIANTE']]
-    if not estudiantes_ids:
-        print("No hay estudiantes registrados.")
-        return df
-        
-    print(f"Estudiantes a calificar: {', '.join(estudiantes_ids)}")
-    
-    nuevos_registros = []
-    
-    for est_id in estudiantes_ids:
-        
-        # Buscar registro existente (borrador o publicado)
-        # Aseguramos que est_id sea string antes de filtrar por si acaso
-        registro_existente = df[
-            (df['estudiante_ID'] == str(est_id)) & 
-            (df['periodo'] == periodo)
-        ]
-        
-        is_published = False
-        
-        if not registro_existente.empty:
-            record = registro_existente.iloc[0]
-            is_published = record['estado_publicacion']
-            
-            # Bloquear si ya está publicado y el usuario no es Director/Registro
-            if is_published and not verificar_permiso(user_id, 'modificar_publicada'):
-                print(f"-> Estudiante {est_id}: Calificación de {periodo} YA PUBLICADA y bloqueada para usted.")
-                continue
-
-            print(f"\n[EDITANDO] Calificación existente para Estudiante {est_id}.")
-            # Se asegura que la columna 'P_DETALLES_JSON' contenga un string JSON válido o un diccionario vacío
-            detalles_json_str = record['P_DETALLES_JSON']
-            if isinstance(detalles_json_str, str):
-                try:
-                    detalles_previos = json.loads(detalles_json_str)
-                except json.JSONDecodeError:
-                    detalles_previos = {}
-            else:
-                detalles_previos = {}
-                
-            metodo_previo = record['P_METODO_ENS']
-        else:
-            print(f"\n[NUEVO] Llenando calificación para Estudiante {est_id}.")
-            detalles_previos = {}
-            metodo_previo = ""
-
-
-        # Llenado de campos de calificación
-        detalles_notas = {}
-        for campo in CALIFICACION_CAMPOS:
-            prompt = f"Ingrese nota para '{campo}' ({int(PESOS_CALIFICACION[campo]*100)}%): "
-            while True:
-                try:
-                    # Usar valor previo si existe
-                    valor_defecto = detalles_previos.get(campo, 0)
-                    nota_input = input(f"{prompt} (Actual: {valor_defecto}): ") or str(valor_defecto)
-                    nota = float(nota_input)
-                    if 0 <= nota <= 100:
-                        detalles_notas[campo] = nota
-                        break
-                    else:
-                        print("La nota debe estar entre 0 y 100.")
-                except ValueError:
-                    print("Entrada no válida. Ingrese un número.")
-
-        # Llenado del Método de Enseñanza (Obligatorio)
-        metodo_ens = input(f"Método de Enseñanza (OBLIGATORIO) (Actual: {metodo_previo}): ") or metodo_previo
-        if not metodo_ens:
-            print("ADVERTENCIA: El campo 'Método de Enseñanza' es obligatorio para la publicación.")
-            
-        # Cálculo y Preparación del Registro
-        nota_final = calcular_nota_final(detalles_notas)
-        
-        nuevo_registro = {
-            'estudiante_ID': est_id,
-            'profesor_ID': user_id,
-            'periodo': periodo,
-            'fecha_publicacion': ESTADO_INICIAL_NOTA, # Pendiente
-            'estado_publicacion': False,
-            'estado_revision': 'N/A',
-            'P_NOTA_FINAL': nota_final,
-            'P_METODO_ENS': metodo_ens,
-            'P_DETALLES_JSON': json.dumps(detalles_notas), # Almacenar como JSON String
-            'promedio_general': ESTADO_INICIAL_NOTA # Se calcula al final
-        }
-        
-        if registro_existente.empty:
-            # Nuevo registro: Generar nuevo ID de registro
-            nuevo_registro['ID_REGISTRO'] = id_manager.generar_id_registro((est_id, periodo, user_id, datetime.now()))
-            nuevos_registros.append(nuevo_registro)
-        else:
-            # Actualizar registro existente (inplace en el DataFrame)
-            idx = registro_existente.index[0]
-            for key, val in nuevo_registro.items():
-                df.at[idx, key] = val
-
-    # Agregar nuevos registros al DataFrame principal
-    if nuevos_registros:
-        df_nuevos = pd.DataFrame(nuevos_registros)
-        df = pd.concat([df, df_nuevos], ignore_index=True)
-    
-    print("\n--- RESUMEN DE CAMBIOS ---")
-    # El DF actualizado ya tiene profesor_ID como string, el filtro es seguro.
-    print(df[df['profesor_ID'] == user_id].tail(len(estudiantes_ids))[['estudiante_ID', 'periodo', 'P_NOTA_FINAL', 'P_METODO_ENS', 'estado_publicacion']])
-    
-    # Pregunta de Publicación
-    confirmacion = input("\n¿Desea PUBLICAR las calificaciones de este periodo ahora? (Escriba 'si' para publicar): ").strip().lower()
-    if confirmacion == 'si' and verificar_permiso(user_id, 'publicar_notas'):
-        # Aplicar publicación a todos los registros no publicados del profesor para este periodo
-        idx_a_publicar = df[
-            (df['profesor_ID'] == user_id) & 
-            (df['periodo'] == periodo) & 
-            (df['estado_publicacion'] == False) &
-            (df['P_METODO_ENS'].notnull()) # Solo si el campo obligatorio está lleno
-        ].index
-        
-        if idx_a_publicar.empty:
-            print("\nADVERTENCIA: No se publicaron notas. Asegúrese de que el campo 'Método de Enseñanza' esté lleno en todos los registros.")
-        else:
-            df.loc[idx_a_publicar, 'estado_publicacion'] = True
-            df.loc[idx_a_publicar, 'fecha_publicacion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"\n¡ÉXITO! {len(idx_a_publicar)} calificaciones han sido publicadas y BLOQUEADAS para edición por el profesor.")
-            
-    guardar_datos(df)
-    return df
-
-def solicitar_revision(df, user_id, periodo='P1'):
-    """Permite al estudiante 'apelar' una calificación."""
-    
-    registro = df[
-        (df['estudiante_ID'] == user_id) & 
-        (df['periodo'] == periodo) &
-        (df['estado_publicacion'] == True)
-    ]
-    
-    if registro.empty:
-        print("No hay calificaciones publicadas para este periodo que puedas apelar.")
-        return df
-        
-    print(f"\n--- SOLICITUD DE REVISIÓN DE CALIFICACIÓN ({periodo}) ---")
-    
-    idx = registro.index[0]
-    
-    estado = df.at[idx, 'estado_revision']
-    if estado == 'PENDIENTE':
-        print("Tu solicitud de revisión ya está PENDIENTE. Espera la respuesta del profesor.")
-        return df
-        
-    if estado == 'RESUELTA':
-        print("Tu solicitud anterior fue RESUELTA. Si la nota es incorrecta, habla con tu profesor/a.")
-        return df
-
-    comentario = input("Explica brevemente por qué solicitas la revisión de tu nota: ")
-    if not comentario:
-        print("Solicitud cancelada. Se requiere un comentario.")
-        return df
-        
-    df.at[idx, 'estado_revision'] = 'PENDIENTE'
-    # En una app real, aquí se notificaría al profesor asignado
-    print("\n¡Tu solicitud de revisión ha sido enviada! El profesor será notificado.")
-    guardar_datos(df)
-    return df
-
-# --- 6. FLUJOS DE USUARIO ---
-
-def flujo_estudiante(df, user_id):
-    """Menú y flujo para estudiantes."""
-    print("\n--- Menú Estudiante ---")
-    
-    while True:
-        registros = df[df['estudiante_ID'] == user_id]
-        print(f"\nCalificaciones disponibles ({len(registros)} periodos):")
-        
-        # Mostrar resumen de notas
-        if not registros.empty:
-            for _, r in registros.iterrows():
-                if r['estado_publicacion']:
-                    nota_letra = convertir_a_letra(r['P_NOTA_FINAL'])
-                    print(f"[{r['periodo']}] Nota: {r['P_NOTA_FINAL']} ({nota_letra}). Estado: Publicada.")
-                else:
-                    print(f"[{r['periodo']}] Nota: Pendiente de publicación.")
-        else:
-            print("No hay registros de calificación disponibles.")
-
-        print("\nOpciones:")
-        print("[1] Ver Detalles de Calificación (Requiere ID de Registro)")
-        print("[2] Solicitar Revisión (Apelación)")
-        print("[3] Cerrar Sesión")
-        
-        opcion = input("Seleccione una opción: ").strip()
-        
-        if opcion == '1':
-            registro_id = input("Ingrese el ID de Registro para ver detalles: ").strip()
-            reg = df[(df['ID_REGISTRO'] == registro_id) & (df['estudiante_ID'] == user_id)]
-            
-            if reg.empty or not reg.iloc[0]['estado_publicacion']:
-                print("ID de registro no válido o nota no publicada.")
-                continue
-                
-            detalles = json.loads(reg.iloc[0]['P_DETALLES_JSON'])
-            print("\n--- DETALLES DE CALIFICACIÓN ---")
-            for campo, nota in detalles.items():
-                peso = PESOS_CALIFICACION.get(campo, 0) * 100
-                print(f"- {campo} ({peso:.1f}%): {nota}")
-            print(f"-> NOTA FINAL PERIODO: {reg.iloc[0]['P_NOTA_FINAL']}")
-            print(f"-> NOTA TRADICIONAL: {convertir_a_letra(reg.iloc[0]['P_NOTA_FINAL'])}")
-            
-        elif opcion == '2':
-            # Asumimos que la apelación es sobre el último periodo
-            global flujo_global_df
-            flujo_global_df = solicitar_revision(df, user_id)
-            
-        elif opcion == '3':
-            break
-        else:
-            print("Opción no válida.")
-
-
-def flujo_profesor(df, user_id):
-    """Menú y flujo para profesores."""
-    # check_alerts ahora es seguro porque df siempre tiene las columnas.
-    check_alerts(df, user_id) 
-    
-    while True:
-        print("\n--- Menú Profesor/a ---")
-        print("[1] Llenar/Editar/Publicar Calificaciones (P1, P2, P3, P4)")
-        print("[2] Revisar Solicitudes de Apelación")
-        print("[3] Ver Resumen de Calificaciones Publicadas")
-        print("[4] Cerrar Sesión")
-        
-        opcion = input("Seleccione una opción: ").strip()
-        
-        if opcion == '1':
-            periodo = input("Ingrese el periodo a gestionar (P1, P2, P3, P4): ").strip().upper()
-            if periodo in ['P1', 'P2', 'P3', 'P4']:
-                global flujo_global_df
-                # La función gestiona y devuelve el DF actualizado
-                flujo_global_df = gestionar_calificaciones(flujo_global_df, user_id, periodo)
-                # Actualizamos la referencia local 'df' para el bucle actual
-                df = flujo_global_df
-            else:
-                print("Periodo no válido.")
-                
-        elif opcion == '2':
-            pendientes = df[
-                (df['profesor_ID'] == user_id) & 
-                (df['estado_revision'] == 'PENDIENTE')
-            ]
-            
-            if pendientes.empty:
-                print("No hay solicitudes de apelación pendientes.")
-                continue
-                
-            print(f"\n--- SOLICITUDES PENDIENTES ({len(pendientes)}) ---")
-            for _, r in pendientes.iterrows():
-                print(f"Estudiante ID: {r['estudiante_ID']}, Periodo: {r['periodo']}, ID Reg: {r['ID_REGISTRO']}")
-            
-            # Opción simple: Resolver todas
-            resolver = input("Resolver todas las solicitudes (s/n)? ").strip().lower()
-            if resolver == 's':
-                flujo_global_df.loc[pendientes.index, 'estado_revision'] = 'RESUELTA'
-                guardar_datos(flujo_global_df)
-                print("Solicitudes resueltas. Debe contactar al estudiante sobre el resultado.")
-            
-        elif opcion == '3':
-            # FIX: Recargar el DataFrame para asegurar que se vean los últimos cambios guardados en el CSV
-            df_actualizado = cargar_datos() 
-            resumen = df_actualizado[df_actualizado['profesor_ID'] == user_id][['estudiante_ID', 'periodo', 'P_NOTA_FINAL', 'estado_publicacion']]
-            print("\n--- RESUMEN DE MIS CALIFICACIONES ---")
-            print(resumen)
-            
-        elif opcion == '4':
-            break
-        else:
-            print("Opción no válida.")
-
-def flujo_admin_registro(df, user_id):
-    """Menú para Administración y Encargada de Registro."""
-    rol = USUARIOS_MOCK[user_id]
-    check_alerts(df, user_id)
-    
-    while True:
-        print(f"\n--- Menú {rol} ---")
-        print("[1] Ver TODAS las Calificaciones")
-        
-        if verificar_permiso(user_id, 'modificar_publicada'):
-            print("[2] Modificar Calificación Publicada (Hasta 7 días)")
-            
-        if verificar_permiso(user_id, 'administrar_usuarios'):
-            print("[3] Administrar Usuarios Comunes (Crear nuevos Profesor/Estudiante)")
-            
-        print("[4] Cerrar Sesión")
-        
-        opcion = input("Seleccione una opción: ").strip()
-        
-        if opcion == '1':
-            # Recargar para el caso de que otro profesor haya publicado
-            df_actualizado = cargar_datos()
-            print("\n--- REGISTRO GENERAL DE CALIFICACIONES ---")
-            print(df_actualizado[['estudiante_ID', 'profesor_ID', 'periodo', 'P_NOTA_FINAL', 'estado_publicacion', 'fecha_publicacion']])
-            
-        elif opcion == '2' and verificar_permiso(user_id, 'modificar_publicada'):
-            reg_id = input("Ingrese el ID de Registro a modificar: ").strip()
-            # El DF ya debe tener los IDs como string gracias a cargar_datos()
-            registro = df[df['ID_REGISTRO'] == reg_id]
-            
-            if registro.empty:
-                print("ID de registro no encontrado.")
-                continue
-                
-            idx = registro.index[0]
-            fecha_pub = registro.iloc[0]['fecha_publicacion']
-            
-            # Regla de los 7 días
-            if fecha_pub != ESTADO_INICIAL_NOTA:
-                fecha_limite = datetime.strptime(fecha_pub, "%Y-%m-%d %H:%M:%S") + timedelta(days=7)
-                if datetime.now() > fecha_limite:
-                    print("ERROR: Han pasado más de 7 días desde la publicación. Ningún usuario puede modificarla.")
-                    continue
-            
-            print(f"Modificando nota publicada. Nota actual: {registro.iloc[0]['P_NOTA_FINAL']}")
-            try:
-                nueva_nota = float(input("Ingrese la NUEVA nota final (0-100): "))
-                if 0 <= nueva_nota <= 100:
-                    df.at[idx, 'P_NOTA_FINAL'] = nueva_nota
-                    # Opcional: limpiar la revisión si se modifica la nota
-                    df.at[idx, 'estado_revision'] = 'RESUELTA' 
-                    guardar_datos(df)
-                    print(f"Nota para {reg_id} modificada exitosamente por {rol}.")
-                else:
-                    print("Nota fuera de rango.")
-            except ValueError:
-                print("Entrada no válida.")
-                
-        elif opcion == '3' and verificar_permiso(user_id, 'administrar_usuarios'):
-            print("\n--- GESTIÓN DE USUARIOS ---")
-            nuevo_rol = input("Rol a crear (Profesor/Estudiante): ").strip().capitalize()
-            if nuevo_rol in ['Profesor', 'Estudiante']:
-                new_id = id_manager.generar_id_secuencial()
-                if new_id is None:
-                    print("Error: No se pudo generar una ID segura.")
-                    continue
-                    
-                # Agregar el nuevo usuario al diccionario MOCK
-                USUARIOS_MOCK[new_id] = ROLES[nuevo_rol.upper()]
-                print(f"Nuevo {nuevo_rol} creado con ID: {new_id} (Garantizado que no se duplica).")
-            else:
-                print("Rol no reconocido.")
-                
-        elif opcion == '4':
-            break
-        else:
-            print("Opción no válida.")
-
-
-def flujo_director(df, user_id):
-    """Menú y flujo para la Directora."""
-    check_alerts(df, user_id)
-    
-    while True:
-        print("\n--- Menú Directora (TODOS LOS PERMISOS) ---")
-        print("[1] Acceso a Gestión de Calificaciones (Profesor)")
-        print("[2] Modificar Calificación Publicada (Incluso después de 7 días)")
-        print("[3] Suspender/Expulsar Usuarios (Mock)")
-        print("[4] Anular Alerta Administrativa (Mock)")
-        print("[5] Ver TODOS los Registros")
-        print("[6] Crear nuevos Profesor/Estudiante") # Opción agregada para consistencia
-        print("[7] Cerrar Sesión")
-        
-        opcion = input("Seleccione una opción: ").strip()
-        
-        if opcion == '1':
-            periodo = input("Ingrese el periodo a gestionar (P1-P4): ").strip().upper()
-            if periodo in ['P1', 'P2', 'P3', 'P4']:
-                # El director puede usar la función de profesor
-                global flujo_global_df
-                flujo_global_df = gestionar_calificaciones(flujo_global_df, user_id, periodo)
-                df = flujo_global_df # Actualizamos referencia local
-            
-        elif opcion == '2':
-            reg_id = input("Ingrese el ID de Registro a modificar: ").strip()
-            registro = df[df['ID_REGISTRO'] == reg_id]
-            
-            if registro.empty:
-                print("ID de registro no encontrado.")
-                continue
-                
-            idx = registro.index[0]
-            print(f"MODIFICACIÓN EXCLUSIVA. Nota actual: {registro.iloc[0]['P_NOTA_FINAL']}")
-            try:
-                nueva_nota = float(input("Ingrese la NUEVA nota final (0-100): "))
-                if 0 <= nueva_nota <= 100:
-                    df.at[idx, 'P_NOTA_FINAL'] = nueva_nota
-                    guardar_datos(df)
-                    print(f"Nota para {reg_id} modificada exitosamente por la Directora.")
-                else:
-                    print("Nota fuera de rango.")
-            except ValueError:
-                print("Entrada no válida.")
-
-        elif opcion == '3':
-            target_id = input("Ingrese el ID de usuario a suspender/expulsar (Mock): ").strip()
-            if target_id in USUARIOS_MOCK and target_id != user_id:
-                print(f"Usuario {target_id} (Rol: {USUARIOS_MOCK[target_id]}) ha sido suspendido (Mock).")
-            else:
-                print("ID no válido o no puedes modificar tu propio ID.")
-                
-        elif opcion == '4':
-            print("Alerta Administrativa ANULADA. El sistema no alertará hasta el próximo reinicio. (Mock)")
-            
-        elif opcion == '5':
-            # Recargar para ver todos los cambios
-            df_actualizado = cargar_datos()
-            print("\n--- REGISTRO GENERAL DE CALIFICACIONES ---")
-            print(df_actualizado)
-        
-        elif opcion == '6':
-            print("\n--- GESTIÓN DE USUARIOS ---")
-            nuevo_rol = input("Rol a crear (Profesor/Estudiante): ").strip().capitalize()
-            if nuevo_rol in ['Profesor', 'Estudiante']:
-                new_id = id_manager.generar_id_secuencial()
-                if new_id is None:
-                    print("Error: No se pudo generar una ID segura.")
-                    continue
-                    
-                USUARIOS_MOCK[new_id] = ROLES[nuevo_rol.upper()]
-                print(f"Nuevo {nuevo_rol} creado con ID: {new_id} (Garantizado que no se duplica).")
-            else:
-                print("Rol no reconocido.")
-            
-        elif opcion == '7':
-            break
-        else:
-            print("Opción no válida.")
-
-
-# --- 7. BUCLE PRINCIPAL Y CONTROL DE ERRORES ---
-
-def main():
-    """Función principal que ejecuta la aplicación."""
-    global flujo_global_df
-    print("Inicializando Sistema...")
-    
-    # 1. Inicialización de datos
-    flujo_global_df = cargar_datos()
-    
-    while True:
-        try:
-            user_id, rol = menu_login()
-            
-            # Si menu_login retorna None, None, el usuario eligió salir.
-            if user_id is None: 
-                break 
-            
-            # Se usa flujo_global_df como la base de datos actual para todos los flujos.
-            if rol == ROLES['ESTUDIANTE']:
-                flujo_estudiante(flujo_global_df, user_id)
-            elif rol == ROLES['PROFESOR']:
-                flujo_profesor(flujo_global_df, user_id)
-            elif rol == ROLES['ADMIN'] or rol == ROLES['REGISTRO']:
-                flujo_admin_registro(flujo_global_df, user_id)
-            elif rol == ROLES['DIRECTOR']:
-                flujo_director(flujo_global_df, user_id)
-            
-            # Este mensaje se muestra solo si el usuario cierra sesión desde un menú de rol
-            print("\nSesión cerrada. Volviendo al menú principal.")
-
-        except Exception as e:
-            # Control de Errores: Captura cualquier error inesperado
-            print("\n" + "="*50)
-            print(f"*** ERROR CRÍTICO DEL PROGRAMA ***")
-            # Mostrar un mensaje más detallado para el desarrollador/usuario avanzado
-            print(f"Se ha producido un error inesperado (Detalles: {e}).")
-            print("El sistema intentará continuar...")
-            print("="*50 + "\n")
-            
-if __name__ == "__main__":
+import csv
+import os
+import sys
+import argparse
+import json
+import hashlib
+import atexit
+import sqlite3
+import io
+import pickle
+import threading
+from importlib.util import find_spec
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from escala_calificacion import EscalaCalificacion, RegistroEscalas
+from importacion_diferida import ModuloDiferido
+from permisos import PermisosCompilados
+import instrumentacion
+from instrumentacion import instrumentar
+
+try:
+    import fcntl # Bloqueo de archivos en Linux/macOS
+except ImportError:
+    fcntl = None
+    import msvcrt # Bloqueo de archivos en Windows
+
+# pandas y numpy se importan en el primer uso: importar este módulo no hace I/O ni carga pandas
+pd = ModuloDiferido('pandas')
+np = ModuloDiferido('numpy')
+
+# --- 1. CONFIGURACIÓN Y CONSTANTES DEL SISTEMA ---
+
+ARCHIVO_CSV = "AutoRegister.csv"
+ID_COUNTER_FILE = "id_counter.txt"
+TAMANO_BLOQUE_IDS = 1000 # IDs que cada proceso reserva de una vez en el contador
+LONGITUD_ID_REGISTRO = 12 # Caracteres hexadecimales de los IDs de registro nuevos (antes 8)
+ESTADO_INICIAL_NOTA = "N/A" # Marca para notas no publicadas
+
+# Journal de cambios: cada guardado parcial agrega solo las filas modificadas
+# al final de este archivo en lugar de reescribir todo el CSV.
+# Cada lote va precedido por una línea '#<bytes>' con su largo: un lote cortado a mitad de
+# escritura se reconoce aunque un campo entre comillas tenga saltos de línea.
+SUFIJO_JOURNAL = ".journal.csv"
+MARCA_LOTE_JOURNAL = b'#'
+LIMITE_FILAS_JOURNAL = 500 # Al superar este número de filas se compacta en el CSV base
+
+# Snapshot binario del CSV base ya interpretado: un inicio en frío lo lee en lugar de volver a
+# parsear el texto. 'auto' usa Feather si pyarrow está instalado y si no pickle; 'no' lo desactiva.
+FORMATO_SNAPSHOT = os.environ.get('AUTOREGISTER_SNAPSHOT', 'auto').lower()
+VERSION_ESQUEMA_SNAPSHOT = 1 # Subirla cuando cambie lo que guarda el snapshot (se reconstruye solo)
+SUFIJO_SNAPSHOT = ".snapshot"
+EXTENSIONES_SNAPSHOT = {'feather': '.feather', 'parquet': '.parquet', 'pickle': '.pkl'}
+
+# Caché de tablas de solo consulta (cargar_datos(sincronizar=False)); 0 la desactiva
+LIMITE_MEMORIA_CACHE_MB = int(os.environ.get('AUTOREGISTER_CACHE_MB', 256))
+
+# Escritura diferida: los guardados de los menús se juntan durante este intervalo y se
+# escriben en segundo plano (0 = escribir en el momento)
+INTERVALO_ESCRITURA_S = float(os.environ.get('AUTOREGISTER_INTERVALO_ESCRITURA', 2.0))
+
+# Vistas paginadas de registros: filas por página y filas del CSV que se leen a la vez
+TAMANO_PAGINA = 50
+FILAS_POR_BLOQUE = 50_000
+
+# Backend de almacenamiento: 'csv' (por defecto) o 'sqlite' (base de datos con índices)
+BACKEND_ALMACENAMIENTO = os.environ.get('AUTOREGISTER_BACKEND', 'csv').lower()
+ARCHIVO_SQLITE = "AutoRegister.db"
+# Textos que pandas interpreta como vacíos al leer el CSV; SQLite los guarda como NULL
+VALORES_NULOS = {'', 'N/A', 'NA', 'n/a', 'NaN', 'nan', 'None', 'NULL', 'null'}
+
+# Constantes del Ministerio de Educación Dominicano (MINERD)
+PERIODOS_DIAS_LECTIVOS = 45 # Usado para calcular la fecha de vencimiento del periodo.
+PERIODOS = ['P1', 'P2', 'P3', 'P4'] # En orden: un periodo avanza cuando el anterior está publicado
+
+# Definición de pesos ponderados (debe sumar 1.0 o 100%)
+PESOS_CALIFICACION = {
+    'Participacion': 0.18,   # 18%
+    'Cuaderno': 0.135,        # 13.5%
+    'Practica': 0.18,        # 18%
+    'Exposicion': 0.18,      # 18%
+    'prueba_mensual': 0.225,  # 22.5%
+    'asistencia': 0.10,      # 10%
+}
+CALIFICACION_CAMPOS = list(PESOS_CALIFICACION.keys())
+
+# Una columna numérica por campo de calificación (reemplaza al antiguo texto JSON 'P_DETALLES_JSON')
+COLUMNAS_CAMPOS = {campo: f'P_{campo}' for campo in CALIFICACION_CAMPOS}
+
+# Definición del esquema de columnas (Usado para inicializar DataFrames vacíos)
+COLUMNS = [
+    'ID_REGISTRO', 'estudiante_ID', 'profesor_ID', 'periodo', 
+    'fecha_publicacion', 'estado_publicacion', 'estado_revision', 
+    'P_NOTA_FINAL', 'P_METODO_ENS', *COLUMNAS_CAMPOS.values(),
+    'promedio_general',
+    'version_escala', # Versión de la escala de letras con la que se publicó la nota
+    'version' # Se incrementa en cada guardado de la fila (control de concurrencia entre terminales)
+]
+
+# Tipos del DataFrame de trabajo (los aplica _normalizar_tipos; las escrituras usan asignar_valores):
+# - categóricas: pocos valores distintos que se repiten en muchas filas (se guardan como códigos)
+# - notas: float con NaN para las que faltan (en lugar del texto ESTADO_INICIAL_NOTA)
+# - fecha_publicacion: datetime64 (NaT si no está publicada); estado_publicacion: bool
+COLUMNAS_CATEGORICAS = ['estudiante_ID', 'profesor_ID', 'periodo', 'estado_revision', 'P_METODO_ENS', 'version_escala']
+ESTADOS_REVISION = [ESTADO_INICIAL_NOTA, 'PENDIENTE', 'RESUELTA']
+COLUMNAS_NOTAS = ['P_NOTA_FINAL', 'promedio_general', *COLUMNAS_CAMPOS.values()]
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+# Escala de calificación estándar (Asumida por solicitud del usuario)
+ESCALA_CALIFICACION = {
+    93: 'A', 90: 'A-',
+    87: 'B+', 83: 'B', 80: 'B-',
+    77: 'C+', 73: 'C', 70: 'C-',
+    60: 'D',
+    0: 'F'
+}
+
+# Escalas compiladas y versionadas. Para cambiar la escala se registra una versión nueva:
+# las notas ya publicadas conservan la versión guardada en 'version_escala'.
+ESCALAS = RegistroEscalas()
+ESCALAS.registrar('1', EscalaCalificacion(ESCALA_CALIFICACION, letra_debajo='F'))
+
+# Definición de roles y permisos
+ROLES = {
+    'DIRECTOR': 'Director/a',
+    'REGISTRO': 'Encargada de Registro',
+    'ADMIN': 'Administración',
+    'PROFESOR': 'Profesor/a',
+    'ESTUDIANTE': 'Estudiante'
+}
+
+PERMISOS_ROLES = {
+    # Permisos: 'llenar_notas', 'publicar_notas', 'modificar_publicada', 'administrar_usuarios', 'anular_alerta'
+    ROLES['DIRECTOR']: {'ver_todo': True, 'llenar_notas': True, 'publicar_notas': True, 'modificar_publicada': True, 'administrar_usuarios': True, 'anular_alerta': True, 'suspender_expulsar': True, 'modificar_post_7d': False},
+    ROLES['REGISTRO']: {'ver_todo': True, 'llenar_notas': False, 'publicar_notas': False, 'modificar_publicada': True, 'administrar_usuarios': False, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
+    ROLES['ADMIN']: {'ver_todo': True, 'llenar_notas': False, 'publicar_notas': False, 'modificar_publicada': False, 'administrar_usuarios': True, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
+    ROLES['PROFESOR']: {'ver_todo': True, 'llenar_notas': True, 'publicar_notas': True, 'modificar_publicada': False, 'administrar_usuarios': False, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
+    ROLES['ESTUDIANTE']: {'ver_todo': False, 'llenar_notas': False, 'publicar_notas': False, 'modificar_publicada': False, 'administrar_usuarios': False, 'anular_alerta': False, 'suspender_expulsar': False, 'modificar_post_7d': False},
+}
+# Tabla compilada a máscaras de bits (ver permisos.py); verificar_permiso la consulta en cada operación
+MOTOR_PERMISOS = PermisosCompilados(PERMISOS_ROLES)
+
+# Datos de Usuario Mock para probar la jerarquía (ID: Rol)
+USUARIOS_MOCK = {
+    '0': ROLES['DIRECTOR'],    # Directora (ID 0)
+    '1': ROLES['REGISTRO'],    # Encargada de Registro (ID 1)
+    '2': ROLES['ADMIN'],       # Administración (ID 2)
+    '101': ROLES['PROFESOR'],  # Profesor Juan (ID 101)
+    '102': ROLES['PROFESOR'],  # Profesora María (ID 102)
+    '2001': ROLES['ESTUDIANTE'], # Estudiante A (ID 2001)
+    '2002': ROLES['ESTUDIANTE'], # Estudiante B (ID 2002)
+}
+
+# --- Bloqueo de archivos entre procesos (varias terminales sobre el mismo CSV / contador) ---
+
+_bloqueo_hilos = threading.RLock()
+_bloqueos_activos = {}
+
+def _bloquear(archivo):
+    """Toma el bloqueo exclusivo del archivo (espera si otro proceso lo tiene)."""
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        return
+    archivo.seek(0)
+    while True:
+        try:
+            # En Windows LK_LOCK reintenta durante 10 segundos antes de fallar; seguimos esperando
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+def _desbloquear(archivo):
+    """Libera el bloqueo tomado con _bloquear."""
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def bloqueo_archivo(ruta):
+    """
+    Bloqueo exclusivo entre procesos sobre 'ruta' (usa un archivo '.lock' al lado).
+    Es reentrante dentro del mismo proceso, así las funciones de guardado pueden anidarse.
+    """
+    with _bloqueo_hilos:
+        if ruta in _bloqueos_activos:
+            _bloqueos_activos[ruta] += 1
+            try:
+                yield
+            finally:
+                _bloqueos_activos[ruta] -= 1
+            return
+
+        with open(ruta + '.lock', 'a+b') as archivo_lock:
+            _bloquear(archivo_lock)
+            _bloqueos_activos[ruta] = 1
+            try:
+                yield
+            finally:
+                del _bloqueos_activos[ruta]
+                _desbloquear(archivo_lock)
+
+# --- 2. CLASE PARA GESTIÓN DE ID's ---
+
+def normalizar_id_registro(texto):
+    """
+    Normaliza un ID de registro escrito por el usuario: sin espacios ni guiones y en minúsculas.
+    Así 'A1B2-C3D4-E5F6' y 'a1b2c3d4e5f6' son el mismo ID. Los IDs antiguos de 8 caracteres no cambian.
+    """
+    return texto.strip().replace('-', '').replace(' ', '').lower()
+
+def get_max_mock_id(users_mock):
+    """Obtiene el ID numérico más alto de los usuarios mock."""
+    max_id = -1
+    for user_id in users_mock.keys():
+        try:
+            # Convertimos a int para comparar. Si no es un número, lo ignoramos.
+            current_id = int(user_id)
+            if current_id > max_id:
+                max_id = current_id
+        except ValueError:
+            continue
+    # Devolvemos el ID más alto. Si no hay, devolvemos -1.
+    return max_id
+
+class GeneradorIDs:
+    """
+    Clase para manejar la generación de IDs numéricos secuenciales
+    para usuarios y IDs alfanuméricos hashed para registros.
+
+    Los IDs secuenciales se reservan por bloques: una sola actualización (con bloqueo) del
+    archivo contador cada 'tamano_bloque' IDs, que luego se entregan desde memoria.
+    Así dos procesos nunca entregan el mismo ID, y los que no se usaron se devuelven al salir.
+    """
+    def __init__(self, counter_file=ID_COUNTER_FILE, mock_users=USUARIOS_MOCK, tamano_bloque=TAMANO_BLOQUE_IDS):
+        self.counter_file = counter_file
+        self.mock_users = mock_users
+        self.tamano_bloque = tamano_bloque
+        self.archivo_libres = counter_file + ".libres" # Rangos devueltos por otros procesos
+        self._siguiente = None # Próximo ID del bloque reservado
+        self._limite = None    # Último ID del bloque reservado
+        self._lock = threading.Lock()
+        self._ids_registro = set() # IDs de registro en uso (comprobación de colisiones en O(1))
+        self._inicializado = False # El archivo contador se valida al reservar el primer bloque, no al crear la instancia
+        atexit.register(self.liberar_bloque)
+
+    def _initialize_counter(self):
+        """
+        Garantiza que el contador persistente comience en un valor 
+        mayor que el ID más alto de los usuarios mock, evitando duplicación.
+        """
+        max_mock_id = get_max_mock_id(self.mock_users)
+        
+        # El valor mínimo seguro para empezar a generar nuevos IDs
+        min_safe_start = max_mock_id
+        
+        with bloqueo_archivo(self.counter_file):
+            # Si el archivo existe, leemos su valor
+            if os.path.exists(self.counter_file):
+                try:
+                    last_id_persisted = self._leer_contador()
+                    # Usamos el mayor entre el ID persistido y el ID mock más alto
+                    # Esto asegura que si el mock ID es 2002 y el persistido es 100,
+                    # comenzaremos en 2002.
+                    if last_id_persisted < min_safe_start:
+                        print(f"Advertencia: Contador desfasado ({last_id_persisted}). Reiniciando contador a {min_safe_start} para evitar colisiones.")
+                        self._save_counter(min_safe_start)
+                    
+                except (ValueError, IOError):
+                    # Si el archivo está corrupto o vacío, lo reiniciamos al valor seguro
+                    self._save_counter(min_safe_start)
+            else:
+                # Si el archivo no existe, lo creamos con el valor seguro
+                self._save_counter(min_safe_start)
+
+    def _leer_contador(self):
+        """Devuelve el último ID reservado según el archivo contador."""
+        with open(self.counter_file, 'r') as f:
+            return int(f.read().strip())
+
+    def _save_counter(self, value):
+        """Guarda el valor actual del contador en el archivo (reemplazo atómico)."""
+        try:
+            temporal = self.counter_file + ".tmp"
+            with open(temporal, 'w') as f:
+                f.write(str(value))
+            os.replace(temporal, self.counter_file)
+            return True
+        except IOError as e:
+            print(f"Error al escribir en el archivo de contador de IDs: {e}")
+            return False
+
+    def _leer_libres(self):
+        """Lee los rangos de IDs devueltos ('inicio-fin' por línea)."""
+        rangos = []
+        try:
+            with open(self.archivo_libres, 'r') as f:
+                for linea in f:
+                    try:
+                        inicio, fin = (int(x) for x in linea.strip().split('-'))
+                    except ValueError:
+                        continue # Línea corrupta: esos IDs simplemente no se reutilizan
+                    rangos.append((inicio, fin))
+        except FileNotFoundError:
+            pass
+        return rangos
+
+    def _guardar_libres(self, rangos):
+        """Reescribe el archivo de rangos libres (o lo elimina si ya no queda ninguno)."""
+        if not rangos:
+            if os.path.exists(self.archivo_libres):
+                os.remove(self.archivo_libres)
+            return
+        temporal = self.archivo_libres + ".tmp"
+        with open(temporal, 'w') as f:
+            f.writelines(f"{inicio}-{fin}\n" for inicio, fin in rangos)
+        os.replace(temporal, self.archivo_libres)
+
+    def _reservar_bloque(self):
+        """
+        Reserva el próximo bloque de IDs con una sola operación bloqueada sobre el contador.
+        Primero reutiliza los rangos devueltos por otros procesos. Devuelve False si falla.
+        """
+        with bloqueo_archivo(self.counter_file):
+            if not self._inicializado:
+                self._initialize_counter()
+                self._inicializado = True
+            libres = self._leer_libres()
+            if libres:
+                inicio, fin = libres.pop(0)
+                if fin - inicio + 1 > self.tamano_bloque:
+                    # Rango más grande que un bloque: lo que sobra queda disponible
+                    libres.insert(0, (inicio + self.tamano_bloque, fin))
+                    fin = inicio + self.tamano_bloque - 1
+                self._guardar_libres(libres)
+            else:
+                try:
+                    ultimo = self._leer_contador()
+                except (FileNotFoundError, ValueError, IOError) as e:
+                    # Si hay algún error, significa que la inicialización falló o el archivo
+                    # se corrompió, pero como ya se inicializó, esto es un fallback.
+                    print(f"Error al leer contador, re-inicializando: {e}")
+                    self._initialize_counter()
+                    try:
+                        ultimo = self._leer_contador()
+                    except Exception:
+                        return False
+                inicio, fin = ultimo + 1, ultimo + self.tamano_bloque
+                if not self._save_counter(fin):
+                    return False
+        self._siguiente, self._limite = inicio, fin
+        return True
+
+    def generar_id_secuencial(self):
+        """Genera un ID numérico secuencial único entre procesos (servido desde el bloque reservado)."""
+        with self._lock:
+            if self._siguiente is None or self._siguiente > self._limite:
+                if not self._reservar_bloque():
+                    # Caso extremo si todo falla, devolver None.
+                    return None
+            new_id = self._siguiente
+            self._siguiente += 1
+        return str(new_id)
+
+    def liberar_bloque(self):
+        """
+        Devuelve los IDs reservados que no se usaron (se llama automáticamente al salir).
+        Si nadie reservó después, basta con retroceder el contador; si no, el rango queda
+        anotado en el archivo de libres para el próximo proceso que reserve.
+        """
+        with self._lock:
+            if self._siguiente is None or self._siguiente > self._limite:
+                return
+            inicio, fin = self._siguiente, self._limite
+            self._siguiente = self._limite = None
+
+        try:
+            with bloqueo_archivo(self.counter_file):
+                try:
+                    ultimo = self._leer_contador()
+                except (FileNotFoundError, ValueError, IOError):
+                    ultimo = None
+                if ultimo == fin:
+                    self._save_counter(inicio - 1)
+                else:
+                    self._guardar_libres(self._leer_libres() + [(inicio, fin)])
+        except OSError as e:
+            print(f"No se pudieron devolver los IDs {inicio}-{fin}: {e}")
+
+    def registrar_ids_registro(self, ids):
+        """Agrega IDs de registro existentes (cargados del disco) al conjunto de IDs en uso."""
+        if isinstance(ids, pd.Series):
+            # Misma normalización que normalizar_id_registro, aplicada a la columna completa
+            ids = ids.dropna().astype(str).str.strip().str.replace('-', '', regex=False)
+            self._ids_registro.update(ids.str.replace(' ', '', regex=False).str.lower().tolist())
+            return
+        self._ids_registro.update(normalizar_id_registro(i) for i in ids if isinstance(i, str))
+
+    def existe_id_registro(self, registro_id):
+        """Comprobación O(1) de si un ID de registro ya está en uso."""
+        return normalizar_id_registro(registro_id) in self._ids_registro
+
+    def generar_id_registro(self, data_tuple):
+        """
+        Genera un ID alfanumérico corto (hash) a partir de los datos.
+        Si el ID ya está en uso se vuelve a calcular con un sufijo de reintento,
+        así nunca se entrega un ID repetido dentro del conjunto de IDs conocidos.
+        """
+        # Unimos los datos clave (ID estudiante, periodo, profesor) en una cadena
+        data_str = "".join(map(str, data_tuple))
+        with self._lock:
+            intento = 0
+            while True:
+                sufijo = f"#{intento}" if intento else ""
+                # SHA256 truncado a LONGITUD_ID_REGISTRO caracteres (48 bits con 12)
+                nuevo_id = hashlib.sha256((data_str + sufijo).encode()).hexdigest()[:LONGITUD_ID_REGISTRO]
+                if nuevo_id not in self._ids_registro:
+                    self._ids_registro.add(nuevo_id)
+                    return nuevo_id
+                intento += 1
+
+# Instancia del generador (no toca el archivo contador hasta que se pide el primer ID)
+id_manager = GeneradorIDs()
+
+# --- 3. FUNCIONES DE GESTIÓN DE DATOS (CSV/Pandas) ---
+
+def inicializar_csv():
+    """Crea el archivo CSV con los encabezados si no existe."""
+    if not os.path.exists(ARCHIVO_CSV):
+        # Usamos la constante COLUMNS definida globalmente
+        
+        try:
+            # Crear un DataFrame vacío y guardarlo para crear el archivo con encabezados
+            df_vacio = pd.DataFrame(columns=COLUMNS)
+            df_vacio.to_csv(ARCHIVO_CSV, index=False, encoding='utf-8')
+            print(f"Archivo de registro '{ARCHIVO_CSV}' inicializado.")
+        except Exception as e:
+            print(f"Error al inicializar el CSV: {e}")
+
+def ruta_journal():
+    """Devuelve la ruta del journal de cambios asociado al CSV principal."""
+    base, _ = os.path.splitext(ARCHIVO_CSV)
+    return base + SUFIJO_JOURNAL
+
+# Estado del disco que ya está incorporado en el DataFrame de trabajo de este proceso.
+# Sirve para detectar, al guardar, los cambios que hicieron otras terminales desde entonces.
+_sincronizacion = {'firma_base': None, 'offset_journal': 0, 'filas_journal': 0}
+
+def _firma_archivo(ruta):
+    """Identifica una versión concreta de un archivo (cambia si otro proceso lo reemplaza)."""
+    try:
+        info = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+def _leer_csv(ruta, **kwargs):
+    """Lee un CSV del sistema manteniendo los IDs como texto."""
+    # Forzamos los IDs a string para que un ID de registro como '00123456' no se lea como número.
+    # estado_revision también: 'N/A' se lee como vacío y, mezclado con texto, pandas avisa de tipos mixtos.
+    return pd.read_csv(ruta, encoding='utf-8',
+                       dtype={'ID_REGISTRO': str, 'estudiante_ID': str, 'profesor_ID': str, 'version_escala': str,
+                              'estado_revision': str},
+                       **kwargs)
+
+def formato_snapshot():
+    """Formato del snapshot según FORMATO_SNAPSHOT y las librerías instaladas (None = desactivado)."""
+    if FORMATO_SNAPSHOT == 'auto':
+        return 'feather' if find_spec('pyarrow') is not None else 'pickle'
+    if FORMATO_SNAPSHOT in ('feather', 'parquet') and find_spec('pyarrow') is None:
+        return 'pickle' # Sin pyarrow no hay Feather ni Parquet
+    return FORMATO_SNAPSHOT if FORMATO_SNAPSHOT in EXTENSIONES_SNAPSHOT else None
+
+def rutas_snapshot(formato):
+    """(ruta de los datos, ruta del encabezado JSON) del snapshot del CSV principal."""
+    base = os.path.splitext(ARCHIVO_CSV)[0] + SUFIJO_SNAPSHOT
+    return base + EXTENSIONES_SNAPSHOT[formato], base + '.json'
+
+def _leer_snapshot(firma_csv):
+    """
+    Devuelve el CSV base interpretado desde el snapshot, o None si no hay snapshot vigente.
+    Es vigente si su encabezado tiene la versión de esquema y las columnas actuales, fue hecho
+    para esta misma versión del CSV (firma: inodo, mtime, tamaño) y los datos no son más viejos que el CSV.
+    """
+    formato = formato_snapshot()
+    if formato is None or firma_csv is None:
+        return None
+    ruta_datos, ruta_encabezado = rutas_snapshot(formato)
+    try:
+        with open(ruta_encabezado, 'r', encoding='utf-8') as f:
+            encabezado = json.load(f)
+        vigente = (encabezado.get('version_esquema') == VERSION_ESQUEMA_SNAPSHOT
+                   and encabezado.get('formato') == formato
+                   and tuple(encabezado.get('firma_csv') or ()) == firma_csv
+                   and os.stat(ruta_datos).st_mtime_ns >= firma_csv[1])
+        if not vigente:
+            return None
+        if formato == 'feather':
+            return pd.read_feather(ruta_datos)
+        if formato == 'parquet':
+            return pd.read_parquet(ruta_datos)
+        with open(ruta_datos, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None # Snapshot ausente, incompleto o de otra versión: se vuelve a leer el CSV
+
+def _escribir_snapshot(df, firma_csv):
+    """
+    Guarda el CSV base interpretado (tal como lo devuelve _leer_csv) junto al CSV.
+    Primero se borra el encabezado y se escriben los datos en un temporal: si el programa se
+    corta a mitad, el snapshot queda inválido y la próxima carga lee el CSV.
+    """
+    formato = formato_snapshot()
+    if formato is None or firma_csv is None:
+        return
+    ruta_datos, ruta_encabezado = rutas_snapshot(formato)
+    try:
+        if os.path.exists(ruta_encabezado):
+            os.remove(ruta_encabezado)
+        temporal = ruta_datos + ".tmp"
+        if formato == 'feather':
+            df.reset_index(drop=True).to_feather(temporal)
+        elif formato == 'parquet':
+            df.to_parquet(temporal, index=False)
+        else:
+            with open(temporal, 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta_datos)
+        encabezado = {'version_esquema': VERSION_ESQUEMA_SNAPSHOT, 'formato': formato,
+                      'columnas': list(df.columns), 'firma_csv': list(firma_csv)}
+        with open(ruta_encabezado + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(encabezado, f)
+        os.replace(ruta_encabezado + ".tmp", ruta_encabezado)
+        instrumentacion.sumar('snapshot', bytes_escritos=os.path.getsize(ruta_datos))
+    except Exception as e:
+        # El snapshot es solo una aceleración: si no se puede escribir se sigue usando el CSV
+        print(f"Advertencia: no se pudo escribir el snapshot '{ruta_datos}': {e}")
+
+def _leer_csv_base():
+    """
+    Lee el CSV base (se llama con el bloqueo tomado): desde el snapshot si está vigente y si no
+    parseando el texto, y en ese caso reconstruye el snapshot para el próximo inicio.
+    Devuelve (DataFrame, bytes leídos).
+    """
+    firma = _firma_archivo(ARCHIVO_CSV)
+    df = _leer_snapshot(firma)
+    if df is not None:
+        instrumentacion.sumar('snapshot', llamadas=1)
+        return df, os.path.getsize(rutas_snapshot(formato_snapshot())[0])
+    df = _leer_csv(ARCHIVO_CSV)
+    _escribir_snapshot(df, firma)
+    return df, firma[2] if firma else 0
+
+def _aplicar_journal(df, journal):
+    """
+    Reproduce los cambios del journal sobre el DataFrame base.
+    Cada fila del journal reemplaza a la fila con el mismo ID_REGISTRO (la última gana);
+    los registros nuevos se agregan al final. Se conserva el orden original del CSV base.
+    """
+    if journal.empty:
+        return df
+    combinado = pd.concat([df, journal], ignore_index=True)
+    # Posición de la primera aparición de cada ID: define el orden final de la fila
+    posiciones = pd.Series(range(len(combinado)), index=combinado.index)
+    orden = posiciones.groupby(combinado['ID_REGISTRO'], sort=False).transform('min')
+    vigentes = ~combinado.duplicated('ID_REGISTRO', keep='last')
+    resultado = combinado[vigentes].assign(_orden=orden[vigentes])
+    resultado = resultado.sort_values('_orden', kind='stable').drop(columns='_orden')
+    return resultado.reset_index(drop=True)
+
+def _leer_journal(desde=0):
+    """
+    Lee el journal de cambios a partir del byte 'desde'.
+    Devuelve (DataFrame, byte hasta el que se leyó). Solo se leen lotes completos (ver
+    MARCA_LOTE_JOURNAL): un lote truncado (corte de luz a mitad de escritura) no rompe la carga.
+    """
+    vacio = pd.DataFrame(columns=COLUMNS)
+    try:
+        with open(ruta_journal(), 'rb') as f:
+            encabezado = f.readline()
+            inicio = max(desde, len(encabezado))
+            f.seek(inicio)
+            contenido = f.read()
+    except FileNotFoundError:
+        return vacio, 0
+    if not encabezado.endswith(b'\n'):
+        return vacio, 0
+
+    if contenido and not contenido.startswith(MARCA_LOTE_JOURNAL):
+        # Journal del formato anterior (filas sin lotes): hasta la última línea completa
+        fin = contenido.rfind(b'\n') + 1
+        cuerpos = [contenido[:fin]]
+    else:
+        cuerpos, fin = _lotes_completos(contenido)
+    if fin == 0:
+        return vacio, inicio
+    try:
+        datos = _leer_csv(io.BytesIO(encabezado + b''.join(cuerpos)), on_bad_lines='skip')
+    except pd.errors.EmptyDataError:
+        datos = vacio
+    return datos, inicio + fin
+
+def _lotes_completos(contenido):
+    """(filas CSV de cada lote completo, bytes que ocupan esos lotes desde el inicio de 'contenido')."""
+    cuerpos, posicion = [], 0
+    while contenido.startswith(MARCA_LOTE_JOURNAL, posicion):
+        fin_marca = contenido.find(b'\n', posicion)
+        largo = contenido[posicion + len(MARCA_LOTE_JOURNAL):fin_marca]
+        if fin_marca < 0 or not largo.isdigit():
+            break
+        fin = fin_marca + 1 + int(largo)
+        if fin > len(contenido):
+            break # El último lote quedó a medio escribir
+        cuerpos.append(contenido[fin_marca + 1:fin])
+        posicion = fin
+    return cuerpos, posicion
+
+def _journal_formato_anterior():
+    """True si el journal tiene filas sin la marca de lote (lo escribió una versión anterior)."""
+    try:
+        with open(ruta_journal(), 'rb') as f:
+            f.readline()
+            inicio = f.read(len(MARCA_LOTE_JOURNAL))
+    except FileNotFoundError:
+        return False
+    return bool(inicio) and inicio != MARCA_LOTE_JOURNAL
+
+def _normalizar_tipos(df):
+    """
+    Aplica el esquema de tipos común a todos los backends de almacenamiento (ver COLUMNAS_CATEGORICAS).
+    Modifica df y lo devuelve; las columnas que ya tienen el tipo correcto no se tocan.
+    """
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna not in df.columns:
+            continue
+        serie = df[columna]
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            if columna in ('estudiante_ID', 'profesor_ID'):
+                serie = serie.astype(str) # Los IDs se comparan siempre como texto
+            elif columna == 'estado_revision':
+                serie = serie.fillna(ESTADO_INICIAL_NOTA)
+            serie = serie.astype('category')
+        df[columna] = serie
+        # Los valores conocidos siempre son categorías: escribirlos no obliga a agregar categorías
+        _agregar_categorias(df, columna, {'periodo': PERIODOS, 'estado_revision': ESTADOS_REVISION}.get(columna, []))
+
+    # Notas como float: NaN donde falta la nota (antes el texto ESTADO_INICIAL_NOTA)
+    for columna in COLUMNAS_NOTAS:
+        if columna in df.columns and df[columna].dtype != float:
+            df[columna] = pd.to_numeric(df[columna], errors='coerce').astype(float)
+
+    # Solo un True real cuenta como publicada (igual que las comparaciones == True de siempre)
+    if 'estado_publicacion' in df.columns and df['estado_publicacion'].dtype != bool:
+        df['estado_publicacion'] = (df['estado_publicacion'] == True).astype(bool)
+    if 'fecha_publicacion' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['fecha_publicacion']):
+        df['fecha_publicacion'] = pd.to_datetime(df['fecha_publicacion'], errors='coerce', format='ISO8601')
+    if 'version' in df.columns and df['version'].dtype != int:
+        df['version'] = pd.to_numeric(df['version'], errors='coerce').fillna(0).astype(int)
+    return df
+
+def _agregar_categorias(df, columna, valores):
+    """
+    Agrega a la columna categórica de df las categorías de 'valores' que todavía no tiene.
+    Las categorías se mantienen ordenadas como texto: ordenar por la columna (sort_values,
+    searchsorted en boletines.py) da el mismo orden que cuando los valores eran texto.
+    """
+    categorias = df[columna].cat.categories
+    nuevas = pd.Index(pd.Series(valores, dtype=object).dropna().unique()).difference(categorias)
+    if len(nuevas):
+        df[columna] = df[columna].cat.set_categories(sorted([*categorias, *nuevas], key=str))
+
+def asignar_valores(df, filas, columna, valores):
+    """
+    df.loc[filas, columna] = valores respetando el esquema de tipos: en las columnas categóricas
+    agrega antes las categorías nuevas, y en notas y fechas convierte los textos (ESTADO_INICIAL_NOTA
+    pasa a NaN / NaT). Todas las escrituras al DataFrame de trabajo deben pasar por aquí.
+    """
+    if columna in COLUMNAS_NOTAS:
+        valores = pd.to_numeric(valores, errors='coerce')
+    elif columna == 'fecha_publicacion':
+        valores = pd.to_datetime(valores, errors='coerce', format='ISO8601')
+    elif isinstance(df[columna].dtype, pd.CategoricalDtype):
+        _agregar_categorias(df, columna, [valores] if pd.api.types.is_scalar(valores) else valores)
+    df.loc[filas, columna] = valores
+
+def concatenar_registros(df, nuevos):
+    """pd.concat de filas nuevas al final de df conservando el esquema de tipos (y las categorías)."""
+    nuevos = _normalizar_tipos(_completar_columnas(nuevos.copy()))
+    for columna in COLUMNAS_CATEGORICAS:
+        if isinstance(df[columna].dtype, pd.CategoricalDtype):
+            _agregar_categorias(df, columna, nuevos[columna])
+            nuevos[columna] = nuevos[columna].astype(df[columna].dtype)
+    return _normalizar_tipos(pd.concat([df, nuevos[df.columns]], ignore_index=True))
+
+def ahora_publicacion():
+    """Fecha y hora de publicación para la columna fecha_publicacion (al segundo, como se guarda en el archivo)."""
+    return pd.Timestamp(datetime.now().replace(microsecond=0))
+
+def _completar_columnas(df):
+    """Agrega vacías las columnas de COLUMNS que no existían en archivos de versiones anteriores."""
+    for columna in COLUMNS:
+        if columna not in df.columns:
+            df[columna] = 0 if columna == 'version' else np.nan
+    return df
+
+def _migrar_detalles_json(df):
+    """
+    Convierte archivos del formato antiguo (notas de cada campo en el texto 'P_DETALLES_JSON')
+    al formato con una columna numérica por campo. Devuelve (df, True) si hubo que migrar.
+    """
+    if 'P_DETALLES_JSON' not in df.columns:
+        return df, False
+
+    df = df.reindex(columns=list(dict.fromkeys([*df.columns, *COLUMNAS_CAMPOS.values()])))
+    # Solo las filas que todavía no tienen los campos en columnas (las del formato antiguo)
+    sin_columnas = df[list(COLUMNAS_CAMPOS.values())].isna().all(axis=1) & df['P_DETALLES_JSON'].notna()
+    for idx, texto in df.loc[sin_columnas, 'P_DETALLES_JSON'].items():
+        try:
+            detalles = json.loads(texto)
+        except (TypeError, json.JSONDecodeError):
+            print(f"Advertencia: detalles ilegibles en el registro {df.at[idx, 'ID_REGISTRO']}; se dejan vacíos.")
+            continue
+        for campo, columna in COLUMNAS_CAMPOS.items():
+            if campo in detalles:
+                df.at[idx, columna] = detalles[campo]
+    return df.drop(columns='P_DETALLES_JSON').reindex(columns=COLUMNS), True
+
+def detalles_de_registro(registro):
+    """Devuelve {campo: nota} de una fila, omitiendo los campos que no se llenaron."""
+    return {campo: registro[columna] for campo, columna in COLUMNAS_CAMPOS.items()
+            if columna in registro and pd.notna(registro[columna])}
+
+def _cargar_csv(sincronizar=True):
+    """
+    Lee el CSV base y reproduce el journal de cambios (backend por defecto).
+    Con 'sincronizar' el resultado pasa a ser el DataFrame de trabajo del proceso:
+    se recuerda hasta dónde se leyó el disco para detectar luego cambios de otros procesos.
+    """
+    if not os.path.exists(ARCHIVO_CSV):
+        inicializar_csv()
+        # Si se acaba de inicializar, la lectura del CSV debe realizarse
+
+    with bloqueo_archivo(ARCHIVO_CSV):
+        # Snapshot binario si está vigente; si no, el texto del CSV
+        df, bytes_base = _leer_csv_base()
+
+        # Reproducir el journal de cambios pendientes sobre el archivo base
+        journal, offset = _leer_journal()
+        instrumentacion.sumar('cargar_datos', bytes_leidos=bytes_base + offset)
+        df = _completar_columnas(_aplicar_journal(df, journal))
+
+        # Migración transparente: un archivo del formato antiguo se reescribe una sola vez
+        df, migrado = _migrar_detalles_json(df)
+        if migrado:
+            compactar_journal(df)
+            print(f"Archivo '{ARCHIVO_CSV}' migrado al formato con una columna por campo de calificación.")
+        elif _journal_formato_anterior():
+            compactar_journal(df) # Los lotes nuevos no se agregan detrás de filas sin marca
+        elif sincronizar:
+            _sincronizacion.update(firma_base=_firma_archivo(ARCHIVO_CSV), offset_journal=offset, filas_journal=len(journal))
+    return df
+
+class CacheTablas:
+    """
+    Caché de los DataFrames de solo consulta, por archivo. Cada entrada se valida con la firma
+    (inodo, mtime, tamaño) del CSV base y del journal: si ninguno cambió, la tabla se devuelve
+    sin volver a leer el disco. guardar_datos la invalida explícitamente, y las entradas más
+    antiguas se descartan cuando se supera el límite de memoria.
+    Las tablas devueltas se comparten entre llamadas: no deben modificarse.
+    """
+    FILAS_MUESTRA = 1000 # Filas con las que se estima la memoria de una tabla (medirla completa es lento)
+
+    def __init__(self, limite_mb=LIMITE_MEMORIA_CACHE_MB):
+        self.limite_bytes = limite_mb * 1024 * 1024
+        self._entradas = OrderedDict() # ruta -> (firma, DataFrame, bytes estimados)
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    @staticmethod
+    def firma(ruta):
+        """Firma del CSV base y de su journal (None si el archivo base no existe)."""
+        base = _firma_archivo(ruta)
+        if base is None:
+            return None
+        return base, _firma_archivo(os.path.splitext(ruta)[0] + SUFIJO_JOURNAL)
+
+    @classmethod
+    def _estimar_bytes(cls, df):
+        muestra = df.head(cls.FILAS_MUESTRA)
+        if muestra.empty:
+            return 0
+        # Las columnas categóricas se miden completas (es barato): la muestra ya incluye todas sus
+        # categorías y escalarla las contaría una vez por cada FILAS_MUESTRA filas
+        categoricas = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+        resto = muestra.drop(columns=categoricas).memory_usage(deep=True).sum() * len(df) / len(muestra)
+        return int(resto + df[categoricas].memory_usage(deep=True, index=False).sum())
+
+    def obtener(self, ruta, firma):
+        """Tabla en caché de 'ruta' si sigue vigente para 'firma'; None si hay que leerla."""
+        entrada = self._entradas.get(ruta)
+        if firma is not None and entrada is not None and entrada[0] == firma:
+            self._entradas.move_to_end(ruta)
+            self.aciertos += 1
+            instrumentacion.sumar('cache_tablas.aciertos', llamadas=1)
+            return entrada[1]
+        self.fallos += 1
+        instrumentacion.sumar('cache_tablas.fallos', llamadas=1)
+        return None
+
+    def guardar(self, ruta, firma, df):
+        """Guarda la tabla leída con esa firma, respetando el límite de memoria."""
+        self._entradas.pop(ruta, None)
+        tamano = self._estimar_bytes(df)
+        if firma is None or tamano > self.limite_bytes:
+            return # Una tabla más grande que el límite no se guarda
+        self._entradas[ruta] = (firma, df, tamano)
+        while self.memoria() > self.limite_bytes:
+            self._entradas.popitem(last=False)
+
+    def invalidar(self, ruta=None):
+        """Descarta la tabla de 'ruta' (o todas)."""
+        if ruta is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(ruta, None)
+        self.invalidaciones += 1
+
+    def memoria(self):
+        """Bytes estimados que ocupan las tablas guardadas."""
+        return sum(tamano for _, _, tamano in self._entradas.values())
+
+    def estadisticas(self):
+        return {'aciertos': self.aciertos, 'fallos': self.fallos, 'invalidaciones': self.invalidaciones,
+                'tablas': len(self._entradas), 'memoria_mb': round(self.memoria() / (1024 * 1024), 1)}
+
+cache_tablas = CacheTablas()
+
+@instrumentar(filas='resultado')
+def cargar_datos(sincronizar=True):
+    """
+    Carga los datos del almacenamiento configurado (CSV + journal o SQLite) a un DataFrame.
+    'sincronizar=False' se usa para lecturas de solo consulta que no reemplazan al DataFrame de trabajo:
+    con CSV se sirven desde cache_tablas mientras el archivo no cambie (no deben modificarse).
+    """
+    usar_cache = not sincronizar and BACKEND_ALMACENAMIENTO != 'sqlite' and cache_tablas.limite_bytes > 0
+    try:
+        if usar_cache:
+            # La firma se toma antes de leer: si el archivo cambia durante la lectura, la próxima consulta no coincide
+            firma = cache_tablas.firma(ARCHIVO_CSV)
+            df = cache_tablas.obtener(ARCHIVO_CSV, firma)
+            if df is not None:
+                return df
+
+        if BACKEND_ALMACENAMIENTO == 'sqlite':
+            df = obtener_almacen_sqlite().cargar()
+        else:
+            df = _cargar_csv(sincronizar)
+
+        # Validación extra: si el DF está vacío después de la lectura, asegurarse de que tiene las columnas.
+        if df.empty and df.shape[1] < len(COLUMNS):
+             return pd.DataFrame(columns=COLUMNS)
+
+        df = _normalizar_tipos(df)
+        id_manager.registrar_ids_registro(df['ID_REGISTRO'])
+        if sincronizar:
+            indice_alertas.reconstruir(df)
+            agregado_promedios.reconstruir(df)
+        else:
+            # promedio_general guardado en una fila puede ser de antes de que otra terminal publicara
+            # otra nota de la misma clave (las filas hermanas no se reescriben): se recalcula al leer
+            df['promedio_general'] = calcular_promedios_lote(df)
+            if usar_cache:
+                cache_tablas.guardar(ARCHIVO_CSV, firma, df)
+        return df
+        
+    except pd.errors.EmptyDataError:
+        print("El archivo CSV está vacío, se cargará un DataFrame vacío.")
+        # FIX: Devolver un DataFrame vacío pero con las columnas correctas.
+        return pd.DataFrame(columns=COLUMNS)
+        
+    except Exception as e:
+        print(f"Error al cargar los datos: {e}")
+        # FIX: Devolver un DataFrame vacío con las columnas correctas como fallback.
+        return pd.DataFrame(columns=COLUMNS)
+
+@instrumentar(filas=lambda resultado, df: len(df))
+def compactar_journal(df):
+    """
+    Reescribe el CSV base con el estado completo del DataFrame y vacía el journal.
+    La escritura se hace en un archivo temporal para no dejar el CSV a medias.
+    Solo compacta: los cambios de cada registro deben haberse guardado antes por ID.
+    """
+    with bloqueo_archivo(ARCHIVO_CSV):
+        temporal = ARCHIVO_CSV + ".tmp"
+        df.to_csv(temporal, index=False, encoding='utf-8', columns=COLUMNS)
+        instrumentacion.sumar('compactar_journal', bytes_escritos=os.path.getsize(temporal))
+        os.replace(temporal, ARCHIVO_CSV)
+        # Si el programa se corta aquí, reproducir el journal otra vez da el mismo resultado
+        if os.path.exists(ruta_journal()):
+            os.remove(ruta_journal())
+        _sincronizacion.update(firma_base=_firma_archivo(ARCHIVO_CSV), offset_journal=0, filas_journal=0)
+
+def _incorporar_filas(df, filas):
+    """
+    Copia en el mismo DataFrame (sin crear uno nuevo) las filas recibidas de otro proceso:
+    reemplaza la fila con el mismo ID_REGISTRO o la agrega al final.
+    """
+    for columna in COLUMNAS_CATEGORICAS:
+        if isinstance(df[columna].dtype, pd.CategoricalDtype):
+            _agregar_categorias(df, columna, filas[columna])
+    etiquetas = dict(zip(df['ID_REGISTRO'], df.index))
+    siguiente = (df.index.max() + 1) if len(df) else 0
+    agregadas = False
+    for fila in filas[COLUMNS].itertuples(index=False, name=None):
+        etiqueta = etiquetas.get(fila[0]) # ID_REGISTRO es la primera columna
+        if etiqueta is None:
+            etiqueta = siguiente
+            siguiente += 1
+            agregadas = True
+        df.loc[etiqueta, COLUMNS] = list(fila)
+    if agregadas:
+        _normalizar_tipos(df) # Agregar filas con .loc puede cambiar el tipo de algunas columnas (ej. bool a object)
+    id_manager.registrar_ids_registro(filas['ID_REGISTRO'])
+    indice_alertas.actualizar(df, filas['ID_REGISTRO'])
+    agregado_promedios.actualizar(df, filas['ID_REGISTRO'])
+
+def _leer_cambios_ajenos():
+    """
+    Lee lo que otros procesos guardaron desde la última sincronización (se llama con el bloqueo tomado).
+    Devuelve (filas, completo): con completo=True otro proceso compactó el archivo y 'filas' es el
+    estado completo del disco, que hay que comparar por versión con el DataFrame (_filas_distintas).
+    """
+    if _firma_archivo(ARCHIVO_CSV) != _sincronizacion['firma_base']:
+        journal, offset = _leer_journal()
+        filas = _normalizar_tipos(_completar_columnas(_aplicar_journal(_leer_csv_base()[0], journal)))
+        completo, filas_journal = True, len(journal)
+    else:
+        # Caso normal: solo leemos lo que se agregó al journal desde la última vez
+        filas, offset = _leer_journal(_sincronizacion['offset_journal'])
+        instrumentacion.sumar('guardar_datos', bytes_leidos=offset - _sincronizacion['offset_journal'])
+        filas_journal = _sincronizacion['filas_journal'] + len(filas)
+        filas = _normalizar_tipos(filas.drop_duplicates('ID_REGISTRO', keep='last'))
+        completo = False
+    _sincronizacion.update(firma_base=_firma_archivo(ARCHIVO_CSV), offset_journal=offset, filas_journal=filas_journal)
+    return filas, completo
+
+def _filas_distintas(df, disco):
+    """Filas del estado completo del disco que no están en el DataFrame o tienen otra versión."""
+    version_propia = disco['ID_REGISTRO'].map(dict(zip(df['ID_REGISTRO'], df['version'])))
+    return disco[version_propia.isna() | (version_propia != disco['version'])]
+
+def _sincronizar_csv(df, ids_propios):
+    """
+    Incorpora al DataFrame de trabajo los registros que otros procesos guardaron desde la
+    última sincronización (se llama con el bloqueo tomado).
+    Devuelve los IDs de 'ids_propios' que otro proceso modificó mientras tanto (conflictos).
+    """
+    ajenos, completo = _leer_cambios_ajenos()
+    if completo:
+        ajenos = _filas_distintas(df, ajenos)
+    if ajenos.empty:
+        return set()
+    # Sus cambios se incorporan; en un conflicto gana la versión que ya estaba guardada
+    _incorporar_filas(df, ajenos)
+    return set(ajenos['ID_REGISTRO']) & set(ids_propios)
+
+def _agregar_al_journal(filas):
+    """
+    Agrega filas (con su versión ya incrementada) al final del journal como un lote (ver
+    MARCA_LOTE_JOURNAL). Se llama con el bloqueo tomado y después de leer los cambios ajenos,
+    así offset_journal marca el final del último lote completo.
+    """
+    ruta = ruta_journal()
+    cuerpo = filas.to_csv(header=False, index=False, columns=COLUMNS).encode('utf-8')
+    with open(ruta, 'ab') as f:
+        if f.tell() > _sincronizacion['offset_journal']:
+            # Restos de un lote que otro proceso no terminó de escribir: se descartan
+            f.truncate(_sincronizacion['offset_journal'])
+            f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            f.write(filas.head(0).to_csv(index=False, columns=COLUMNS).encode('utf-8'))
+        f.write(MARCA_LOTE_JOURNAL + str(len(cuerpo)).encode('ascii') + b'\n' + cuerpo)
+    instrumentacion.sumar('guardar_datos', bytes_escritos=os.path.getsize(ruta) - _sincronizacion['offset_journal'])
+    _sincronizacion['offset_journal'] = os.path.getsize(ruta)
+    _sincronizacion['filas_journal'] += len(filas)
+
+def _guardar_csv(df, registros_modificados, todo_o_nada=False):
+    """
+    Guarda en el CSV con control de concurrencia optimista (bajo bloqueo de archivo):
+    primero incorpora los cambios de otros procesos, luego agrega al journal las filas propias
+    que no entran en conflicto, con su versión incrementada. Con todo_o_nada=True, si hay algún
+    conflicto no se agrega ninguna fila. Devuelve los IDs en conflicto.
+    """
+    with bloqueo_archivo(ARCHIVO_CSV):
+        ids = set(registros_modificados) if registros_modificados is not None else set()
+        conflictos = _sincronizar_csv(df, ids)
+        if todo_o_nada and conflictos:
+            return conflictos
+
+        if registros_modificados is None:
+            compactar_journal(df)
+            return conflictos
+
+        ids -= conflictos
+        if not ids:
+            return conflictos
+        # promedio_general de las otras filas del mismo estudiante/profesor cambia solo en memoria:
+        # es derivado y se recalcula al leer, así que esas filas no se reescriben ni cambian de versión
+        agregado_promedios.actualizar(df, ids)
+
+        mascara = df['ID_REGISTRO'].isin(ids)
+        versiones = pd.to_numeric(df.loc[mascara, 'version'], errors='coerce').fillna(0).astype(int) + 1
+        _agregar_al_journal(df[mascara].assign(version=versiones))
+        df.loc[mascara, 'version'] = versiones
+
+        # Cuando el journal crece demasiado lo incorporamos al archivo base
+        if _sincronizacion['filas_journal'] > LIMITE_FILAS_JOURNAL:
+            compactar_journal(df)
+        return conflictos
+
+@instrumentar(filas=lambda resultado, df, registros_modificados=None, **_:
+              len(df) if registros_modificados is None else len(registros_modificados))
+def guardar_datos(df, registros_modificados=None, todo_o_nada=False):
+    """
+    Guarda el DataFrame en el almacenamiento configurado.
+    - Con una lista de ID_REGISTRO: guarda solo esas filas (journal en CSV, UPSERT en SQLite).
+    - Sin 'registros_modificados': guarda todo (en CSV compacta el journal en el archivo base).
+    Si otra terminal modificó alguno de esos registros mientras tanto, se conserva su versión,
+    se avisa al usuario y se devuelve False. Los demás cambios de otras terminales se incorporan al DF.
+    Con todo_o_nada=True un conflicto cancela la escritura de todas las filas (publicación en lote).
+    Es sincrónico: los menús usan persistencia.programar(), que escribe en segundo plano.
+    """
+    # Lo que quedó programado en segundo plano se escribe antes, para no escribir dos veces la misma versión
+    persistencia.vaciar(df)
+    cache_tablas.invalidar(ARCHIVO_CSV)
+    try:
+        if BACKEND_ALMACENAMIENTO == 'sqlite':
+            if registros_modificados is not None:
+                agregado_promedios.actualizar(df, registros_modificados) # Ver _guardar_csv
+            conflictos = obtener_almacen_sqlite().guardar(df, registros_modificados, todo_o_nada)
+        else:
+            conflictos = _guardar_csv(df, registros_modificados, todo_o_nada)
+    except Exception as e:
+        print(f"Error al guardar los datos: {e}")
+        return False
+
+    indice_alertas.actualizar(df, registros_modificados)
+    if conflictos:
+        _avisar_conflictos(conflictos)
+        return False
+    return True
+
+def _avisar_conflictos(conflictos):
+    print(f"\nCONFLICTO: {len(conflictos)} registros fueron modificados por otro usuario mientras usted editaba "
+          f"({', '.join(sorted(conflictos))}). Se conservó la versión del otro usuario; revise y vuelva a aplicar sus cambios.")
+
+class PersistenciaDiferida:
+    """
+    Escritura diferida (write-behind) de los guardados hechos desde los menús, con el backend CSV.
+
+    programar() hace en el hilo del menú solo el trabajo en memoria (promedios, alertas, versión)
+    y copia las filas modificadas; un hilo en segundo plano las agrega al journal (y compacta cuando
+    corresponde) leyendo el disco, nunca el DataFrame de trabajo. Los guardados que llegan dentro de
+    'intervalo' segundos se escriben juntos, y una fila guardada varias veces se escribe una sola vez.
+    Se escribe también al cerrar sesión y al salir (vaciar / detener).
+
+    Los cambios de otras terminales y los conflictos que detecta el hilo se aplican al DataFrame en
+    el hilo del menú, en el siguiente programar() o vaciar(df).
+    """
+    def __init__(self, intervalo=INTERVALO_ESCRITURA_S):
+        self.intervalo = intervalo
+        self._condicion = threading.Condition()
+        self._pendientes = {} # ID_REGISTRO -> fila (tupla en el orden de COLUMNS) a escribir
+        self._en_curso = set() # IDs que el hilo está escribiendo ahora
+        self._recibidos = [] # (filas, completo) de otros procesos, para incorporar en el hilo del menú
+        self._conflictos = set()
+        self._vaciar = False
+        self._detener = False
+        self._hilo = None
+        self.programados = 0 # Llamadas a programar()
+        self.escrituras = 0  # Escrituras reales al disco
+        atexit.register(self.detener)
+
+    def activa(self):
+        return BACKEND_ALMACENAMIENTO != 'sqlite' and self.intervalo > 0
+
+    def programar(self, df, registros_modificados):
+        """
+        Programa el guardado de esas filas y vuelve enseguida. Con SQLite (el UPSERT ya solo
+        toca esas filas) o con intervalo 0 guarda en el momento con guardar_datos().
+        Sin filas modificadas no hay nada que guardar.
+        """
+        if not len(registros_modificados):
+            return True
+        if not self.activa():
+            return guardar_datos(df, registros_modificados)
+        self.aplicar_cambios(df)
+        cache_tablas.invalidar(ARCHIVO_CSV)
+        ids = set(registros_modificados)
+        agregado_promedios.actualizar(df, ids) # Ver _guardar_csv
+        indice_alertas.actualizar(df, ids)
+
+        mascara = df['ID_REGISTRO'].isin(ids)
+        if not mascara.any():
+            return True
+        filas = df.loc[mascara, COLUMNS]
+        versiones = pd.to_numeric(filas['version'], errors='coerce').fillna(0).astype(int).tolist()
+        with self._condicion:
+            for posicion, (registro_id, fila) in enumerate(zip(filas['ID_REGISTRO'].tolist(),
+                                                               filas.itertuples(index=False, name=None))):
+                # Una fila que sigue pendiente ya tiene su versión incrementada: se reemplaza sin volver a sumar
+                if registro_id not in self._pendientes:
+                    versiones[posicion] += 1
+                self._pendientes[registro_id] = fila[:-1] + (versiones[posicion],) # 'version' es la última columna
+            df.loc[mascara, 'version'] = versiones
+            self.programados += 1
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._trabajar, name='persistencia-diferida', daemon=True)
+                self._hilo.start()
+            self._condicion.notify_all()
+        return True
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                self._condicion.wait_for(lambda: self._pendientes or self._detener)
+                if not self._pendientes:
+                    return
+                # Espera a que se junten los guardados de una ráfaga (salvo que se pida vaciar ya)
+                self._condicion.wait_for(lambda: self._vaciar or self._detener, timeout=self.intervalo)
+                lote, self._pendientes = self._pendientes, {}
+                self._en_curso = set(lote)
+            try:
+                self._escribir(lote)
+            except Exception as e:
+                print(f"Error al guardar los datos en segundo plano (se reintentará): {e}")
+                with self._condicion:
+                    for registro_id, fila in lote.items():
+                        self._pendientes.setdefault(registro_id, fila)
+                    self._vaciar = False # vaciar() no espera indefinidamente si el disco falla
+            finally:
+                with self._condicion:
+                    self._en_curso = set()
+                    self._condicion.notify_all()
+
+    def _escribir(self, lote):
+        """Agrega el lote al journal con control de versiones, bajo el bloqueo del archivo."""
+        filas = pd.DataFrame(list(lote.values()), columns=COLUMNS)
+        with bloqueo_archivo(ARCHIVO_CSV):
+            ajenos, completo = _leer_cambios_ajenos()
+            # Conflicto: en el disco hay una versión distinta de la que este proceso editó
+            version_disco = dict(zip(ajenos['ID_REGISTRO'], ajenos['version']))
+            esperada = dict(zip(filas['ID_REGISTRO'], filas['version'] - 1))
+            conflictos = {i for i, v in esperada.items() if i in version_disco and version_disco[i] != v}
+            with self._condicion:
+                for registro_id, fila in list(self._pendientes.items()):
+                    if registro_id in version_disco and version_disco[registro_id] != fila[-1] - 1:
+                        del self._pendientes[registro_id]
+                        conflictos.add(registro_id)
+                # Las filas propias de este lote no vuelven al menú con la versión anterior del disco
+                self._recibidos.append((ajenos[~ajenos['ID_REGISTRO'].isin(set(lote) - conflictos)], completo))
+                self._conflictos |= conflictos
+
+            filas = filas[~filas['ID_REGISTRO'].isin(conflictos)]
+            if not filas.empty:
+                _agregar_al_journal(filas)
+                self.escrituras += 1
+            if _sincronizacion['filas_journal'] > LIMITE_FILAS_JOURNAL:
+                # El estado completo se arma desde el disco (ya tiene todo lo escrito), no desde el DataFrame del menú
+                compactar_journal(_normalizar_tipos(_cargar_csv(sincronizar=False)))
+
+    def aplicar_cambios(self, df):
+        """Incorpora al DataFrame lo que el hilo recibió de otros procesos y avisa los conflictos."""
+        with self._condicion:
+            recibidos, self._recibidos = self._recibidos, []
+            conflictos, self._conflictos = self._conflictos, set()
+            # Las filas propias que aún no se escribieron no se pisan con la versión vieja del disco
+            propias = (set(self._pendientes) | self._en_curso) - conflictos
+        for filas, completo in recibidos:
+            if completo:
+                filas = _filas_distintas(df, filas)
+            filas = filas[~filas['ID_REGISTRO'].isin(propias)]
+            if not filas.empty:
+                _incorporar_filas(df, filas)
+        if conflictos:
+            _avisar_conflictos(conflictos)
+
+    def vaciar(self, df=None):
+        """Escribe ya todo lo pendiente y espera a que termine (al cerrar sesión, antes de leer el disco)."""
+        with self._condicion:
+            if self._pendientes or self._en_curso:
+                self._vaciar = True
+                self._condicion.notify_all()
+                self._condicion.wait_for(lambda: not self._en_curso and (not self._pendientes or not self._vaciar))
+                self._vaciar = False
+        if df is not None:
+            self.aplicar_cambios(df)
+
+    def detener(self):
+        """Vacía lo pendiente y termina el hilo (al salir del programa)."""
+        self.vaciar()
+        with self._condicion:
+            self._detener = True
+            self._condicion.notify_all()
+        if self._hilo is not None:
+            self._hilo.join()
+
+persistencia = PersistenciaDiferida()
+
+@instrumentar(filas='resultado')
+def consultar_registros(df, columnas=None, **filtros):
+    """
+    Devuelve los registros que cumplen todos los filtros (columna=valor).
+    Un filtro con valor None busca celdas vacías. Con el backend SQLite la consulta
+    usa los índices de la base de datos; con CSV se filtra el DataFrame recibido
+    (o la tabla del archivo si df es None, desde cache_tablas si no cambió). El resultado es solo de lectura.
+    """
+    if BACKEND_ALMACENAMIENTO == 'sqlite':
+        return obtener_almacen_sqlite().consultar(filtros, columnas)
+
+    if df is None:
+        persistencia.vaciar() # Lo guardado desde los menús debe verse en la consulta
+        df = cargar_datos(sincronizar=False)
+    mascara = pd.Series(True, index=df.index)
+    for columna, valor in filtros.items():
+        if valor is None:
+            mascara &= df[columna].isnull()
+        else:
+            mascara &= df[columna] == valor
+    resultado = df[mascara]
+    return resultado[columnas] if columnas else resultado
+
+@instrumentar(filas=lambda resultado, *args, **kwargs: resultado)
+def contar_registros(df, **filtros):
+    """Cuenta los registros que cumplen los filtros (ver consultar_registros)."""
+    if BACKEND_ALMACENAMIENTO == 'sqlite':
+        return obtener_almacen_sqlite().contar(filtros)
+    return len(consultar_registros(df, **filtros))
+
+def _filtrar(df, filtros):
+    """Filas de df que cumplen todos los filtros (columna=valor; None busca celdas vacías)."""
+    mascara = pd.Series(True, index=df.index)
+    for columna, valor in filtros.items():
+        if valor is None:
+            mascara &= df[columna].isnull()
+        else:
+            mascara &= df[columna] == valor
+    return df[mascara]
+
+class IndicePaginas:
+    """
+    Índice del CSV base para paginar sin volver a leer las filas anteriores a la página: el byte
+    donde empieza cada PASO filas, la cantidad de filas y (solo si hacen falta) sus IDs.
+    Se arma una vez por versión del archivo base (su firma, la parte base de CacheTablas.firma);
+    escribir en el journal no lo invalida porque sus filas reemplazan a otras o van al final.
+    """
+    PASO = 1000
+
+    def __init__(self):
+        self.firma = None
+        self.columnas = []
+        self.posiciones = [] # Byte donde empieza la fila número i * PASO
+        self.filas = 0
+        self._ids = None
+        self.construcciones = 0 # Veces que se recorrió el archivo base para armarlo
+
+    def actualizar(self, ruta):
+        """Rearma el índice si el archivo base cambió (debe llamarse con el bloqueo tomado)."""
+        firma = _firma_archivo(ruta)
+        if firma == self.firma:
+            return self
+        with open(ruta, 'rb') as archivo:
+            encabezado = archivo.readline()
+            self.columnas = next(csv.reader([encabezado.decode('utf-8-sig')]))
+            finales, comillas, leidos = [], 0, len(encabezado)
+            while datos := archivo.read(1 << 24):
+                bytes_leidos = np.frombuffer(datos, dtype=np.uint8)
+                saltos = np.flatnonzero(bytes_leidos == ord('\n'))
+                en_comillas = np.flatnonzero(bytes_leidos == ord('"'))
+                # Un salto de línea dentro de un campo entre comillas no termina la fila
+                cerradas = (comillas + np.searchsorted(en_comillas, saltos)) % 2 == 0
+                finales.append(saltos[cerradas] + leidos + 1)
+                comillas += len(en_comillas)
+                leidos += len(datos)
+        finales = np.concatenate([*finales, [leidos]])
+        inicios = np.concatenate([[len(encabezado)], finales[:-1]])
+        # Las líneas en blanco (y el final del archivo) no son filas, igual que para pandas
+        inicios = inicios[finales - inicios > 2]
+        posiciones, filas = inicios[::self.PASO].tolist(), len(inicios)
+        self.firma, self.posiciones, self.filas, self._ids = firma, posiciones, filas, None
+        self.construcciones += 1
+        return self
+
+    def ids(self, ruta):
+        """IDs del archivo base; se leen la primera vez que se piden para esta versión del archivo."""
+        if self._ids is None:
+            self._ids = pd.Index(_leer_csv(ruta, usecols=['ID_REGISTRO'])['ID_REGISTRO'])
+        return self._ids
+
+    def bloques(self, ruta, desde, filas, **kwargs):
+        """
+        Bloques crecientes (ver _bloques_crecientes) del archivo base a partir de la fila 'desde':
+        salta al PASO anterior y descarta las filas que sobran. Ninguno si 'desde' pasa el final.
+        """
+        if desde >= self.filas:
+            return
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(self.posiciones[desde // self.PASO])
+            with _leer_csv(archivo, header=None, names=self.columnas, skiprows=desde % self.PASO,
+                           chunksize=FILAS_POR_BLOQUE, **kwargs) as lector:
+                yield from _bloques_crecientes(lector, filas)
+
+indice_paginas = IndicePaginas()
+
+def _bloques_crecientes(lector, filas):
+    """
+    Bloques de un lector de pandas que empiezan con 'filas' filas y se duplican hasta FILAS_POR_BLOQUE:
+    una página sin filtros lee pocas filas y una con filtros muy selectivos avanza rápido.
+    """
+    while True:
+        try:
+            yield lector.get_chunk(filas)
+        except StopIteration:
+            return
+        filas = min(filas * 2, FILAS_POR_BLOQUE)
+
+def _pagina_csv(filtros, columnas, desde, tamano):
+    """
+    Hasta 'tamano' filas que cumplen los filtros a partir de la posición 'desde' de la tabla
+    (el orden de cargar_datos: archivo base y al final los registros nuevos del journal).
+    El archivo se lee por bloques (ver _bloques_crecientes), solo con las columnas necesarias,
+    y la lectura se corta al llenar la página: la memoria no depende del tamaño del archivo.
+    La lectura empieza en 'desde' gracias a indice_paginas, sin recorrer las filas anteriores.
+    El índice del resultado es la posición de cada fila.
+    """
+    usadas = list(dict.fromkeys(['ID_REGISTRO', *columnas, *filtros]))
+    if 'promedio_general' in usadas: # Se recalcula por clave (ver _promedios_csv)
+        usadas = list(dict.fromkeys([*usadas, 'estudiante_ID', 'profesor_ID']))
+    if not os.path.exists(ARCHIVO_CSV):
+        return pd.DataFrame(columns=usadas)
+
+    with bloqueo_archivo(ARCHIVO_CSV):
+        # El journal es chico (se compacta al pasar LIMITE_FILAS_JOURNAL): la última versión de
+        # cada registro reemplaza a la del archivo base sin cambiar su posición
+        journal, _ = _leer_journal()
+        orden_journal = journal['ID_REGISTRO'].drop_duplicates().tolist()
+        ultimos = journal.drop_duplicates('ID_REGISTRO', keep='last').set_index('ID_REGISTRO')
+        ultimos = ultimos.reindex(columns=usadas[1:])
+
+        indice = indice_paginas.actualizar(ARCHIVO_CSV)
+        partes, encontradas, leidas = [], 0, 0
+        for bloque in indice.bloques(ARCHIVO_CSV, desde, tamano, usecols=lambda c: c in usadas):
+            bloque = bloque.reindex(columns=usadas)
+            bloque.index = pd.RangeIndex(desde + leidas, desde + leidas + len(bloque))
+            leidas += len(bloque)
+            reemplazar = bloque['ID_REGISTRO'].isin(ultimos.index)
+            if reemplazar.any():
+                reemplazo = ultimos.loc[bloque.loc[reemplazar, 'ID_REGISTRO']].reset_index()
+                reemplazo.index = bloque.index[reemplazar]
+                bloque = pd.concat([bloque[~reemplazar], reemplazo]).sort_index()
+            seleccion = _filtrar(bloque, filtros)
+            partes.append(seleccion)
+            encontradas += len(seleccion)
+            if encontradas >= tamano:
+                break
+        else:
+            # Fin del archivo base: siguen los registros que solo están en el journal
+            if orden_journal:
+                en_base = indice.ids(ARCHIVO_CSV)
+                nuevos = [registro_id for registro_id in orden_journal if registro_id not in en_base]
+                posiciones = pd.RangeIndex(indice.filas, indice.filas + len(nuevos))
+                nuevas = ultimos.loc[nuevos].reset_index().set_axis(posiciones)
+                partes.append(_filtrar(nuevas[posiciones >= desde], filtros))
+        if not any(len(parte) for parte in partes):
+            return pd.DataFrame(columns=usadas)
+        pagina = pd.concat([parte for parte in partes if len(parte)]).head(tamano)
+        if 'promedio_general' in usadas:
+            pagina['promedio_general'] = _promedios_csv(pagina, journal)
+    return pagina
+
+# Columnas con las que se recalcula promedio_general de unas pocas claves
+COLUMNAS_PROMEDIO = ['ID_REGISTRO', 'estudiante_ID', 'profesor_ID', 'periodo', 'estado_publicacion', 'P_NOTA_FINAL']
+
+def _promedios_csv(filas, journal):
+    """
+    promedio_general de 'filas' calculado solo con las notas de sus estudiantes: el archivo base se
+    recorre por bloques guardando únicamente esas filas y el journal las reemplaza por ID.
+    El valor guardado en el archivo puede estar desactualizado (ver cargar_datos).
+    La memoria depende de los estudiantes de la página, no del tamaño del archivo.
+    """
+    estudiantes = set(filas['estudiante_ID'].dropna().astype(str))
+    partes = []
+    with _leer_csv(ARCHIVO_CSV, usecols=COLUMNAS_PROMEDIO, chunksize=FILAS_POR_BLOQUE) as lector:
+        for bloque in lector:
+            partes.append(bloque[bloque['estudiante_ID'].isin(estudiantes)])
+    # Todo el journal (es chico): una fila que cambió de estudiante también reemplaza a la del archivo base
+    notas = pd.concat([*partes, journal.reindex(columns=COLUMNAS_PROMEDIO)], ignore_index=True)
+    notas = notas.drop_duplicates('ID_REGISTRO', keep='last')
+    return _promedios_con_notas(filas, notas[notas['estudiante_ID'].astype(str).isin(estudiantes)])
+
+def _promedios_con_notas(filas, notas):
+    """
+    promedio_general de cada fila de 'filas' (alineado con ellas) calculado con las filas de 'notas',
+    que deben incluir todas las notas de las claves (estudiante_ID, profesor_ID) de 'filas'.
+    """
+    claves = filas[['estudiante_ID', 'profesor_ID']]
+    tabla = _normalizar_tipos(pd.concat([notas.drop(columns='ID_REGISTRO', errors='ignore'), claves], ignore_index=True))
+    return calcular_promedios_lote(tabla).to_numpy()[len(tabla) - len(claves):]
+
+@instrumentar(filas=lambda resultado, *args, **kwargs: len(resultado[0]))
+def consultar_pagina(columnas=None, despues_de=None, tamano=TAMANO_PAGINA, **filtros):
+    """
+    Una página de registros en el orden en que fueron creados, con paginación por clave:
+    la clave es la posición de la fila en la tabla (el rowid en SQLite). Devuelve
+    (página, clave de la última fila o None si no hay más); para seguir se pasa esa clave
+    como 'despues_de'. Los filtros son de igualdad, como en consultar_registros.
+    """
+    columnas = list(columnas or COLUMNS)
+    for columna in filtros:
+        if columna not in COLUMNS:
+            raise ValueError(f"Columna desconocida en el filtro: {columna}")
+
+    desde = 0 if despues_de is None else despues_de + 1
+    if BACKEND_ALMACENAMIENTO == 'sqlite':
+        pagina = obtener_almacen_sqlite().consultar_pagina(filtros, columnas, desde, tamano)
+    else:
+        persistencia.vaciar() # Lo guardado desde los menús debe verse en la consulta
+        pagina = _normalizar_tipos(_pagina_csv(filtros, columnas, desde, tamano))
+    siguiente = int(pagina.index[-1]) if len(pagina) == tamano else None
+    return pagina[columnas], siguiente
+
+# --- 3b. BACKEND SQLITE (OPCIONAL) ---
+
+class AlmacenSQLite:
+    """
+    Backend de almacenamiento sobre SQLite (módulo estándar sqlite3).
+    Guarda los mismos registros que el CSV, con índices para las consultas de los menús,
+    y escribe fila por fila con UPSERT en lugar de reescribir todo el archivo.
+    """
+    TIPOS_COLUMNAS = {'estado_publicacion': 'INTEGER', 'P_NOTA_FINAL': 'REAL', 'promedio_general': 'REAL', 'version': 'INTEGER',
+                      **{columna: 'REAL' for columna in COLUMNAS_CAMPOS.values()}}
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._conexion = None
+
+    def conexion(self):
+        """Abre la base de datos (una sola vez) y crea el esquema si hace falta."""
+        if self._conexion is None:
+            es_nueva = not os.path.exists(self.ruta)
+            # Autocommit: las transacciones se abren explícitamente con BEGIN IMMEDIATE.
+            # 'timeout' hace esperar a otra terminal que esté escribiendo en lugar de fallar.
+            # check_same_thread=False: la conexión se abre en el hilo de precarga (PrecargaDatos)
+            # y después la usa el hilo del menú, nunca los dos a la vez.
+            self._conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+            self._crear_esquema()
+            # Primera vez con SQLite: importamos los registros que ya existían en el CSV
+            if es_nueva and os.path.exists(ARCHIVO_CSV):
+                self.guardar(_normalizar_tipos(_cargar_csv(sincronizar=False)), None)
+        return self._conexion
+
+    def _crear_esquema(self):
+        """Crea la tabla de registros y los índices usados por los menús."""
+        definiciones = []
+        for columna in COLUMNS:
+            tipo = self.TIPOS_COLUMNAS.get(columna, 'TEXT')
+            restriccion = ' PRIMARY KEY' if columna == 'ID_REGISTRO' else ''
+            definiciones.append(f'"{columna}" {tipo}{restriccion}')
+        with self._transaccion():
+            self._conexion.execute(f"CREATE TABLE IF NOT EXISTS registros ({', '.join(definiciones)})")
+            self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_estudiante_periodo ON registros (estudiante_ID, periodo)")
+            self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_profesor_periodo_estado ON registros (profesor_ID, periodo, estado_publicacion)")
+        self._migrar_detalles_json()
+
+    def _migrar_detalles_json(self):
+        """Agrega las columnas por campo a bases creadas con 'P_DETALLES_JSON' y las llena una vez."""
+        existentes = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(registros)")}
+        with self._transaccion():
+            for columna in COLUMNS:
+                if columna not in existentes:
+                    tipo = self.TIPOS_COLUMNAS.get(columna, 'TEXT')
+                    self._conexion.execute(f'ALTER TABLE registros ADD COLUMN "{columna}" {tipo}')
+            if 'P_DETALLES_JSON' not in existentes:
+                return
+            antiguos = self._conexion.execute(
+                "SELECT ID_REGISTRO, P_DETALLES_JSON FROM registros WHERE P_DETALLES_JSON IS NOT NULL"
+            ).fetchall()
+            asignaciones = ', '.join(f'"{c}" = ?' for c in COLUMNAS_CAMPOS.values())
+            for registro_id, texto in antiguos:
+                try:
+                    detalles = json.loads(texto)
+                except json.JSONDecodeError:
+                    continue
+                valores = [self._valor_sql(detalles.get(campo)) for campo in COLUMNAS_CAMPOS]
+                self._conexion.execute(f"UPDATE registros SET {asignaciones} WHERE ID_REGISTRO = ?", [*valores, registro_id])
+            self._conexion.execute("UPDATE registros SET P_DETALLES_JSON = NULL")
+        try:
+            # DROP COLUMN requiere SQLite 3.35+; si no está disponible la columna vacía se ignora
+            self._conexion.execute("ALTER TABLE registros DROP COLUMN P_DETALLES_JSON")
+        except sqlite3.OperationalError:
+            pass
+
+    @contextmanager
+    def _transaccion(self):
+        """BEGIN IMMEDIATE ... COMMIT: toma el bloqueo de escritura desde el inicio de la transacción."""
+        conexion = self.conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield conexion
+        except BaseException:
+            conexion.execute("ROLLBACK")
+            raise
+        conexion.execute("COMMIT")
+
+    @staticmethod
+    def _valor_sql(valor):
+        """Convierte un valor de pandas al tipo que se guarda en SQLite."""
+        if isinstance(valor, str):
+            # Igual que al leer el CSV: los marcadores como 'N/A' se guardan como vacíos
+            return None if valor in VALORES_NULOS else valor
+        if valor is None or pd.isna(valor):
+            return None
+        if isinstance(valor, datetime):
+            return valor.strftime(FORMATO_FECHA) # pd.Timestamp de fecha_publicacion, como en el CSV
+        if hasattr(valor, 'item'):
+            # Escalares de NumPy (int64, float64, bool_) a tipos nativos de Python
+            valor = valor.item()
+        if isinstance(valor, bool):
+            return int(valor)
+        return valor
+
+    def _filas(self, df):
+        """Prepara las filas del DataFrame como tuplas de parámetros para SQL."""
+        for fila in df[COLUMNS].itertuples(index=False, name=None):
+            yield tuple(self._valor_sql(v) for v in fila)
+
+    def _a_dataframe(self, consulta, parametros):
+        """Ejecuta un SELECT y devuelve el resultado con los mismos tipos que el CSV."""
+        df = pd.read_sql_query(consulta, self.conexion(), params=parametros)
+        if 'estado_publicacion' in df.columns:
+            publicado = df['estado_publicacion'].map({1: True, 0: False})
+            df['estado_publicacion'] = publicado.astype(bool) if publicado.notna().all() else publicado
+        return df
+
+    def _where(self, filtros):
+        """Construye la cláusula WHERE (con parámetros) a partir de los filtros."""
+        condiciones, parametros = [], []
+        for columna, valor in filtros.items():
+            if columna not in COLUMNS:
+                raise ValueError(f"Columna desconocida en el filtro: {columna}")
+            if valor is None:
+                condiciones.append(f'"{columna}" IS NULL')
+            else:
+                condiciones.append(f'"{columna}" = ?')
+                parametros.append(self._valor_sql(valor))
+        where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return where, parametros
+
+    @staticmethod
+    def _lista_columnas(columnas):
+        return ', '.join(f'"{c}"' for c in columnas)
+
+    def cargar(self):
+        """Devuelve todos los registros en el orden en que fueron creados."""
+        return self._a_dataframe(f"SELECT {self._lista_columnas(COLUMNS)} FROM registros ORDER BY rowid", [])
+
+    def consultar(self, filtros, columnas=None):
+        """SELECT con filtros de igualdad; usa los índices de la tabla."""
+        where, parametros = self._where(filtros)
+        columnas = list(columnas or COLUMNS)
+        seleccion = self._lista_columnas(self._columnas_con_clave(columnas))
+        df = self._a_dataframe(f"SELECT {seleccion} FROM registros{where} ORDER BY rowid", parametros)
+        return self._con_promedios(_normalizar_tipos(df))[columnas]
+
+    def consultar_pagina(self, filtros, columnas, desde, tamano):
+        """Página por clave: WHERE rowid >= ? ORDER BY rowid LIMIT ? (recorre la tabla en orden de creación)."""
+        where, parametros = self._where(filtros)
+        where += f"{' AND' if where else ' WHERE'} rowid >= ?"
+        usadas = list(dict.fromkeys(['ID_REGISTRO', *columnas]))
+        seleccion = self._lista_columnas(self._columnas_con_clave(usadas))
+        df = self._a_dataframe(f"SELECT rowid AS _posicion, {seleccion} FROM registros{where} ORDER BY rowid LIMIT ?",
+                               [*parametros, desde, tamano])
+        return self._con_promedios(_normalizar_tipos(df.set_index('_posicion').rename_axis(None)))[usadas]
+
+    @staticmethod
+    def _columnas_con_clave(columnas):
+        """Para recalcular promedio_general hacen falta estudiante_ID y profesor_ID de cada fila."""
+        if 'promedio_general' not in columnas:
+            return columnas
+        return list(dict.fromkeys([*columnas, 'estudiante_ID', 'profesor_ID']))
+
+    def _con_promedios(self, df):
+        """
+        Recalcula promedio_general de las filas leídas con las notas publicadas de la base: el valor
+        guardado en una fila no se actualiza cuando se publica otra nota de la misma clave.
+        """
+        if 'promedio_general' not in df.columns or df.empty:
+            return df
+        estudiantes = df['estudiante_ID'].dropna().astype(str).unique().tolist()
+        partes = []
+        for inicio in range(0, len(estudiantes), 500): # Límite de parámetros por consulta en SQLite
+            lote = estudiantes[inicio:inicio + 500]
+            marcadores = ', '.join('?' for _ in lote)
+            partes.append(self._a_dataframe(
+                f"SELECT estudiante_ID, profesor_ID, periodo, estado_publicacion, P_NOTA_FINAL FROM registros "
+                f"WHERE estado_publicacion = 1 AND estudiante_ID IN ({marcadores})", lote))
+        df['promedio_general'] = _promedios_con_notas(df, pd.concat(partes, ignore_index=True))
+        return df
+
+    def contar(self, filtros):
+        """SELECT COUNT(*) con filtros de igualdad."""
+        where, parametros = self._where(filtros)
+        return self.conexion().execute(f"SELECT COUNT(*) FROM registros{where}", parametros).fetchone()[0]
+
+    def _versiones(self, ids):
+        """Versión guardada de cada ID_REGISTRO que ya existe en la base."""
+        versiones = {}
+        ids = list(ids)
+        for inicio in range(0, len(ids), 500): # Límite de parámetros por consulta en SQLite
+            lote = ids[inicio:inicio + 500]
+            marcadores = ', '.join('?' for _ in lote)
+            consulta = f"SELECT ID_REGISTRO, COALESCE(version, 0) FROM registros WHERE ID_REGISTRO IN ({marcadores})"
+            versiones.update(self._conexion.execute(consulta, lote).fetchall())
+        return versiones
+
+    def guardar(self, df, registros_modificados, todo_o_nada=False):
+        """
+        UPSERT de las filas modificadas (o de todas si no se indican) con control optimista:
+        una fila solo se escribe si su versión en la base sigue siendo la que este proceso leyó.
+        Con todo_o_nada=True, si alguna fila está en conflicto no se escribe ninguna.
+        Devuelve los IDs en conflicto; para ellos se copia al DataFrame la versión guardada.
+        """
+        columnas = ', '.join(f'"{c}"' for c in COLUMNS)
+        marcadores = ', '.join('?' for _ in COLUMNS)
+        actualizaciones = ', '.join(f'"{c}" = excluded."{c}"' for c in COLUMNS if c != 'ID_REGISTRO')
+        upsert = (f"INSERT INTO registros ({columnas}) VALUES ({marcadores}) "
+                  f"ON CONFLICT(ID_REGISTRO) DO UPDATE SET {actualizaciones}")
+
+        if registros_modificados is None:
+            filas = df
+        else:
+            filas = df[df['ID_REGISTRO'].isin(set(registros_modificados))]
+        if filas.empty:
+            return set()
+
+        propias = pd.to_numeric(filas['version'], errors='coerce').fillna(0).astype(int)
+        with self._transaccion() as conexion: # O se guardan todas las filas o ninguna
+            en_base = filas['ID_REGISTRO'].map(self._versiones(filas['ID_REGISTRO']))
+            conflicto = en_base.notna() & (en_base != propias)
+            if todo_o_nada and conflicto.any():
+                a_guardar = filas.iloc[:0] # No se escribe ninguna fila; solo se informan los conflictos
+            else:
+                a_guardar = filas[~conflicto].assign(version=propias[~conflicto] + 1)
+            conexion.executemany(upsert, self._filas(a_guardar))
+        df.loc[a_guardar.index, 'version'] = a_guardar['version']
+
+        conflictos = set(filas.loc[conflicto, 'ID_REGISTRO'])
+        for registro_id in conflictos:
+            _incorporar_filas(df, self.consultar({'ID_REGISTRO': registro_id}))
+        return conflictos
+
+_almacen_sqlite = None
+
+def obtener_almacen_sqlite():
+    """Devuelve el backend SQLite (se crea la primera vez que se usa)."""
+    global _almacen_sqlite
+    if _almacen_sqlite is None or _almacen_sqlite.ruta != ARCHIVO_SQLITE:
+        _almacen_sqlite = AlmacenSQLite(ARCHIVO_SQLITE)
+    return _almacen_sqlite
+
+# --- 3c. ÍNDICES MANTENIDOS EN CADA GUARDADO (ALERTAS Y PROMEDIOS) ---
+
+def _falta_metodo(metodos):
+    """
+    Máscara de 'Método de Enseñanza' ausente: vacío, en blanco o ESTADO_INICIAL_NOTA. Los menús
+    guardan '' o ESTADO_INICIAL_NOTA y recién al volver a leer el archivo pasan a NaN.
+    """
+    if isinstance(metodos.dtype, pd.CategoricalDtype):
+        # Se evalúa una vez por categoría y no por fila
+        vacias = np.flatnonzero(metodos.cat.categories.astype(str).str.strip().isin(['', ESTADO_INICIAL_NOTA]))
+        return metodos.isna() | metodos.cat.codes.isin(vacias)
+    return metodos.isna() | metodos.astype(str).str.strip().isin(['', ESTADO_INICIAL_NOTA])
+
+class IndiceAlertas:
+    """
+    Contadores de alertas que se actualizan en cada guardado, así check_alerts no recorre
+    el DataFrame en cada inicio de sesión:
+    - borradores y borradores sin 'Método de Enseñanza' por (profesor_ID, periodo)
+    - total de registros y publicados por periodo (completitud de la publicación)
+    Se guarda el aporte de cada ID_REGISTRO para poder restarlo cuando la fila cambia.
+    """
+    def __init__(self):
+        self.limpiar()
+
+    def limpiar(self):
+        self._aportes = {} # ID_REGISTRO -> (profesor_ID, periodo, publicado, sin_metodo)
+        self.borradores = Counter()
+        self.sin_metodo = Counter()
+        self.total = Counter()
+        self.publicados = Counter()
+
+    @staticmethod
+    def _calcular_aportes(df):
+        publicado = (df['estado_publicacion'] == True).to_numpy()
+        sin_metodo = ~publicado & _falta_metodo(df['P_METODO_ENS']).to_numpy()
+        # tolist(): recorrer una Serie elemento por elemento es varias veces más lento que una lista
+        return zip(df['ID_REGISTRO'].tolist(), df['profesor_ID'].tolist(), df['periodo'].tolist(),
+                   publicado.tolist(), sin_metodo.tolist())
+
+    def _sumar(self, aporte, signo):
+        profesor, periodo, publicado, sin_metodo = aporte
+        self.total[periodo] += signo
+        if publicado:
+            self.publicados[periodo] += signo
+        else:
+            self.borradores[(profesor, periodo)] += signo
+        if sin_metodo:
+            self.sin_metodo[(profesor, periodo)] += signo
+
+    def reconstruir(self, df):
+        """Recalcula todos los contadores (al cargar el DataFrame de trabajo)."""
+        self.limpiar()
+        for registro_id, *aporte in self._calcular_aportes(df):
+            self._aportes[registro_id] = tuple(aporte) # Un ID repetido se queda con su última fila
+        # Counter.update cuenta en C, sin pasar por _sumar fila por fila
+        aportes = self._aportes.values()
+        self.total.update(periodo for _, periodo, _, _ in aportes)
+        self.publicados.update(periodo for _, periodo, publicado, _ in aportes if publicado)
+        self.borradores.update((profesor, periodo) for profesor, periodo, publicado, _ in aportes if not publicado)
+        self.sin_metodo.update((profesor, periodo) for profesor, periodo, _, sin_metodo in aportes if sin_metodo)
+
+    def actualizar(self, df, registros=None):
+        """Actualiza los contadores de las filas indicadas (o de todas) restando su aporte anterior."""
+        filas = df if registros is None else df[df['ID_REGISTRO'].isin(set(registros))]
+        for registro_id, *aporte in self._calcular_aportes(filas):
+            anterior = self._aportes.get(registro_id)
+            if anterior is not None:
+                self._sumar(anterior, -1)
+            self._aportes[registro_id] = tuple(aporte)
+            self._sumar(aporte, 1)
+
+    def completitud(self, periodo):
+        """(publicados, total) de un periodo."""
+        return self.publicados[periodo], self.total[periodo]
+
+    def periodo_publicado(self, periodo):
+        """Un periodo está publicado cuando tiene registros y todos están publicados."""
+        publicados, total = self.completitud(periodo)
+        return total > 0 and publicados == total
+
+indice_alertas = IndiceAlertas()
+
+class AgregadoPromedios:
+    """
+    promedio_general materializado por (estudiante_ID, profesor_ID): el profesor identifica la
+    asignatura. Es el promedio de las notas publicadas de P1 a P4 y se actualiza solo para las
+    claves de las filas guardadas, sin reagrupar la tabla completa en cada guardado.
+    Las notas se suman siempre en el orden de PERIODOS, igual que calcular_promedios_lote(),
+    así ambos caminos dan exactamente el mismo resultado.
+    """
+    def __init__(self):
+        self.limpiar()
+
+    def limpiar(self):
+        self._notas = {}   # (estudiante, profesor) -> {periodo: (ID_REGISTRO, nota)}
+        self._aportes = {} # ID_REGISTRO -> (clave, periodo) con el que aporta al promedio
+        self._filas = {}   # (estudiante, profesor) -> IDs de registro de esa clave
+        self._claves = {}  # ID_REGISTRO -> clave en la que está en _filas
+
+    def promedio(self, clave):
+        """Promedio de una clave (NaN si aún no tiene notas publicadas)."""
+        notas = self._notas.get(clave)
+        if not notas:
+            return np.nan
+        suma, cantidad = 0.0, 0
+        for periodo in PERIODOS:
+            if periodo in notas:
+                suma += notas[periodo][1]
+                cantidad += 1
+        return round(suma / cantidad, 2)
+
+    def _mover(self, registro_id, clave):
+        """Deja el ID en _filas de 'clave'; devuelve la clave anterior si la fila cambió de clave."""
+        anterior = self._claves.get(registro_id)
+        self._claves[registro_id] = clave
+        self._filas.setdefault(clave, set()).add(registro_id)
+        if anterior is None or anterior == clave:
+            return None
+        self._filas[anterior].discard(registro_id)
+        return anterior
+
+    def _quitar(self, registro_id):
+        aporte = self._aportes.pop(registro_id, None)
+        if aporte is None:
+            return
+        clave, periodo = aporte
+        notas = self._notas.get(clave, {})
+        if periodo in notas and notas[periodo][0] == registro_id:
+            del notas[periodo]
+
+    def actualizar(self, df, registros=None):
+        """
+        Incorpora las filas indicadas (o todas), recalcula el promedio de sus claves y lo escribe
+        en todas las filas de esas claves. Devuelve los IDs cuyo promedio_general cambió.
+        """
+        filas = df if registros is None else df[df['ID_REGISTRO'].isin(set(registros))]
+        notas = pd.to_numeric(filas['P_NOTA_FINAL'], errors='coerce').to_numpy()
+        publicado = (filas['estado_publicacion'] == True).to_numpy()
+        claves_afectadas = set()
+        for registro_id, estudiante, profesor, periodo, nota, es_publicada in zip(
+                filas['ID_REGISTRO'].tolist(), filas['estudiante_ID'].tolist(), filas['profesor_ID'].tolist(),
+                filas['periodo'].tolist(), notas.tolist(), publicado.tolist()):
+            clave = (estudiante, profesor)
+            anterior = self._aportes.get(registro_id)
+            if anterior is not None:
+                claves_afectadas.add(anterior[0])
+            self._quitar(registro_id)
+            clave_anterior = self._mover(registro_id, clave)
+            if clave_anterior is not None:
+                claves_afectadas.add(clave_anterior)
+            claves_afectadas.add(clave)
+            if es_publicada and periodo in PERIODOS and nota == nota: # nota == nota descarta NaN
+                self._notas.setdefault(clave, {})[periodo] = (registro_id, nota)
+                self._aportes[registro_id] = (clave, periodo)
+
+        nuevos = {}
+        for clave in claves_afectadas:
+            promedio = self.promedio(clave)
+            for registro_id in self._filas.get(clave, ()):
+                nuevos[registro_id] = promedio
+        if not nuevos:
+            return set()
+        mascara = df['ID_REGISTRO'].isin(nuevos.keys())
+        calculados = df.loc[mascara, 'ID_REGISTRO'].map(nuevos)
+        cambiaron = _difieren(calculados, df.loc[mascara, 'promedio_general'])
+        df.loc[mascara, 'promedio_general'] = calculados.astype(float)
+        return set(df.loc[mascara, 'ID_REGISTRO'][cambiaron])
+
+    def reconstruir(self, df):
+        """Recalcula todo el agregado y la columna promedio_general (al cargar los datos)."""
+        self.limpiar()
+        df['promedio_general'] = calcular_promedios_lote(df)
+        # El estado incremental se llena sin tocar la columna recién calculada
+        publicado = (df['estado_publicacion'] == True).to_numpy()
+        notas = pd.to_numeric(df['P_NOTA_FINAL'], errors='coerce').to_numpy().tolist()
+        for registro_id, estudiante, profesor, periodo, nota, es_publicada in zip(
+                df['ID_REGISTRO'].tolist(), df['estudiante_ID'].tolist(), df['profesor_ID'].tolist(),
+                df['periodo'].tolist(), notas, publicado.tolist()):
+            clave = (estudiante, profesor)
+            self._mover(registro_id, clave)
+            self._quitar(registro_id)
+            if es_publicada and periodo in PERIODOS and nota == nota:
+                self._notas.setdefault(clave, {})[periodo] = (registro_id, nota)
+                self._aportes[registro_id] = (clave, periodo)
+
+agregado_promedios = AgregadoPromedios()
+
+def calcular_promedios_lote(df):
+    """
+    Recalcula promedio_general de todas las filas con groupby/pivot (recomputación completa).
+    Devuelve una Serie float alineada con df; NaN donde no hay notas publicadas.
+    """
+    publicados = df[(df['estado_publicacion'] == True) & df['periodo'].isin(PERIODOS)]
+    tabla = pd.DataFrame({
+        'estudiante_ID': publicados['estudiante_ID'],
+        'profesor_ID': publicados['profesor_ID'],
+        'periodo': publicados['periodo'],
+        'nota': pd.to_numeric(publicados['P_NOTA_FINAL'], errors='coerce'),
+    }).dropna(subset=['nota']).drop_duplicates(['estudiante_ID', 'profesor_ID', 'periodo'], keep='last')
+    resultado = pd.Series(np.nan, index=df.index, dtype=float)
+    if tabla.empty:
+        return resultado
+
+    matriz = tabla.pivot(index=['estudiante_ID', 'profesor_ID'], columns='periodo', values='nota').reindex(columns=PERIODOS)
+    # Suma en el orden fijo P1..P4 (mismo orden que el camino incremental)
+    suma = pd.Series(0.0, index=matriz.index)
+    for periodo in PERIODOS:
+        suma = suma + matriz[periodo].fillna(0.0)
+    promedios = pd.Series(_redondear_como_python((suma / matriz.notna().sum(axis=1)).to_numpy()), index=matriz.index)
+
+    claves = pd.MultiIndex.from_arrays([df['estudiante_ID'], df['profesor_ID']])
+    valores = promedios.reindex(claves).to_numpy()
+    con_promedio = ~pd.isna(valores)
+    resultado[con_promedio] = valores[con_promedio]
+    return resultado
+
+def verificar_promedios(df):
+    """
+    Comprueba que el agregado incremental coincide con la recomputación completa.
+    Devuelve la cantidad de filas que difieren (0 si ambos caminos concuerdan).
+    """
+    return int(_difieren(calcular_promedios_lote(df), df['promedio_general']).sum())
+
+def _difieren(a, b):
+    """Máscara de las posiciones donde dos Series de promedios difieren (NaN es igual a NaN)."""
+    a, b = pd.to_numeric(a, errors='coerce').to_numpy(float), pd.to_numeric(b, errors='coerce').to_numpy(float)
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+# --- 4. FUNCIONES DE UTILIDAD Y CÁLCULO ---
+
+@instrumentar()
+def verificar_permiso(user_id, accion):
+    """Verifica si el usuario tiene permiso para realizar una acción."""
+    rol = USUARIOS_MOCK.get(user_id)
+    if rol is None:
+        print("Error: Usuario no encontrado.")
+        return False
+    return MOTOR_PERMISOS.permite(rol, accion)
+
+@instrumentar(filas='resultado')
+def verificar_permiso_lote(user_ids, accion):
+    """Versión en lote de verificar_permiso: una lista de bool (usuarios desconocidos = False, sin avisos)."""
+    return MOTOR_PERMISOS.permite_lote([USUARIOS_MOCK.get(user_id) for user_id in user_ids], accion)
+
+def permisos_de_usuario(user_id):
+    """Permisos del usuario como mapeo inmutable compartido ({permiso: bool}); None si no existe."""
+    return MOTOR_PERMISOS.permisos(USUARIOS_MOCK.get(user_id))
+
+@instrumentar(filas=lambda resultado, detalles: 1)
+def calcular_nota_final(detalles):
+    """Calcula la nota final (0-100) usando los pesos ponderados."""
+    nota_final = 0
+    for campo, peso in PESOS_CALIFICACION.items():
+        try:
+            # Asumimos que los valores en detalles están entre 0 y 100
+            valor = float(detalles.get(campo, 0)) 
+            nota_final += valor * peso
+        except ValueError:
+            # Manejo de error si el valor no es numérico
+            print(f"Advertencia: El valor de '{campo}' no es numérico y se tratará como 0.")
+    return round(nota_final, 2)
+
+@instrumentar(filas=lambda resultado, *args: 1)
+def convertir_a_letra(nota, version_escala=None):
+    """Convierte la nota numérica a la escala tradicional (A+, A, F, etc.) de la versión indicada."""
+    return ESCALAS.letra(nota, version_escala)
+
+def _redondear_como_python(valores, decimales=2):
+    """
+    Redondea un arreglo dando exactamente el mismo resultado que round() de Python.
+    np.round puede diferir solo cuando el valor queda casi en la mitad (ej. 89.125),
+    así que esos pocos casos se redondean uno por uno con round().
+    """
+    redondeado = np.round(valores, decimales)
+    escalado = valores * (10 ** decimales)
+    dudosos = np.abs(escalado - np.floor(escalado) - 0.5) < 1e-6
+    if dudosos.any():
+        redondeado[dudosos] = [round(float(v), decimales) for v in valores[dudosos]]
+    return redondeado
+
+def _matriz_componentes(datos):
+    """
+    Convierte la entrada de calcular_notas_lote en un DataFrame numérico (una columna por campo)
+    más una máscara de filas con valores no numéricos.
+    """
+    if isinstance(datos, pd.DataFrame):
+        if all(columna in datos.columns for columna in COLUMNAS_CAMPOS.values()):
+            # Formato de almacenamiento: columnas P_<campo>
+            componentes = datos[list(COLUMNAS_CAMPOS.values())].set_axis(CALIFICACION_CAMPOS, axis=1)
+        elif all(campo in datos.columns for campo in CALIFICACION_CAMPOS):
+            componentes = datos[CALIFICACION_CAMPOS]
+        elif 'P_DETALLES_JSON' in datos.columns:
+            # Formato antiguo: un JSON por fila con las notas de cada campo
+            detalles = [json.loads(d) if isinstance(d, str) else {} for d in datos['P_DETALLES_JSON']]
+            componentes = pd.DataFrame(detalles, index=datos.index).reindex(columns=CALIFICACION_CAMPOS)
+        else:
+            raise ValueError(f"El DataFrame debe tener las columnas {list(COLUMNAS_CAMPOS.values())}, {CALIFICACION_CAMPOS} o 'P_DETALLES_JSON'.")
+    else:
+        matriz = np.asarray(datos)
+        if matriz.ndim != 2 or matriz.shape[1] != len(CALIFICACION_CAMPOS):
+            raise ValueError(f"La matriz debe tener forma (n, {len(CALIFICACION_CAMPOS)}) en el orden de CALIFICACION_CAMPOS.")
+        componentes = pd.DataFrame(matriz, columns=CALIFICACION_CAMPOS)
+
+    numericos = componentes.apply(pd.to_numeric, errors='coerce')
+    # Un valor presente que no se pudo convertir a número es inválido (igual que el ValueError del cálculo escalar)
+    invalidos = (componentes.notna() & numericos.isna()).any(axis=1)
+    # Campos ausentes o inválidos cuentan como 0, como en calcular_nota_final
+    return numericos.fillna(0.0).astype(float), invalidos
+
+@instrumentar(filas='resultado')
+def calcular_notas_lote(datos):
+    """
+    Calcula la nota final y la letra de muchos registros a la vez.
+    'datos' puede ser una matriz (n x campos, en el orden de CALIFICACION_CAMPOS), un DataFrame
+    con las columnas de almacenamiento (P_<campo>), uno con los nombres de los campos o uno
+    del formato antiguo con la columna 'P_DETALLES_JSON'.
+    Devuelve un DataFrame con 'P_NOTA_FINAL', 'P_LETRA' y 'valores_invalidos' por fila.
+    El resultado es idéntico al de calcular_nota_final() + convertir_a_letra() fila por fila.
+    """
+    componentes, invalidos = _matriz_componentes(datos)
+    valores = componentes.to_numpy()
+
+    # Producto ponderado: se acumula campo por campo en el mismo orden que la versión escalar
+    # para que la suma de punto flotante sea exactamente igual (bit a bit).
+    nota = np.zeros(len(valores))
+    for j, peso in enumerate(PESOS_CALIFICACION.values()):
+        nota = nota + valores[:, j] * peso
+    nota = _redondear_como_python(nota, 2)
+
+    if invalidos.any():
+        print(f"Advertencia: {int(invalidos.sum())} registros tienen valores no numéricos; se tratarán como 0.")
+
+    return pd.DataFrame({
+        'P_NOTA_FINAL': nota,
+        'P_LETRA': convertir_a_letra_lote(nota),
+        'valores_invalidos': invalidos.to_numpy(),
+    }, index=componentes.index)
+
+@instrumentar(filas='resultado')
+def convertir_a_letra_lote(notas, versiones_escala=None):
+    """Versión vectorizada de convertir_a_letra para una columna completa de notas."""
+    return ESCALAS.letras(notas, versiones_escala)
+
+@instrumentar()
+def check_alerts(df, user_id):
+    """
+    Verifica y muestra alertas de periodos incompletos o vencidos.
+    Usa los contadores de indice_alertas (O(1) por periodo), así revisa todos los periodos.
+    """
+    rol = USUARIOS_MOCK.get(user_id)
+    
+    # Solo Profesores, Admin, Director, Registro reciben alertas
+    if rol not in [ROLES['PROFESOR'], ROLES['ADMIN'], ROLES['DIRECTOR'], ROLES['REGISTRO']]:
+        return
+        
+    alertas = []
+    
+    for periodo in PERIODOS:
+        # 1. Alerta de campos obligatorios sin llenar (Metodología/Nota)
+        total_pendientes = indice_alertas.sin_metodo[(user_id, periodo)]
+        if total_pendientes:
+            alertas.append(f"¡ALERTA! Tienes {total_pendientes} calificaciones en borrador para el {periodo} sin el 'Método de Enseñanza' obligatorio. No se podrán publicar.")
+
+        # Borradores completos que todavía no se publicaron
+        listos = indice_alertas.borradores[(user_id, periodo)] - total_pendientes
+        if listos:
+            alertas.append(f"Tienes {listos} calificaciones del {periodo} listas pero sin publicar.")
+
+    # 2. Alerta de periodo vencido 
+    
+    if rol in [ROLES['DIRECTOR'], ROLES['ADMIN']]:
+        for periodo in PERIODOS:
+            publicados, total = indice_alertas.completitud(periodo)
+            if total and publicados < total:
+                alertas.append(f"¡ALERTA ADMINISTRATIVA! El Periodo {periodo} no ha sido publicado completamente ({publicados}/{total}). Esto debe corregirse para pasar al siguiente periodo.")
+
+    if alertas:
+        print("\n" + "="*50)
+        print(f"ALERTA DEL SISTEMA - Usuario {rol} ({user_id}):")
+        for a in alertas:
+            print(f"-> {a}")
+        print("="*50 + "\n")
+
+def periodo_habilitado(user_id, periodo):
+    """
+    Un periodo no puede avanzar hasta que el anterior esté publicado por completo.
+    Quien puede anular alertas (Director/a) puede trabajar en cualquier periodo.
+    """
+    posicion = PERIODOS.index(periodo)
+    if posicion == 0 or verificar_permiso(user_id, 'anular_alerta'):
+        return True
+    anterior = PERIODOS[posicion - 1]
+    if indice_alertas.periodo_publicado(anterior):
+        return True
+    publicados, total = indice_alertas.completitud(anterior)
+    print(f"El {periodo} no está habilitado: el {anterior} aún no se publica por completo ({publicados}/{total} calificaciones publicadas).")
+    return False
+
+
+# --- 5. LÓGICA DE INTERACCIÓN POR TERMINAL (MENÚS Y FLUJOS) ---
+
+def menu_login():
+    """
+    Menú de inicio de sesión.
+    Permite salir del sistema escribiendo 'X'.
+    """
+    print("\n--- Sistema de Calificaciones Académicas ---")
+    print("Inicie sesión con su ID de usuario o escriba 'X' para salir.")
+    
+    while True:
+        # Convertir a mayúsculas para manejar 'x' o 'X'
+        user_id = input("Ingrese su ID de Usuario: ").strip().upper() 
+        
+        if user_id == 'X':
+            print("Saliendo del sistema.")
+            # Retornar None, None para indicar que se debe romper el bucle principal
+            return None, None 
+            
+        if user_id in USUARIOS_MOCK:
+            rol = USUARIOS_MOCK[user_id]
+            print(f"\nBienvenido/a, {rol} (ID: {user_id}).")
+            return user_id, rol
+        else:
+            print("ID no válido. Intente de nuevo o escriba 'X' para salir.")
+
+def gestionar_calificaciones(df, user_id, periodo='P1'):
+    """
+    Permite al profesor llenar, guardar y publicar calificaciones para múltiples estudiantes.
+    """
+    
+    if not verificar_permiso(user_id, 'llenar_notas'):
+        print("Permiso denegado: No tienes permiso para llenar calificaciones.")
+        return df
+
+    print(f"\n--- GESTIÓN DE CALIFICACIONES - PERIODO {periodo} ---")
+    
+    # Simulación de estudiantes en el curso del profesor (para el ejemplo, todos los estudiantes)
+    estudiantes_ids = [k for k, v in USUARIOS_MOCK.items() if v == ROLES['ESTUDIANTE']]
+    if not estudiantes_ids:
+        print("No hay estudiantes registrados.")
+        return df
+        
+    print(f"Estudiantes a calificar: {', '.join(estudiantes_ids)}")
+    
+    nuevos_registros = []
+    ids_modificados = [] # ID_REGISTRO de las filas que se deben guardar en el journal
+    
+    for est_id in estudiantes_ids:
+        
+        # Buscar registro existente (borrador o publicado)
+        # Aseguramos que est_id sea string antes de filtrar por si acaso
+        registro_existente = df[
+            (df['estudiante_ID'] == str(est_id)) & 
+            (df['periodo'] == periodo)
+        ]
+        
+        is_published = False
+        
+        if not registro_existente.empty:
+            record = registro_existente.iloc[0]
+            is_published = record['estado_publicacion']
+            
+            # Bloquear si ya está publicado y el usuario no es Director/Registro
+            if is_published and not verificar_permiso(user_id, 'modificar_publicada'):
+                print(f"-> Estudiante {est_id}: Calificación de {periodo} YA PUBLICADA y bloqueada para usted.")
+                continue
+
+            print(f"\n[EDITANDO] Calificación existente para Estudiante {est_id}.")
+            # Notas previas de cada campo (columnas numéricas P_<campo>)
+            detalles_previos = detalles_de_registro(record)
+                
+            metodo_previo = record['P_METODO_ENS']
+        else:
+            print(f"\n[NUEVO] Llenando calificación para Estudiante {est_id}.")
+            detalles_previos = {}
+            metodo_previo = ""
+
+
+        # Llenado de campos de calificación
+        detalles_notas = {}
+        for campo in CALIFICACION_CAMPOS:
+            prompt = f"Ingrese nota para '{campo}' ({int(PESOS_CALIFICACION[campo]*100)}%): "
+            while True:
+                try:
+                    # Usar valor previo si existe
+                    valor_defecto = detalles_previos.get(campo, 0)
+                    nota_input = input(f"{prompt} (Actual: {valor_defecto}): ") or str(valor_defecto)
+                    nota = float(nota_input)
+                    if 0 <= nota <= 100:
+                        detalles_notas[campo] = nota
+                        break
+                    else:
+                        print("La nota debe estar entre 0 y 100.")
+                except ValueError:
+                    print("Entrada no válida. Ingrese un número.")
+
+        # Llenado del Método de Enseñanza (Obligatorio)
+        metodo_ens = input(f"Método de Enseñanza (OBLIGATORIO) (Actual: {metodo_previo}): ") or metodo_previo
+        if not metodo_ens:
+            print("ADVERTENCIA: El campo 'Método de Enseñanza' es obligatorio para la publicación.")
+            
+        # Cálculo y Preparación del Registro
+        nota_final = calcular_nota_final(detalles_notas)
+        
+        nuevo_registro = {
+            'estudiante_ID': est_id,
+            'profesor_ID': user_id,
+            'periodo': periodo,
+            'fecha_publicacion': ESTADO_INICIAL_NOTA, # Pendiente
+            'estado_publicacion': False,
+            'estado_revision': 'N/A',
+            'P_NOTA_FINAL': nota_final,
+            'P_METODO_ENS': metodo_ens,
+            # Una columna numérica por campo de calificación
+            **{COLUMNAS_CAMPOS[campo]: nota for campo, nota in detalles_notas.items()},
+            'promedio_general': ESTADO_INICIAL_NOTA # Lo calcula agregado_promedios al guardar
+        }
+        
+        if registro_existente.empty:
+            # Nuevo registro: Generar nuevo ID de registro
+            nuevo_registro['ID_REGISTRO'] = id_manager.generar_id_registro((est_id, periodo, user_id, datetime.now()))
+            nuevo_registro['version'] = 0
+            nuevos_registros.append(nuevo_registro)
+            ids_modificados.append(nuevo_registro['ID_REGISTRO'])
+        else:
+            # Actualizar registro existente (inplace en el DataFrame)
+            idx = registro_existente.index[0]
+            for key, val in nuevo_registro.items():
+                asignar_valores(df, idx, key, val)
+            ids_modificados.append(df.at[idx, 'ID_REGISTRO'])
+
+    # Agregar nuevos registros al DataFrame principal
+    if nuevos_registros:
+        df = concatenar_registros(df, pd.DataFrame(nuevos_registros))
+    
+    print("\n--- RESUMEN DE CAMBIOS ---")
+    # El DF actualizado ya tiene profesor_ID como string, el filtro es seguro.
+    print(df[df['profesor_ID'] == user_id].tail(len(estudiantes_ids))[['estudiante_ID', 'periodo', 'P_NOTA_FINAL', 'P_METODO_ENS', 'estado_publicacion']])
+    
+    if ids_modificados:
+        persistencia.programar(df, ids_modificados)
+
+    # Pregunta de Publicación
+    confirmacion = input("\n¿Desea PUBLICAR las calificaciones de este periodo ahora? (Escriba 'si' para publicar): ").strip().lower()
+    if confirmacion == 'si':
+        # Publica todos los borradores del profesor en este periodo, en una sola transacción
+        df, _ = publicar_calificaciones_lote(df, user_id, periodo)
+    return df
+
+def solicitar_revision(df, user_id, periodo='P1'):
+    """Permite al estudiante 'apelar' una calificación."""
+    
+    registro = df[
+        (df['estudiante_ID'] == user_id) & 
+        (df['periodo'] == periodo) &
+        (df['estado_publicacion'] == True)
+    ]
+    
+    if registro.empty:
+        print("No hay calificaciones publicadas para este periodo que puedas apelar.")
+        return df
+        
+    print(f"\n--- SOLICITUD DE REVISIÓN DE CALIFICACIÓN ({periodo}) ---")
+    
+    idx = registro.index[0]
+    
+    estado = df.at[idx, 'estado_revision']
+    if estado == 'PENDIENTE':
+        print("Tu solicitud de revisión ya está PENDIENTE. Espera la respuesta del profesor.")
+        return df
+        
+    if estado == 'RESUELTA':
+        print("Tu solicitud anterior fue RESUELTA. Si la nota es incorrecta, habla con tu profesor/a.")
+        return df
+
+    comentario = input("Explica brevemente por qué solicitas la revisión de tu nota: ")
+    if not comentario:
+        print("Solicitud cancelada. Se requiere un comentario.")
+        return df
+        
+    asignar_valores(df, idx, 'estado_revision', 'PENDIENTE')
+    # En una app real, aquí se notificaría al profesor asignado
+    print("\n¡Tu solicitud de revisión ha sido enviada! El profesor será notificado.")
+    persistencia.programar(df, [df.at[idx, 'ID_REGISTRO']])
+    return df
+
+# --- 5b. IMPORTACIÓN MASIVA DE CALIFICACIONES (SIN PROMPTS) ---
+
+def _leer_archivo_calificaciones(ruta_archivo):
+    """Lee un archivo .csv o .json (lista de objetos) con las notas de una sección."""
+    extension = os.path.splitext(ruta_archivo)[1].lower()
+    if extension == '.csv':
+        lote = pd.read_csv(ruta_archivo, encoding='utf-8', dtype={'estudiante_ID': str})
+    elif extension == '.json':
+        with open(ruta_archivo, 'r', encoding='utf-8') as f:
+            lote = pd.DataFrame(json.load(f))
+    else:
+        raise ValueError("Formato no soportado. Use un archivo .csv o .json.")
+    # Se aceptan tanto los nombres de los campos ('Participacion') como los de las columnas ('P_Participacion')
+    return lote.rename(columns={columna: campo for campo, columna in COLUMNAS_CAMPOS.items()})
+
+def _validar_lote(lote):
+    """
+    Valida todas las filas del archivo a la vez.
+    Devuelve (componentes numéricos, lista de errores 'fila N: motivo').
+    """
+    errores = []
+    if 'estudiante_ID' not in lote.columns:
+        return None, ["falta la columna 'estudiante_ID'"]
+    faltan_columnas = [campo for campo in CALIFICACION_CAMPOS if campo not in lote.columns]
+    if faltan_columnas:
+        return None, [f"faltan las columnas de calificación: {', '.join(faltan_columnas)}"]
+
+    estudiantes = lote['estudiante_ID'].astype(str).str.strip()
+    componentes = lote[CALIFICACION_CAMPOS].apply(pd.to_numeric, errors='coerce')
+
+    # Máscaras de validación (una por regla, calculadas sobre todo el archivo)
+    no_estudiante = estudiantes.map(USUARIOS_MOCK) != ROLES['ESTUDIANTE']
+    duplicado = estudiantes.duplicated(keep=False)
+    vacio = lote[CALIFICACION_CAMPOS].isna()
+    no_numerico = ~vacio & componentes.isna()
+    fuera_rango = (componentes < 0) | (componentes > 100)
+    con_error = no_estudiante | duplicado | (vacio | no_numerico | fuera_rango).any(axis=1)
+
+    # Solo las filas con problemas se recorren para armar los mensajes
+    for idx in lote.index[con_error]:
+        fila = f"fila {idx + 1} (estudiante {estudiantes[idx]})"
+        if no_estudiante[idx]:
+            errores.append(f"{fila}: el ID no corresponde a un estudiante registrado")
+        if duplicado[idx]:
+            errores.append(f"{fila}: el estudiante aparece más de una vez en el archivo")
+        for campo in CALIFICACION_CAMPOS:
+            if vacio.at[idx, campo]:
+                errores.append(f"{fila}: falta la nota de '{campo}'")
+            elif no_numerico.at[idx, campo]:
+                errores.append(f"{fila}: la nota de '{campo}' no es numérica")
+            elif fuera_rango.at[idx, campo]:
+                errores.append(f"{fila}: la nota de '{campo}' debe estar entre 0 y 100")
+
+    componentes.insert(0, 'estudiante_ID', estudiantes)
+    return componentes, errores
+
+def importar_calificaciones_lote(df, user_id, ruta_archivo, periodo='P1', metodo_ens=None, publicar=False):
+    """
+    Importa las notas de toda una sección desde un archivo .csv o .json, sin prompts.
+    Columnas: 'estudiante_ID', una por campo de CALIFICACION_CAMPOS y, opcionalmente, 'P_METODO_ENS'
+    (si falta se usa 'metodo_ens'). Si alguna fila es inválida no se importa nada.
+    Los registros del profesor en ese periodo se actualizan en un solo merge por estudiante
+    y se guardan una única vez; la publicación (opcional) de lo importado es la transacción
+    de publicar_calificaciones_lote.
+    """
+    if not verificar_permiso(user_id, 'llenar_notas'):
+        print("Permiso denegado: No tienes permiso para llenar calificaciones.")
+        return df
+
+    try:
+        lote = _leer_archivo_calificaciones(ruta_archivo)
+    except (OSError, ValueError, pd.errors.ParserError) as e:
+        print(f"Error al leer el archivo de calificaciones: {e}")
+        return df
+
+    componentes, errores = _validar_lote(lote)
+    if errores:
+        print(f"\nIMPORTACIÓN CANCELADA: {len(errores)} errores en '{ruta_archivo}'.")
+        for error in errores:
+            print(f"-> {error}")
+        return df
+    if componentes.empty:
+        print("El archivo no contiene calificaciones.")
+        return df
+
+    # Cálculo de todas las notas en lote
+    notas = calcular_notas_lote(componentes[CALIFICACION_CAMPOS])
+    metodos = lote['P_METODO_ENS'] if 'P_METODO_ENS' in lote.columns else pd.Series(pd.NA, index=lote.index)
+    metodos = metodos.where(metodos.notna() & (metodos.astype(str).str.strip() != ''), metodo_ens or ESTADO_INICIAL_NOTA)
+
+    nuevos = pd.DataFrame({
+        'estudiante_ID': componentes['estudiante_ID'],
+        'profesor_ID': user_id,
+        'periodo': periodo,
+        'fecha_publicacion': ESTADO_INICIAL_NOTA, # Pendiente
+        'estado_publicacion': False,
+        'estado_revision': 'N/A',
+        'P_NOTA_FINAL': notas['P_NOTA_FINAL'],
+        'P_METODO_ENS': metodos,
+        **{COLUMNAS_CAMPOS[campo]: componentes[campo] for campo in CALIFICACION_CAMPOS},
+        'promedio_general': ESTADO_INICIAL_NOTA,
+        'version_escala': None, # Se asigna al publicar
+    })
+
+    # Merge por estudiante con los registros que el profesor ya tiene en este periodo
+    existentes = df.loc[
+        (df['profesor_ID'] == user_id) & (df['periodo'] == periodo),
+        ['estudiante_ID', 'ID_REGISTRO', 'estado_publicacion']
+    ].rename_axis('_fila').reset_index().drop_duplicates('estudiante_ID')
+    nuevos = nuevos.merge(existentes.rename(columns={'estado_publicacion': '_publicado'}), on='estudiante_ID', how='left')
+
+    # Las notas ya publicadas solo las puede cambiar quien tiene 'modificar_publicada'
+    bloqueados = (nuevos['_publicado'] == True)
+    if bloqueados.any() and not verificar_permiso(user_id, 'modificar_publicada'):
+        print(f"-> {int(bloqueados.sum())} estudiantes omitidos: su calificación de {periodo} YA ESTÁ PUBLICADA.")
+        nuevos = nuevos[~bloqueados]
+
+    # La versión de las filas existentes la maneja guardar_datos (control de concurrencia)
+    columnas_datos = [c for c in COLUMNS if c not in ('ID_REGISTRO', 'version')]
+    actualizar = nuevos[nuevos['_fila'].notna()]
+    crear = nuevos[nuevos['_fila'].isna()].copy()
+
+    # Actualización de los existentes en una sola asignación
+    if not actualizar.empty:
+        filas = actualizar['_fila'].astype(int).to_numpy()
+        for columna in columnas_datos:
+            asignar_valores(df, filas, columna, actualizar[columna].to_numpy())
+
+    # Creación de los nuevos con su ID de registro y un único concat
+    if not crear.empty:
+        ahora = datetime.now()
+        crear['ID_REGISTRO'] = [
+            id_manager.generar_id_registro((est_id, periodo, user_id, ahora, i))
+            for i, est_id in enumerate(crear['estudiante_ID'])
+        ]
+        crear['version'] = 0
+        df = concatenar_registros(df, crear[COLUMNS])
+
+    ids_modificados = list(actualizar['ID_REGISTRO']) + list(crear['ID_REGISTRO'] if not crear.empty else [])
+    print(f"\nImportación completada: {len(crear)} registros nuevos y {len(actualizar)} actualizados para {periodo}.")
+
+    # Una sola escritura de lo importado
+    persistencia.programar(df, ids_modificados)
+
+    if publicar and verificar_permiso(user_id, 'publicar_notas'):
+        df, _ = publicar_calificaciones_lote(df, user_id, periodo, registros=ids_modificados)
+    return df
+
+# Columnas que cambia la publicación (se restauran si la publicación en lote falla)
+COLUMNAS_PUBLICACION = ['estado_publicacion', 'fecha_publicacion', 'version_escala']
+
+def _motivos_no_publicable(df, borradores):
+    """
+    Máscaras vectorizadas de los requisitos para publicar, sobre las filas 'borradores'.
+    Devuelve {motivo: máscara booleana} (True = la fila no cumple ese requisito).
+    """
+    metodos = df.loc[borradores, 'P_METODO_ENS']
+    return {
+        "falta el 'Método de Enseñanza' (obligatorio para publicar)":
+            _falta_metodo(metodos),
+        "no tiene nota final calculada": pd.to_numeric(df.loc[borradores, 'P_NOTA_FINAL'], errors='coerce').isna(),
+    }
+
+def publicar_calificaciones_lote(df, user_id, periodo='P1', profesor_id=None, registros=None):
+    """
+    Publica en una sola transacción todos los borradores de (profesor, periodo) que cumplen los
+    requisitos ('Método de Enseñanza' y nota final); con 'registros' solo los de esos ID_REGISTRO
+    (lo recién importado). Un profesor publica lo suyo; la sección de otro profesor requiere
+    además 'modificar_publicada'.
+    Se escribe una sola vez con guardar_datos(todo_o_nada=True): si falla o hay un conflicto con
+    otra terminal no se publica ninguno y el DataFrame vuelve a su estado anterior.
+    Devuelve (df, resultado) con 'exito', 'publicados' (ID_REGISTRO) y 'omitidos'
+    (DataFrame con ID_REGISTRO, estudiante_ID y motivo de cada borrador que no se publicó).
+    """
+    profesor_id = user_id if profesor_id is None else str(profesor_id)
+    omitidos = pd.DataFrame(columns=['ID_REGISTRO', 'estudiante_ID', 'motivo'])
+    resultado = {'exito': False, 'publicados': [], 'omitidos': omitidos}
+
+    # Una sola resolución de permisos para todo el lote
+    permisos = permisos_de_usuario(user_id) or {}
+    if not permisos.get('publicar_notas') or (profesor_id != user_id and not permisos.get('modificar_publicada')):
+        print("Permiso denegado: No tienes permiso para publicar estas calificaciones.")
+        return df, resultado
+
+    seccion = (df['profesor_ID'] == profesor_id) & (df['periodo'] == periodo) & (df['estado_publicacion'] != True)
+    if registros is not None:
+        seccion &= df['ID_REGISTRO'].isin(registros)
+    borradores = df.index[seccion]
+    motivos = _motivos_no_publicable(df, borradores)
+    no_publicable = pd.Series(False, index=borradores)
+    for mascara in motivos.values():
+        no_publicable |= mascara
+    idx_a_publicar = borradores[~no_publicable.to_numpy()]
+
+    # Motivos por fila solo para las filas omitidas
+    if no_publicable.any():
+        omitidos = pd.concat([
+            df.loc[mascara.index[mascara.to_numpy()], ['ID_REGISTRO', 'estudiante_ID']].assign(motivo=motivo)
+            for motivo, mascara in motivos.items() if mascara.any()
+        ], ignore_index=True)
+        resultado['omitidos'] = omitidos
+        for registro_id, estudiante, motivo in zip(omitidos['ID_REGISTRO'], omitidos['estudiante_ID'], omitidos['motivo']):
+            print(f"-> Omitido {registro_id} (estudiante {estudiante}): {motivo}")
+
+    if idx_a_publicar.empty:
+        print(f"\nADVERTENCIA: No hay calificaciones de {periodo} en condiciones de publicarse.")
+        return df, resultado
+
+    # Transacción: se guarda el estado anterior de las filas para poder deshacer la publicación
+    anterior = df.loc[idx_a_publicar, COLUMNAS_PUBLICACION + ['version']].copy()
+    ids_a_publicar = df.loc[idx_a_publicar, 'ID_REGISTRO'].tolist()
+    asignar_valores(df, idx_a_publicar, 'estado_publicacion', True)
+    asignar_valores(df, idx_a_publicar, 'fecha_publicacion', ahora_publicacion())
+    asignar_valores(df, idx_a_publicar, 'version_escala', ESCALAS.vigente)
+
+    if not guardar_datos(df, ids_a_publicar, todo_o_nada=True):
+        # Las filas que otra terminal cambió ya tienen su versión guardada; el resto se restaura
+        sin_cambios = anterior.index[(df.loc[anterior.index, 'version'] == anterior['version']).to_numpy()]
+        for columna in COLUMNAS_PUBLICACION:
+            asignar_valores(df, sin_cambios, columna, anterior.loc[sin_cambios, columna].to_numpy())
+        agregado_promedios.actualizar(df, ids_a_publicar)
+        indice_alertas.actualizar(df, ids_a_publicar)
+        print(f"\nPUBLICACIÓN CANCELADA: no se publicó ninguna de las {len(ids_a_publicar)} calificaciones de {periodo}.")
+        return df, resultado
+
+    resultado.update(exito=True, publicados=ids_a_publicar)
+    print(f"\n¡ÉXITO! {len(ids_a_publicar)} calificaciones han sido publicadas y BLOQUEADAS para edición por el profesor.")
+    return df, resultado
+
+# --- 6. FLUJOS DE USUARIO ---
+
+def _pedir_filtros():
+    """Pregunta los filtros de la vista de registros; Enter deja el filtro sin usar."""
+    print("Filtros (Enter para no filtrar):")
+    filtros = {}
+    profesor = input("  ID de profesor: ").strip()
+    if profesor:
+        filtros['profesor_ID'] = profesor
+    periodo = input("  Periodo (P1-P4): ").strip().upper()
+    if periodo:
+        filtros['periodo'] = periodo
+    estado = input("  Estado ([P]ublicadas / [B]orradores): ").strip().upper()
+    if estado in ('P', 'B'):
+        filtros['estado_publicacion'] = estado == 'P'
+    estudiante = input("  ID de estudiante: ").strip()
+    if estudiante:
+        filtros['estudiante_ID'] = estudiante
+    return filtros
+
+def ver_registros_paginados(columnas):
+    """Muestra los registros filtrados de a TAMANO_PAGINA filas (sin cargar la tabla completa)."""
+    filtros = _pedir_filtros()
+    despues_de, numero = None, 1
+    while True:
+        pagina, despues_de = consultar_pagina(columnas, despues_de, **filtros)
+        if pagina.empty:
+            print("No hay registros que coincidan." if numero == 1 else "No hay más registros.")
+            return
+        print(f"\n--- Página {numero} ---")
+        print(pagina.to_string(index=False))
+        if despues_de is None or input("[Enter] Página siguiente / [X] Volver: ").strip().upper() == 'X':
+            return
+        numero += 1
+
+def flujo_estudiante(df, user_id):
+    """Menú y flujo para estudiantes."""
+    print("\n--- Menú Estudiante ---")
+    
+    while True:
+        instrumentacion.terminar_accion()
+        registros = consultar_registros(df, estudiante_ID=user_id)
+        print(f"\nCalificaciones disponibles ({len(registros)} periodos):")
+        
+        # Mostrar resumen de notas
+        if not registros.empty:
+            for _, r in registros.iterrows():
+                if r['estado_publicacion']:
+                    nota_letra = convertir_a_letra(r['P_NOTA_FINAL'], r.get('version_escala'))
+                    print(f"[{r['periodo']}] Nota: {r['P_NOTA_FINAL']} ({nota_letra}). Estado: Publicada.")
+                else:
+                    print(f"[{r['periodo']}] Nota: Pendiente de publicación.")
+        else:
+            print("No hay registros de calificación disponibles.")
+
+        print("\nOpciones:")
+        print("[1] Ver Detalles de Calificación (Requiere ID de Registro)")
+        print("[2] Solicitar Revisión (Apelación)")
+        print("[3] Cerrar Sesión")
+        
+        opcion = input("Seleccione una opción: ").strip()
+        instrumentacion.iniciar_accion(f"estudiante.{opcion}")
+        
+        if opcion == '1':
+            registro_id = normalizar_id_registro(input("Ingrese el ID de Registro para ver detalles: "))
+            reg = consultar_registros(df, ID_REGISTRO=registro_id, estudiante_ID=user_id)
+            
+            if reg.empty or not reg.iloc[0]['estado_publicacion']:
+                print("ID de registro no válido o nota no publicada.")
+                continue
+                
+            detalles = detalles_de_registro(reg.iloc[0])
+            print("\n--- DETALLES DE CALIFICACIÓN ---")
+            for campo, nota in detalles.items():
+                peso = PESOS_CALIFICACION.get(campo, 0) * 100
+                print(f"- {campo} ({peso:.1f}%): {nota}")
+            print(f"-> NOTA FINAL PERIODO: {reg.iloc[0]['P_NOTA_FINAL']}")
+            print(f"-> NOTA TRADICIONAL: {convertir_a_letra(reg.iloc[0]['P_NOTA_FINAL'], reg.iloc[0].get('version_escala'))}")
+            
+        elif opcion == '2':
+            # Asumimos que la apelación es sobre el último periodo
+            global flujo_global_df
+            flujo_global_df = solicitar_revision(df, user_id)
+            
+        elif opcion == '3':
+            break
+        else:
+            print("Opción no válida.")
+
+
+def flujo_profesor(df, user_id):
+    """Menú y flujo para profesores."""
+    # check_alerts ahora es seguro porque df siempre tiene las columnas.
+    check_alerts(df, user_id) 
+    
+    while True:
+        instrumentacion.terminar_accion()
+        print("\n--- Menú Profesor/a ---")
+        print("[1] Llenar/Editar/Publicar Calificaciones (P1, P2, P3, P4)")
+        print("[2] Revisar Solicitudes de Apelación")
+        print("[3] Ver Resumen de Calificaciones Publicadas")
+        print("[4] Importar Calificaciones desde Archivo (CSV/JSON)")
+        print("[5] Cerrar Sesión")
+        
+        opcion = input("Seleccione una opción: ").strip()
+        instrumentacion.iniciar_accion(f"profesor.{opcion}")
+        
+        if opcion == '1':
+            periodo = input("Ingrese el periodo a gestionar (P1, P2, P3, P4): ").strip().upper()
+            if periodo in PERIODOS:
+                if not periodo_habilitado(user_id, periodo):
+                    continue
+                global flujo_global_df
+                # La función gestiona y devuelve el DF actualizado
+                flujo_global_df = gestionar_calificaciones(flujo_global_df, user_id, periodo)
+                # Actualizamos la referencia local 'df' para el bucle actual
+                df = flujo_global_df
+            else:
+                print("Periodo no válido.")
+                
+        elif opcion == '2':
+            pendientes = consultar_registros(df, profesor_ID=user_id, estado_revision='PENDIENTE')
+            
+            if pendientes.empty:
+                print("No hay solicitudes de apelación pendientes.")
+                continue
+                
+            print(f"\n--- SOLICITUDES PENDIENTES ({len(pendientes)}) ---")
+            for _, r in pendientes.iterrows():
+                print(f"Estudiante ID: {r['estudiante_ID']}, Periodo: {r['periodo']}, ID Reg: {r['ID_REGISTRO']}")
+            
+            # Opción simple: Resolver todas
+            resolver = input("Resolver todas las solicitudes (s/n)? ").strip().lower()
+            if resolver == 's':
+                resueltas = flujo_global_df['ID_REGISTRO'].isin(pendientes['ID_REGISTRO'])
+                asignar_valores(flujo_global_df, resueltas, 'estado_revision', 'RESUELTA')
+                persistencia.programar(flujo_global_df, pendientes['ID_REGISTRO'])
+                print("Solicitudes resueltas. Debe contactar al estudiante sobre el resultado.")
+            
+        elif opcion == '3':
+            # FIX: Consultar el almacenamiento (no el DF en memoria) para ver los últimos cambios guardados
+            resumen = consultar_registros(
+                None, columnas=['estudiante_ID', 'periodo', 'P_NOTA_FINAL', 'estado_publicacion'], profesor_ID=user_id
+            )
+            print("\n--- RESUMEN DE MIS CALIFICACIONES ---")
+            print(resumen)
+            
+        elif opcion == '4':
+            ruta = input("Ruta del archivo con las calificaciones (.csv o .json): ").strip()
+            periodo = input("Ingrese el periodo (P1, P2, P3, P4): ").strip().upper()
+            if periodo not in PERIODOS:
+                print("Periodo no válido.")
+                continue
+            if not periodo_habilitado(user_id, periodo):
+                continue
+            metodo = input("Método de Enseñanza para los registros que no lo traigan (opcional): ").strip()
+            publicar = input("¿Publicar las calificaciones al terminar? (Escriba 'si' para publicar): ").strip().lower() == 'si'
+            flujo_global_df = importar_calificaciones_lote(flujo_global_df, user_id, ruta, periodo, metodo or None, publicar)
+            df = flujo_global_df
+
+        elif opcion == '5':
+            break
+        else:
+            print("Opción no válida.")
+
+def flujo_admin_registro(df, user_id):
+    """Menú para Administración y Encargada de Registro."""
+    rol = USUARIOS_MOCK[user_id]
+    check_alerts(df, user_id)
+    
+    while True:
+        instrumentacion.terminar_accion()
+        print(f"\n--- Menú {rol} ---")
+        print("[1] Ver TODAS las Calificaciones")
+        
+        if verificar_permiso(user_id, 'modificar_publicada'):
+            print("[2] Modificar Calificación Publicada (Hasta 7 días)")
+            
+        if verificar_permiso(user_id, 'administrar_usuarios'):
+            print("[3] Administrar Usuarios Comunes (Crear nuevos Profesor/Estudiante)")
+            
+        print("[4] Cerrar Sesión")
+        
+        opcion = input("Seleccione una opción: ").strip()
+        instrumentacion.iniciar_accion(f"admin_registro.{opcion}")
+        
+        if opcion == '1':
+            # Se lee del almacenamiento por páginas: incluye lo que otro profesor haya publicado
+            print("\n--- REGISTRO GENERAL DE CALIFICACIONES ---")
+            ver_registros_paginados(['ID_REGISTRO', 'estudiante_ID', 'profesor_ID', 'periodo', 'P_NOTA_FINAL',
+                                     'estado_publicacion', 'fecha_publicacion'])
+            
+        elif opcion == '2' and verificar_permiso(user_id, 'modificar_publicada'):
+            reg_id = normalizar_id_registro(input("Ingrese el ID de Registro a modificar: "))
+            # El DF ya debe tener los IDs como string gracias a cargar_datos()
+            registro = df[df['ID_REGISTRO'] == reg_id] if id_manager.existe_id_registro(reg_id) else df.iloc[0:0]
+            
+            if registro.empty:
+                print("ID de registro no encontrado.")
+                continue
+                
+            idx = registro.index[0]
+            fecha_pub = registro.iloc[0]['fecha_publicacion']
+            
+            # Regla de los 7 días
+            if pd.notna(fecha_pub):
+                fecha_limite = fecha_pub + timedelta(days=7)
+                if datetime.now() > fecha_limite:
+                    print("ERROR: Han pasado más de 7 días desde la publicación. Ningún usuario puede modificarla.")
+                    continue
+            
+            print(f"Modificando nota publicada. Nota actual: {registro.iloc[0]['P_NOTA_FINAL']}")
+            try:
+                nueva_nota = float(input("Ingrese la NUEVA nota final (0-100): "))
+                if 0 <= nueva_nota <= 100:
+                    asignar_valores(df, idx, 'P_NOTA_FINAL', nueva_nota)
+                    # Opcional: limpiar la revisión si se modifica la nota
+                    asignar_valores(df, idx, 'estado_revision', 'RESUELTA')
+                    persistencia.programar(df, [reg_id])
+                    print(f"Nota para {reg_id} modificada exitosamente por {rol}.")
+                else:
+                    print("Nota fuera de rango.")
+            except ValueError:
+                print("Entrada no válida.")
+                
+        elif opcion == '3' and verificar_permiso(user_id, 'administrar_usuarios'):
+            print("\n--- GESTIÓN DE USUARIOS ---")
+            nuevo_rol = input("Rol a crear (Profesor/Estudiante): ").strip().capitalize()
+            if nuevo_rol in ['Profesor', 'Estudiante']:
+                new_id = id_manager.generar_id_secuencial()
+                if new_id is None:
+                    print("Error: No se pudo generar una ID segura.")
+                    continue
+                    
+                # Agregar el nuevo usuario al diccionario MOCK
+                USUARIOS_MOCK[new_id] = ROLES[nuevo_rol.upper()]
+                print(f"Nuevo {nuevo_rol} creado con ID: {new_id} (Garantizado que no se duplica).")
+            else:
+                print("Rol no reconocido.")
+                
+        elif opcion == '4':
+            break
+        else:
+            print("Opción no válida.")
+
+
+def flujo_director(df, user_id):
+    """Menú y flujo para la Directora."""
+    check_alerts(df, user_id)
+    
+    while True:
+        instrumentacion.terminar_accion()
+        print("\n--- Menú Directora (TODOS LOS PERMISOS) ---")
+        print("[1] Acceso a Gestión de Calificaciones (Profesor)")
+        print("[2] Modificar Calificación Publicada (Incluso después de 7 días)")
+        print("[3] Suspender/Expulsar Usuarios (Mock)")
+        print("[4] Anular Alerta Administrativa (Mock)")
+        print("[5] Ver TODOS los Registros")
+        print("[6] Crear nuevos Profesor/Estudiante") # Opción agregada para consistencia
+        print("[7] Cerrar Sesión")
+        
+        opcion = input("Seleccione una opción: ").strip()
+        instrumentacion.iniciar_accion(f"director.{opcion}")
+        
+        if opcion == '1':
+            periodo = input("Ingrese el periodo a gestionar (P1-P4): ").strip().upper()
+            if periodo in PERIODOS and periodo_habilitado(user_id, periodo):
+                # El director puede usar la función de profesor
+                global flujo_global_df
+                flujo_global_df = gestionar_calificaciones(flujo_global_df, user_id, periodo)
+                df = flujo_global_df # Actualizamos referencia local
+            
+        elif opcion == '2':
+            reg_id = normalizar_id_registro(input("Ingrese el ID de Registro a modificar: "))
+            registro = df[df['ID_REGISTRO'] == reg_id] if id_manager.existe_id_registro(reg_id) else df.iloc[0:0]
+            
+            if registro.empty:
+                print("ID de registro no encontrado.")
+                continue
+                
+            idx = registro.index[0]
+            print(f"MODIFICACIÓN EXCLUSIVA. Nota actual: {registro.iloc[0]['P_NOTA_FINAL']}")
+            try:
+                nueva_nota = float(input("Ingrese la NUEVA nota final (0-100): "))
+                if 0 <= nueva_nota <= 100:
+                    asignar_valores(df, idx, 'P_NOTA_FINAL', nueva_nota)
+                    persistencia.programar(df, [reg_id])
+                    print(f"Nota para {reg_id} modificada exitosamente por la Directora.")
+                else:
+                    print("Nota fuera de rango.")
+            except ValueError:
+                print("Entrada no válida.")
+
+        elif opcion == '3':
+            target_id = input("Ingrese el ID de usuario a suspender/expulsar (Mock): ").strip()
+            if target_id in USUARIOS_MOCK and target_id != user_id:
+                print(f"Usuario {target_id} (Rol: {USUARIOS_MOCK[target_id]}) ha sido suspendido (Mock).")
+            else:
+                print("ID no válido o no puedes modificar tu propio ID.")
+                
+        elif opcion == '4':
+            print("Alerta Administrativa ANULADA. El sistema no alertará hasta el próximo reinicio. (Mock)")
+            
+        elif opcion == '5':
+            # Se lee del almacenamiento por páginas para ver todos los cambios
+            print("\n--- REGISTRO GENERAL DE CALIFICACIONES ---")
+            ver_registros_paginados(None)
+        
+        elif opcion == '6':
+            print("\n--- GESTIÓN DE USUARIOS ---")
+            nuevo_rol = input("Rol a crear (Profesor/Estudiante): ").strip().capitalize()
+            if nuevo_rol in ['Profesor', 'Estudiante']:
+                new_id = id_manager.generar_id_secuencial()
+                if new_id is None:
+                    print("Error: No se pudo generar una ID segura.")
+                    continue
+                    
+                USUARIOS_MOCK[new_id] = ROLES[nuevo_rol.upper()]
+                print(f"Nuevo {nuevo_rol} creado con ID: {new_id} (Garantizado que no se duplica).")
+            else:
+                print("Rol no reconocido.")
+            
+        elif opcion == '7':
+            break
+        else:
+            print("Opción no válida.")
+
+
+# --- 7. BUCLE PRINCIPAL Y CONTROL DE ERRORES ---
+
+class PrecargaDatos(threading.Thread):
+    """
+    Carga pandas y los datos en un hilo aparte mientras se muestra el menú de inicio de sesión.
+    resultado() espera a que termine; así el usuario escribe su ID en paralelo con la carga.
+    """
+    def __init__(self):
+        super().__init__(name='precarga-datos', daemon=True)
+        self._df = None
+        self._error = None
+        self.start()
+
+    def run(self):
+        try:
+            self._df = cargar_datos()
+        except BaseException as e:
+            self._error = e
+
+    def resultado(self):
+        self.join()
+        if self._error is not None:
+            raise self._error
+        return self._df
+
+def main():
+    """Función principal que ejecuta la aplicación."""
+    global flujo_global_df
+    print("Inicializando Sistema...")
+    
+    # 1. Inicialización de datos (en segundo plano, el primer inicio de sesión la espera)
+    precarga = PrecargaDatos()
+    
+    while True:
+        # Cierra la última acción de menú aunque el flujo haya terminado con un error
+        instrumentacion.terminar_accion()
+        try:
+            user_id, rol = menu_login()
+            
+            # Si menu_login retorna None, None, el usuario eligió salir.
+            if user_id is None: 
+                break 
+            if precarga is not None:
+                flujo_global_df = precarga.resultado()
+                precarga = None
+            
+            # Se usa flujo_global_df como la base de datos actual para todos los flujos.
+            if rol == ROLES['ESTUDIANTE']:
+                flujo_estudiante(flujo_global_df, user_id)
+            elif rol == ROLES['PROFESOR']:
+                flujo_profesor(flujo_global_df, user_id)
+            elif rol == ROLES['ADMIN'] or rol == ROLES['REGISTRO']:
+                flujo_admin_registro(flujo_global_df, user_id)
+            elif rol == ROLES['DIRECTOR']:
+                flujo_director(flujo_global_df, user_id)
+            
+            # Al cerrar sesión se escribe todo lo que quedó pendiente en segundo plano
+            persistencia.vaciar(flujo_global_df)
+            # Este mensaje se muestra solo si el usuario cierra sesión desde un menú de rol
+            print("\nSesión cerrada. Volviendo al menú principal.")
+
+        except (EOFError, KeyboardInterrupt):
+            # Fin de la entrada (Ctrl+D / Ctrl+C): salida ordenada para que se ejecuten los cierres (atexit)
+            print("\nSaliendo del sistema.")
+            break
+
+        except Exception as e:
+            # Control de Errores: Captura cualquier error inesperado
+            print("\n" + "="*50)
+            print(f"*** ERROR CRÍTICO DEL PROGRAMA ***")
+            # Mostrar un mensaje más detallado para el desarrollador/usuario avanzado
+            print(f"Se ha producido un error inesperado (Detalles: {e}).")
+            print("El sistema intentará continuar...")
+            print("="*50 + "\n")
+
+    # Ningún guardado queda sin escribir al salir
+    persistencia.detener()
+            
+def _configurar_instrumentacion(argumentos):
+    """Activa la instrumentación según los argumentos de línea de comandos o las variables de entorno."""
+    parser = argparse.ArgumentParser(description="AutoRegister - Registro de calificaciones")
+    parser.add_argument('--metricas', choices=instrumentacion.FORMATOS,
+                        help="Registrar métricas de rendimiento y volcarlas al salir en este formato")
+    parser.add_argument('--metricas-archivo', help="Archivo de salida de las métricas")
+    parser.add_argument('--profile', choices=instrumentacion.PERFILES,
+                        help="Guardar un perfil (cProfile o tracemalloc) por cada acción de menú")
+    opciones = parser.parse_args(argumentos)
+    if opciones.metricas or opciones.profile:
+        instrumentacion.activar(opciones.metricas or 'json', opciones.metricas_archivo, opciones.profile)
+    else:
+        instrumentacion.activar_desde_entorno()
+
+if __name__ == "__main__":
+    _configurar_instrumentacion(sys.argv[1:])
     main()
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Benchmarks de AutoRegister.
+
+- escuela: generador de escuelas sintéticas (estudiantes, profesores, P1-P4).
+- suite: mide las operaciones principales a 1k, 10k, 100k y 1M filas y guarda los tiempos en JSON.
+- ids: velocidad y unicidad del generador de IDs secuenciales con varios procesos.
+- arranque: importación, menú de inicio y sesión de estudiante, comparados con su presupuesto.
+- servidor: prueba de carga del servidor de calificaciones (peticiones/segundo y latencia p99).
+- permisos: costo por verificación del motor de permisos compilado frente al esquema anterior.
+- snapshot: inicio en frío de cargar_datos desde el snapshot binario frente a parsear el CSV.
+- memoria: bytes por fila del DataFrame con el esquema de tipos explícito frente al anterior.
+
+Se ejecutan desde la carpeta AutoRegister, por ejemplo: python -m benchmarks.suite
+"""
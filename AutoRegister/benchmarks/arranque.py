@@ -0,0 +1,122 @@
+"""
+Benchmark de arranque de AutoRegister.
+
+Mide, cada uno en un proceso nuevo:
+- lo que tarda importar AutoRegister.py y main.py (no deben cargar pandas ni tocar archivos);
+- el tiempo hasta que aparece el menú de inicio de sesión;
+- una sesión de estudiante completa: iniciar sesión y ver sus calificaciones, con una pausa
+  que simula lo que tarda la persona en escribir su ID (la carga de datos ocurre durante esa pausa).
+
+Cada medición se compara con su presupuesto; el proceso termina con código 1 si alguno se excede.
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.arranque [--filas 10000] [--escritura 1.0] [--repeticiones 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(CARPETA, 'AutoRegister.py')
+ESTUDIANTE = '2001' # Estudiante de USUARIOS_MOCK al que se le asignan las notas del primer estudiante sintético
+
+# Presupuestos en segundos (mediana de las repeticiones)
+PRESUPUESTOS = {
+    'import AutoRegister': 0.25,
+    'import main': 0.25,
+    'menú de inicio de sesión': 0.35,
+    'ver calificaciones (tras escribir el ID)': 0.25,
+    'sesión completa (sin la escritura)': 0.35,
+}
+
+
+def _tiempo_import(modulo):
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'import {modulo}'], cwd=CARPETA, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - inicio
+
+
+def _esperar_texto(proceso, texto, leido):
+    """Lee la salida del proceso hasta que aparece 'texto' (después de lo ya leído)."""
+    desde = len(leido)
+    while texto not in leido[desde:]:
+        bloque = os.read(proceso.stdout.fileno(), 65536)
+        if not bloque:
+            raise RuntimeError(f"El programa terminó sin mostrar {texto!r}:\n{leido.decode(errors='replace')[-2000:]}")
+        leido += bloque
+    return leido
+
+
+def _sesion_estudiante(carpeta, escritura):
+    """(segundos hasta el menú de inicio, segundos desde que se envía el ID hasta ver las notas)."""
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, '-u', SCRIPT], cwd=carpeta, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        leido = _esperar_texto(proceso, 'Ingrese su ID de Usuario: '.encode(), b'')
+        menu = time.perf_counter() - inicio
+
+        time.sleep(escritura) # La persona escribe su ID
+        envio = time.perf_counter()
+        proceso.stdin.write(f"{ESTUDIANTE}\n".encode())
+        proceso.stdin.flush()
+        leido = _esperar_texto(proceso, 'Seleccione una opción: '.encode(), leido)
+        notas = time.perf_counter() - envio
+
+        proceso.stdin.write(b"3\nX\n")
+        proceso.stdin.close()
+        proceso.wait(timeout=60)
+    finally:
+        if proceso.poll() is None:
+            proceso.kill()
+    return menu, notas
+
+
+def _preparar_datos(carpeta, filas):
+    """Escuela sintética de 'filas' filas en la carpeta; el primer estudiante pasa a ser ESTUDIANTE."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        import AutoRegister as ar
+        from benchmarks import escuela
+    df = escuela.generar_escuela(filas)
+    df.loc[df['estudiante_ID'] == df['estudiante_ID'].iloc[0], 'estudiante_ID'] = ESTUDIANTE
+    df.to_csv(os.path.join(carpeta, ar.ARCHIVO_CSV), index=False, encoding='utf-8', columns=ar.COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de AutoRegister")
+    parser.add_argument('--filas', type=int, default=10_000, help="Filas del CSV de la sesión de estudiante")
+    parser.add_argument('--escritura', type=float, default=1.0, help="Segundos que tarda la persona en escribir su ID")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    mediciones = {nombre: [] for nombre in PRESUPUESTOS}
+    with tempfile.TemporaryDirectory() as carpeta:
+        _preparar_datos(carpeta, args.filas)
+        for _ in range(args.repeticiones):
+            mediciones['import AutoRegister'].append(_tiempo_import('AutoRegister'))
+            mediciones['import main'].append(_tiempo_import('main'))
+            menu, notas = _sesion_estudiante(carpeta, args.escritura)
+            mediciones['menú de inicio de sesión'].append(menu)
+            mediciones['ver calificaciones (tras escribir el ID)'].append(notas)
+            mediciones['sesión completa (sin la escritura)'].append(menu + notas)
+
+    print(f"Arranque de AutoRegister ({args.filas:,} filas, {args.escritura:.1f} s de escritura, "
+          f"mediana de {args.repeticiones})")
+    excedidos = 0
+    for nombre, valores in mediciones.items():
+        mediana = sorted(valores)[len(valores) // 2]
+        presupuesto = PRESUPUESTOS[nombre]
+        estado = 'OK' if mediana <= presupuesto else 'EXCEDIDO'
+        excedidos += estado != 'OK'
+        print(f"{nombre:<42} {mediana:>8.3f} s  (presupuesto {presupuesto:.2f} s)  {estado}")
+    return 1 if excedidos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
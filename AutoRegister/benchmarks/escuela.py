@@ -0,0 +1,104 @@
+"""
+Generador de escuelas sintéticas para los benchmarks.
+
+Cada fila es la calificación de un estudiante con un profesor (asignatura) en un periodo.
+Los periodos anteriores están casi todos publicados y los últimos son mayormente borradores,
+como a mitad de año escolar; algunos borradores no tienen 'Método de Enseñanza'.
+"""
+import numpy as np
+import pandas as pd
+
+import AutoRegister as ar
+
+# Fracción de filas publicadas por periodo
+PUBLICADAS_POR_PERIODO = {'P1': 0.95, 'P2': 0.80, 'P3': 0.45, 'P4': 0.10}
+FRACCION_SIN_METODO = 0.10 # De los borradores
+
+PRIMER_ID_ESTUDIANTE = 100000
+PRIMER_ID_PROFESOR = 9000
+
+_PALABRAS_METODO = [
+    'aprendizaje', 'basado', 'en', 'proyectos', 'trabajo', 'colaborativo', 'evaluación', 'formativa',
+    'práctica', 'guiada', 'exposición', 'oral', 'lectura', 'comprensiva', 'resolución', 'de', 'problemas',
+    'retroalimentación', 'continua', 'con', 'rúbricas', 'y', 'portafolio', 'digital', 'del', 'estudiante',
+]
+
+
+def _textos_metodo(rng, cantidad, variantes=200):
+    """Textos largos de 'Método de Enseñanza' (entre 80 y 300 caracteres), reutilizando variantes."""
+    textos = []
+    for _ in range(variantes):
+        palabras = []
+        while len(' '.join(palabras)) < rng.integers(80, 300):
+            palabras.append(_PALABRAS_METODO[rng.integers(len(_PALABRAS_METODO))])
+        textos.append(' '.join(palabras).capitalize() + '.')
+    return np.array(textos, dtype=object)[rng.integers(variantes, size=cantidad)]
+
+
+def dimensiones(filas, profesores=10):
+    """(estudiantes, profesores) necesarios para llegar a 'filas' con 4 periodos."""
+    estudiantes = -(-filas // (profesores * len(ar.PERIODOS))) # División hacia arriba
+    return estudiantes, profesores
+
+
+def generar_escuela(filas, profesores=10, semilla=0):
+    """
+    Genera un DataFrame con las columnas de AutoRegister (COLUMNS) y exactamente 'filas' filas.
+    Las notas finales se calculan con el mismo motor que usa la aplicación.
+    """
+    rng = np.random.default_rng(semilla)
+    estudiantes, profesores = dimensiones(filas, profesores)
+    periodos = len(ar.PERIODOS)
+
+    posicion = np.arange(filas)
+    estudiante = PRIMER_ID_ESTUDIANTE + posicion // (profesores * periodos)
+    profesor = PRIMER_ID_PROFESOR + (posicion // periodos) % profesores
+    periodo = np.array(ar.PERIODOS, dtype=object)[posicion % periodos]
+
+    componentes = pd.DataFrame(
+        np.round(rng.uniform(55, 100, size=(filas, len(ar.CALIFICACION_CAMPOS))), 1),
+        columns=ar.CALIFICACION_CAMPOS,
+    )
+    notas = ar.calcular_notas_lote(componentes)
+
+    probabilidad = pd.Series(periodo).map(PUBLICADAS_POR_PERIODO).to_numpy()
+    publicada = rng.random(filas) < probabilidad
+    sin_metodo = ~publicada & (rng.random(filas) < FRACCION_SIN_METODO)
+    metodos = _textos_metodo(rng, filas)
+    metodos[sin_metodo] = None
+
+    fechas = pd.Timestamp('2025-09-01') + pd.to_timedelta(rng.integers(0, 200 * 86400, size=filas), unit='s')
+    df = pd.DataFrame({
+        'ID_REGISTRO': [f"{i:012x}" for i in posicion],
+        'estudiante_ID': estudiante.astype(str),
+        'profesor_ID': profesor.astype(str),
+        'periodo': periodo,
+        'fecha_publicacion': np.where(publicada, fechas.strftime('%Y-%m-%d %H:%M:%S'), ar.ESTADO_INICIAL_NOTA),
+        'estado_publicacion': publicada,
+        'estado_revision': 'N/A',
+        'P_NOTA_FINAL': notas['P_NOTA_FINAL'].to_numpy(),
+        'P_METODO_ENS': metodos,
+        **{ar.COLUMNAS_CAMPOS[campo]: componentes[campo].to_numpy() for campo in ar.CALIFICACION_CAMPOS},
+        'promedio_general': ar.ESTADO_INICIAL_NOTA,
+        'version_escala': np.where(publicada, ar.ESCALAS.vigente, None),
+        'version': 0,
+    })
+    return df[ar.COLUMNS]
+
+
+def registrar_usuarios(df):
+    """Da de alta a los estudiantes y profesores sintéticos en USUARIOS_MOCK (necesario para los permisos)."""
+    ar.USUARIOS_MOCK.update(dict.fromkeys(df['estudiante_ID'].unique(), ar.ROLES['ESTUDIANTE']))
+    ar.USUARIOS_MOCK.update(dict.fromkeys(df['profesor_ID'].unique(), ar.ROLES['PROFESOR']))
+
+
+def archivo_seccion(df, ruta, profesor_id, periodo):
+    """Escribe el archivo de importación (CSV) de todos los estudiantes de un profesor en un periodo."""
+    rng = np.random.default_rng(1)
+    estudiantes = df.loc[(df['profesor_ID'] == profesor_id) & (df['periodo'] == periodo), 'estudiante_ID'].unique()
+    seccion = pd.DataFrame({'estudiante_ID': estudiantes})
+    for campo in ar.CALIFICACION_CAMPOS:
+        seccion[campo] = np.round(rng.uniform(55, 100, size=len(estudiantes)), 1)
+    seccion['P_METODO_ENS'] = 'Aprendizaje basado en proyectos con evaluación formativa.'
+    seccion.to_csv(ruta, index=False, encoding='utf-8')
+    return len(seccion)
@@ -0,0 +1,64 @@
+"""
+Benchmark del generador de IDs secuenciales (GeneradorIDs).
+
+Mide IDs/segundo en un solo proceso y con varios procesos a la vez sobre el mismo
+archivo contador, y comprueba que ningún ID se entregue dos veces.
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.ids [--ids 100000] [--procesos 4] [--bloque 1000]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+def _generar(args):
+    """Genera 'cantidad' IDs en este proceso y devuelve (lista de IDs, segundos)."""
+    counter_file, cantidad, bloque = args
+    from AutoRegister import GeneradorIDs
+
+    generador = GeneradorIDs(counter_file=counter_file, tamano_bloque=bloque)
+    inicio = time.perf_counter()
+    ids = [generador.generar_id_secuencial() for _ in range(cantidad)]
+    segundos = time.perf_counter() - inicio
+    generador.liberar_bloque()
+    return ids, segundos
+
+
+def medir(carpeta, cantidad, procesos, bloque):
+    """Ejecuta una medición y devuelve (IDs/segundo, duplicados)."""
+    counter_file = os.path.join(carpeta, f"contador_{procesos}_{bloque}.txt")
+    por_proceso = cantidad // procesos
+    inicio = time.perf_counter()
+    if procesos == 1:
+        resultados = [_generar((counter_file, por_proceso, bloque))]
+    else:
+        with multiprocessing.Pool(procesos) as pool:
+            resultados = pool.map(_generar, [(counter_file, por_proceso, bloque)] * procesos)
+    segundos = time.perf_counter() - inicio
+
+    todos = [id_ for ids, _ in resultados for id_ in ids]
+    duplicados = len(todos) - len(set(todos))
+    return len(todos) / segundos, duplicados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de GeneradorIDs")
+    parser.add_argument('--ids', type=int, default=100000, help="IDs a generar en total")
+    parser.add_argument('--procesos', type=int, default=4, help="Procesos para la prueba concurrente")
+    parser.add_argument('--bloque', type=int, default=1000, help="Tamaño del bloque reservado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Con bloque=1 cada ID hace su propia escritura bloqueada (equivale al esquema anterior)
+        for bloque in (1, args.bloque):
+            cantidad = min(args.ids, 5000) if bloque == 1 else args.ids
+            for procesos in (1, args.procesos):
+                velocidad, duplicados = medir(carpeta, cantidad, procesos, bloque)
+                print(f"bloque={bloque:>5}  procesos={procesos}  {velocidad:>12,.0f} IDs/s  duplicados={duplicados}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Memoria por fila del DataFrame de trabajo con el esquema de tipos explícito frente al anterior.
+
+Para cada tamaño genera una escuela sintética, la lee como cargar_datos (_leer_csv) y aplica
+las conversiones de antes (IDs y textos como str/object, notas con el texto ESTADO_INICIAL_NOTA)
+y las actuales (_normalizar_tipos: categorías, bool, float con NaN y datetime64).
+Informa los bytes por fila de cada columna y del total, y el tiempo de los filtros que usan
+los menús. También comprueba que los dos esquemas den los mismos resultados en esos filtros.
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.memoria [--tamanos 100000 1000000] [--repeticiones 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import pandas as pd
+    import AutoRegister as ar
+    from benchmarks import escuela
+
+
+def _normalizar_tipos_anterior(df):
+    """_normalizar_tipos antes del esquema explícito."""
+    if 'profesor_ID' in df.columns:
+        df['profesor_ID'] = df['profesor_ID'].astype(str)
+    if 'estudiante_ID' in df.columns:
+        df['estudiante_ID'] = df['estudiante_ID'].astype(str)
+    if 'P_NOTA_FINAL' in df.columns:
+        df['P_NOTA_FINAL'] = df['P_NOTA_FINAL'].fillna(ar.ESTADO_INICIAL_NOTA)
+    if 'promedio_general' in df.columns:
+        df['promedio_general'] = df['promedio_general'].fillna(ar.ESTADO_INICIAL_NOTA)
+    if 'version' in df.columns:
+        df['version'] = pd.to_numeric(df['version'], errors='coerce').fillna(0).astype(int)
+    if 'estado_revision' in df.columns:
+        df['estado_revision'] = df['estado_revision'].fillna(ar.ESTADO_INICIAL_NOTA)
+    for columna in ('fecha_publicacion', 'estado_revision', 'P_METODO_ENS', 'version_escala'):
+        if columna in df.columns and df[columna].dtype != object:
+            df[columna] = df[columna].astype(object)
+    for columna in ar.COLUMNAS_CAMPOS.values():
+        if columna in df.columns:
+            df[columna] = pd.to_numeric(df[columna], errors='coerce').astype(float)
+    return df
+
+
+def _filtros(df):
+    """Filtros de los menús: (nombre, función que devuelve una cantidad comparable entre esquemas)."""
+    profesor, estudiante = str(escuela.PRIMER_ID_PROFESOR + 3), str(escuela.PRIMER_ID_ESTUDIANTE + 7)
+    return [
+        ('borradores de una sección', lambda: int(((df['profesor_ID'] == profesor) & (df['periodo'] == 'P3')
+                                                    & (df['estado_publicacion'] != True)).sum())),
+        ('notas de un estudiante', lambda: int((df['estudiante_ID'] == estudiante).sum())),
+        ('revisiones pendientes', lambda: int((df['estado_revision'] == 'PENDIENTE').sum())),
+        ('promedio de notas publicadas', lambda: round(float(
+            pd.to_numeric(df.loc[df['estado_publicacion'] == True, 'P_NOTA_FINAL'], errors='coerce').mean()), 6)),
+    ]
+
+
+def _medir(funcion, repeticiones):
+    """(resultado, mediana de milisegundos por llamada)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, sorted(tiempos)[len(tiempos) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por fila: esquema de tipos explícito frente al anterior")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    diferencias = 0
+    for filas in args.tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, ar.ARCHIVO_CSV)
+            escuela.generar_escuela(filas).to_csv(ruta, index=False, encoding='utf-8', columns=ar.COLUMNS)
+            leido = ar._leer_csv(ruta)
+        anterior = _normalizar_tipos_anterior(leido.copy())
+        actual = ar._normalizar_tipos(leido.copy())
+
+        bytes_anterior = anterior.memory_usage(deep=True, index=False)
+        bytes_actual = actual.memory_usage(deep=True, index=False)
+        print(f"\n--- {filas:,} filas: bytes por fila ---")
+        print(f"{'columna':<20} {'tipo anterior':<16} {'tipo actual':<16} {'anterior':>9} {'actual':>9} {'x':>6}")
+        for columna in ar.COLUMNS:
+            antes, ahora = bytes_anterior[columna] / filas, bytes_actual[columna] / filas
+            print(f"{columna:<20} {str(anterior[columna].dtype)[:16]:<16} {str(actual[columna].dtype)[:16]:<16} "
+                  f"{antes:>9.1f} {ahora:>9.1f} {antes / ahora:>5.1f}x")
+        antes, ahora = bytes_anterior.sum() / filas, bytes_actual.sum() / filas
+        print(f"{'TOTAL':<54} {antes:>9.1f} {ahora:>9.1f} {antes / ahora:>5.1f}x")
+        print(f"{'TOTAL (MB)':<54} {bytes_anterior.sum() / 1e6:>9.1f} {bytes_actual.sum() / 1e6:>9.1f}")
+
+        print(f"\n{'filtro':<32} {'anterior ms':>12} {'actual ms':>10} {'x':>6}")
+        for (nombre, filtro_anterior), (_, filtro_actual) in zip(_filtros(anterior), _filtros(actual)):
+            resultado_anterior, ms_anterior = _medir(filtro_anterior, args.repeticiones)
+            resultado_actual, ms_actual = _medir(filtro_actual, args.repeticiones)
+            diferencias += resultado_anterior != resultado_actual
+            print(f"{nombre:<32} {ms_anterior:>12.2f} {ms_actual:>10.2f} {ms_anterior / ms_actual:>5.1f}x")
+    print(f"\nFiltros con resultado distinto: {diferencias}")
+    return 1 if diferencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
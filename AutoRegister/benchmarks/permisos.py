@@ -0,0 +1,106 @@
+"""
+Microbenchmark del motor de permisos (permisos.py).
+
+Compara el costo por verificación del esquema anterior (búsqueda en dicts anidados en
+AutoRegister.py, búsqueda lineal y copia de permisos en main.py) con el motor compilado, y
+comprueba que los dos den exactamente el mismo resultado para todos los usuarios y permisos.
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.permisos [--llamadas 200000] [--usuarios 1000]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import AutoRegister as ar
+    import main as principal
+
+
+def _verificar_permiso_anterior(user_id, accion):
+    """verificar_permiso antes del motor compilado (sin el aviso de usuario no encontrado)."""
+    if user_id not in ar.USUARIOS_MOCK:
+        return False
+    rol = ar.USUARIOS_MOCK[user_id]
+    if accion in ar.PERMISOS_ROLES[rol]:
+        return ar.PERMISOS_ROLES[rol][accion]
+    return False
+
+
+def _gestionar_permisos_anterior(user_id):
+    """gestionar_permisos antes del motor compilado: búsqueda lineal y dict de permisos nuevo en cada llamada."""
+    usuario_encontrado = None
+    for usuario in principal.USUARIOS_SIMULADOS:
+        if usuario['USUARIO_ID'] == user_id:
+            usuario_encontrado = usuario
+            break
+    if usuario_encontrado:
+        rol = usuario_encontrado['usuario_rol']
+        if rol in principal.ROLES_PERMISOS:
+            permisos = principal.ROLES_PERMISOS[rol]
+            return {'autenticado': True, 'datos': usuario_encontrado, 'permisos': {k: bool(v) for k, v in permisos.items()}}
+        return {'autenticado': False, 'mensaje': f"ERROR: Rol '{rol}' no definido en el sistema de permisos."}
+    return {'autenticado': False, 'mensaje': "ERROR: Usuario no encontrado"}
+
+
+def _por_llamada(funcion, argumentos):
+    """Microsegundos por llamada de funcion(*a) sobre la lista de argumentos."""
+    inicio = time.perf_counter()
+    for a in argumentos:
+        funcion(*a)
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def _agregar_usuarios(cantidad):
+    """Usuarios sintéticos en ambas tablas (los roles se reparten en orden)."""
+    roles_ar = list(ar.PERMISOS_ROLES)
+    roles_main = list(principal.ROLES_PERMISOS)
+    for i in range(cantidad):
+        ar.USUARIOS_MOCK[str(500000 + i)] = roles_ar[i % len(roles_ar)]
+        principal.USUARIOS_SIMULADOS.append({'USUARIO_ID': 500000 + i, 'usuario_nombre': 'Usuario', 'usuario_apellido': str(i),
+                                             'usuario_rol': roles_main[i % len(roles_main)]})
+    principal.recargar_usuarios()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark del motor de permisos")
+    parser.add_argument('--llamadas', type=int, default=200_000)
+    parser.add_argument('--usuarios', type=int, default=1000, help="Usuarios sintéticos agregados a las tablas")
+    args = parser.parse_args()
+    _agregar_usuarios(args.usuarios)
+
+    # Equivalencia: todos los usuarios (más uno inexistente) contra todos los permisos
+    acciones = list(ar.MOTOR_PERMISOS.bits) + ['permiso_inexistente']
+    usuarios_ar = list(ar.USUARIOS_MOCK) + ['no_existe']
+    with contextlib.redirect_stdout(io.StringIO()):
+        diferencias = sum(ar.verificar_permiso(u, a) != _verificar_permiso_anterior(u, a)
+                          for u in usuarios_ar for a in acciones)
+    for accion in acciones:
+        diferencias += ar.verificar_permiso_lote(usuarios_ar, accion) != [_verificar_permiso_anterior(u, accion) for u in usuarios_ar]
+    usuarios_main = [u['USUARIO_ID'] for u in principal.USUARIOS_SIMULADOS] + [9999]
+    diferencias += sum(principal.gestionar_permisos(u) != _gestionar_permisos_anterior(u) for u in usuarios_main)
+    print(f"Diferencias con las tablas originales: {diferencias}")
+
+    # Verificaciones repartidas entre todos los usuarios y permisos (ninguna da 'usuario no encontrado')
+    muestra_ar = [(usuarios_ar[i % (len(usuarios_ar) - 1)], acciones[i % (len(acciones) - 1)]) for i in range(args.llamadas)]
+    muestra_main = [(usuarios_main[i % (len(usuarios_main) - 1)],) for i in range(args.llamadas // 10)]
+    usuarios_lote = [u for u, _ in muestra_ar]
+
+    print(f"{'verificación':<44} {'anterior µs':>12} {'compilado µs':>13} {'x':>7}")
+    filas = [
+        ('AutoRegister.verificar_permiso', _por_llamada(_verificar_permiso_anterior, muestra_ar),
+         _por_llamada(ar.verificar_permiso.__wrapped__, muestra_ar)),
+        ('AutoRegister.verificar_permiso_lote (por usuario)', _por_llamada(_verificar_permiso_anterior, muestra_ar),
+         _por_llamada(lambda: ar.verificar_permiso_lote.__wrapped__(usuarios_lote, 'llenar_notas'), [()]) / len(usuarios_lote)),
+        (f'main.gestionar_permisos ({len(usuarios_main) - 1} usuarios)', _por_llamada(_gestionar_permisos_anterior, muestra_main),
+         _por_llamada(principal.gestionar_permisos, muestra_main)),
+    ]
+    for nombre, anterior, compilado in filas:
+        print(f"{nombre:<44} {anterior:>12.3f} {compilado:>13.3f} {anterior / compilado:>6.1f}x")
+    return 1 if diferencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
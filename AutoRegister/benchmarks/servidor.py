@@ -0,0 +1,103 @@
+"""
+Prueba de carga del servidor de calificaciones (servidor.py).
+
+Inicia el servidor en un proceso aparte y lo satura con varias conexiones simultáneas. Cada
+conexión repite el ciclo de una calificación: el profesor crea el registro, lo publica, el
+estudiante apela, administración acepta la apelación y el profesor corrige la nota; además
+se consultan los permisos. Informa peticiones/segundo y latencias p50/p99 (total y por acción).
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.servidor [--conexiones 16] [--ciclos 200]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFESOR, ESTUDIANTE, ADMINISTRACION = 2005, 1001, 4002
+CAMPOS = {'participacion': 18.0, 'cuaderno': 13.0, 'practica': 18.0, 'exposicion': 18.0, 'prueba_mensual': 23.0}
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+async def _conexion(puerto, numero, ciclos, latencias):
+    """Una conexión que ejecuta 'ciclos' ciclos de calificación; registra la latencia de cada petición."""
+    lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+    ids = itertools.count(1)
+
+    async def llamar(usuario, accion, **parametros):
+        inicio = time.perf_counter()
+        escritor.write(json.dumps({'id': next(ids), 'usuario': usuario, 'accion': accion,
+                                   'parametros': parametros}).encode() + b'\n')
+        respuesta = json.loads(await lector.readline())
+        latencias.setdefault(accion, []).append(time.perf_counter() - inicio)
+        if respuesta.get('exito') is False:
+            raise RuntimeError(f"{accion} falló: {respuesta['mensaje']}")
+        return respuesta
+
+    for ciclo in range(ciclos):
+        await llamar(PROFESOR, 'gestionar_permisos')
+        registro = (await llamar(PROFESOR, 'crear_o_actualizar_registro', estudiante_id=ESTUDIANTE,
+                                 materia=f"Materia {numero}-{ciclo}", periodo_num=1, campos=CAMPOS,
+                                 metodologia='Basada en Proyectos'))['registro_ID']
+        await llamar(PROFESOR, 'publicar_registro_calificacion', registro_id=registro)
+        apelacion = (await llamar(ESTUDIANTE, 'crear_apelacion', registro_id=registro,
+                                  comentario="Revisión"))['apelacion_id']
+        await llamar(ADMINISTRACION, 'gestionar_apelacion_admin', registro_id=registro, apelacion_id=apelacion,
+                     nuevo_estado='aceptada', respuesta_admin="Aceptada")
+        await llamar(PROFESOR, 'modificar_nota_apelacion', registro_id=registro, apelacion_id=apelacion,
+                     nuevos_campos={'exposicion': 20.0})
+    escritor.close()
+
+
+async def _carga(puerto, conexiones, ciclos):
+    latencias = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_conexion(puerto, n, ciclos, latencias) for n in range(conexiones)))
+    return latencias, time.perf_counter() - inicio
+
+
+def _iniciar_servidor():
+    """Inicia servidor.py en un puerto libre y devuelve (proceso, puerto)."""
+    proceso = subprocess.Popen([sys.executable, '-u', 'servidor.py', '--puerto', '0'], cwd=CARPETA,
+                               stdout=subprocess.PIPE, text=True)
+    linea = proceso.stdout.readline()
+    if 'escuchando en' not in linea:
+        proceso.kill()
+        raise RuntimeError(f"El servidor no inició: {linea!r}")
+    return proceso, int(linea.rsplit(':', 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor de calificaciones")
+    parser.add_argument('--conexiones', type=int, default=16, help="Conexiones simultáneas")
+    parser.add_argument('--ciclos', type=int, default=200, help="Ciclos de calificación por conexión")
+    args = parser.parse_args()
+
+    proceso, puerto = _iniciar_servidor()
+    try:
+        latencias, segundos = asyncio.run(_carga(puerto, args.conexiones, args.ciclos))
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=10)
+
+    todas = [l for valores in latencias.values() for l in valores]
+    print(f"Servidor de calificaciones: {args.conexiones} conexiones x {args.ciclos} ciclos")
+    print(f"{len(todas):,} peticiones en {segundos:.2f} s  ->  {len(todas) / segundos:,.0f} peticiones/s")
+    print(f"{'acción':<32} {'peticiones':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for accion, valores in list(latencias.items()) + [('total', todas)]:
+        print(f"{accion:<32} {len(valores):>10,} {_percentil(valores, 50) * 1000:>8.2f} "
+              f"{_percentil(valores, 99) * 1000:>8.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
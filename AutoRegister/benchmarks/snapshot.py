@@ -0,0 +1,93 @@
+"""
+Benchmark de inicio en frío: cargar_datos desde el snapshot binario frente a parsear el CSV.
+
+Para cada tamaño genera una escuela sintética y mide, cada carga en un proceso nuevo:
+- CSV: el snapshot desactivado (AUTOREGISTER_SNAPSHOT=no), se parsea el texto completo;
+- reconstrucción: no hay snapshot vigente, se parsea el CSV y se escribe el snapshot;
+- snapshot: la carga siguiente, que lee el snapshot.
+Informa la lectura del archivo base (lo que reemplaza el snapshot) y el cargar_datos completo,
+que además arma los índices de alertas, promedios e IDs. También comprueba que las dos cargas
+den exactamente el mismo DataFrame.
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.snapshot [--tamanos 100000 1000000] [--repeticiones 3] [--formato auto]
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en un proceso nuevo: imprime los segundos de la lectura del archivo base y de
+# cargar_datos (solo en la carga que no reconstruye el snapshot) y guarda el resultado
+CARGA = """
+import sys, time
+sys.path.insert(0, {carpeta!r})
+import pandas
+import AutoRegister as ar
+inicio = time.perf_counter()
+ar._leer_csv_base()
+base = time.perf_counter() - inicio
+inicio = time.perf_counter()
+df = ar.cargar_datos()
+print(base, time.perf_counter() - inicio)
+df.to_pickle(sys.argv[1])
+"""
+
+
+def _cargar(carpeta, formato, salida):
+    """(segundos de la lectura base, segundos de cargar_datos) en un proceso nuevo."""
+    entorno = dict(os.environ, AUTOREGISTER_SNAPSHOT=formato, AUTOREGISTER_BACKEND='csv')
+    resultado = subprocess.run([sys.executable, '-c', CARGA.format(carpeta=CARPETA), salida], cwd=carpeta,
+                               env=entorno, check=True, capture_output=True, text=True)
+    base, total = resultado.stdout.strip().splitlines()[-1].split()
+    return float(base), float(total)
+
+
+def _medianas(mediciones):
+    """Mediana de cada columna de una lista de tuplas."""
+    return tuple(sorted(valores)[len(valores) // 2] for valores in zip(*mediciones))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inicio en frío: snapshot binario frente a CSV")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--formato', default='auto', help="auto, feather, parquet o pickle")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import pandas as pd
+        import AutoRegister as ar
+        from benchmarks import escuela
+
+    print(f"{'':>10} {'':>8} {'':>8} {'lectura base (s)':^33} {'cargar_datos (s)':^22}")
+    print(f"{'filas':>10} {'CSV MB':>8} {'snap MB':>8} {'CSV':>8} {'reconstr.':>10} {'snapshot':>8} {'x':>5} "
+          f"{'CSV':>8} {'snapshot':>8} {'x':>5}")
+    diferencias = 0
+    for filas in args.tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            escuela.generar_escuela(filas).to_csv(os.path.join(carpeta, ar.ARCHIVO_CSV), index=False,
+                                                  encoding='utf-8', columns=ar.COLUMNS)
+            salida_csv, salida_snap = os.path.join(carpeta, 'csv.pkl'), os.path.join(carpeta, 'snap.pkl')
+            base_csv, total_csv = _medianas([_cargar(carpeta, 'no', salida_csv) for _ in range(args.repeticiones)])
+            reconstruccion, _ = _cargar(carpeta, args.formato, salida_snap)
+            base_snap, total_snap = _medianas([_cargar(carpeta, args.formato, salida_snap) for _ in range(args.repeticiones)])
+
+            diferencias += not pd.read_pickle(salida_csv).equals(pd.read_pickle(salida_snap))
+            tamano_csv = os.path.getsize(os.path.join(carpeta, ar.ARCHIVO_CSV)) / 1e6
+            archivos = [a for a in os.listdir(carpeta) if ar.SUFIJO_SNAPSHOT in a and not a.endswith('.json')]
+            tamano_snap = sum(os.path.getsize(os.path.join(carpeta, a)) for a in archivos) / 1e6
+            print(f"{filas:>10,} {tamano_csv:>8.1f} {tamano_snap:>8.1f} {base_csv:>8.3f} {reconstruccion:>10.3f} "
+                  f"{base_snap:>8.3f} {base_csv / base_snap:>4.1f}x {total_csv:>8.3f} {total_snap:>8.3f} "
+                  f"{total_csv / total_snap:>4.1f}x")
+    print(f"Cargas con resultado distinto: {diferencias}")
+    return 1 if diferencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
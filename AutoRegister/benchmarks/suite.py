@@ -0,0 +1,189 @@
+"""
+Suite de benchmarks de AutoRegister sobre escuelas sintéticas.
+
+Mide cargar_datos, guardar_datos (parcial y completo), check_alerts, consultar_registros (con y
+sin la caché de tablas), consultar_pagina, la importación sin prompts, la publicación (también en
+lote), los boletines, el cálculo de notas y letras (fila por fila y en lote) y las funciones de
+registro de main.py, a 1k, 10k, 100k y 1M filas. Los resultados se guardan en JSON para poder
+comparar corridas y detectar regresiones.
+
+Uso (desde la carpeta AutoRegister):
+    python -m benchmarks.suite [--tamanos 1000 10000] [--salida resultados.json] [--comparar anterior.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+TAMANOS = [1_000, 10_000, 100_000, 1_000_000]
+LIMITE_POR_FILA = 100_000 # Las operaciones fila por fila se miden hasta este número de llamadas
+
+
+class Medidor:
+    """Acumula los tiempos medidos como una lista de resultados serializable a JSON."""
+    def __init__(self):
+        self.resultados = []
+
+    def medir(self, operacion, filas, funcion, llamadas=1):
+        """Ejecuta 'funcion' sin mostrar lo que imprime y registra cuánto tardó."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            valor = funcion()
+            segundos = time.perf_counter() - inicio
+        self.resultados.append({
+            'operacion': operacion,
+            'filas': filas,
+            'llamadas': llamadas,
+            'segundos': round(segundos, 6),
+            'por_llamada_us': round(segundos / llamadas * 1e6, 3),
+        })
+        print(f"{operacion:<36} {filas:>9,} filas  {llamadas:>8,} llamadas  {segundos:>10.4f} s")
+        return valor
+
+
+def _medir_autoregister(medidor, ar, escuela, filas):
+    """Operaciones de AutoRegister.py sobre una escuela sintética de 'filas' filas."""
+    df = escuela.generar_escuela(filas)
+    escuela.registrar_usuarios(df)
+    df.to_csv(ar.ARCHIVO_CSV, index=False, encoding='utf-8', columns=ar.COLUMNS)
+    del df
+
+    df = medidor.medir('cargar_datos', filas, ar.cargar_datos)
+
+    ids = df['ID_REGISTRO'].iloc[::max(1, filas // 100)].tolist()
+    df.loc[df['ID_REGISTRO'].isin(ids), 'estado_revision'] = 'PENDIENTE'
+    medidor.medir('guardar_datos (100 filas)', filas, lambda: ar.guardar_datos(df, ids))
+    medidor.medir('guardar_datos (completo)', filas, lambda: ar.guardar_datos(df))
+
+    # Guardado desde un menú: programar() vuelve enseguida, la escritura la hace el hilo de fondo
+    uno = ids[:1]
+    medidor.medir('persistencia.programar (1 fila)', filas, lambda: ar.persistencia.programar(df, uno))
+    medidor.medir('persistencia.vaciar', filas, lambda: ar.persistencia.vaciar(df))
+
+    profesor = df['profesor_ID'].iloc[0]
+    director = next(u for u, rol in ar.USUARIOS_MOCK.items() if rol == ar.ROLES['DIRECTOR'])
+    medidor.medir('check_alerts (profesor)', filas, lambda: ar.check_alerts(df, profesor))
+    medidor.medir('check_alerts (director)', filas, lambda: ar.check_alerts(df, director))
+
+    # Consulta de solo lectura (opción 'ver registros'): primera lectura del archivo y luego desde la caché
+    ar.cache_tablas.invalidar()
+    medidor.medir('consultar_registros (sin caché)', filas, lambda: ar.consultar_registros(None, profesor_ID=profesor))
+    medidor.medir('consultar_registros (caché)', filas, lambda: ar.consultar_registros(None, profesor_ID=profesor))
+    # Vista paginada: lee el archivo por bloques y se detiene al llenar la página
+    medidor.medir('consultar_pagina (sin filtros)', filas, lambda: ar.consultar_pagina())
+    medidor.medir('consultar_pagina (con filtros)', filas,
+                  lambda: ar.consultar_pagina(profesor_ID=profesor, estado_publicacion=False))
+    # Una página del final: salta a su posición con indice_paginas en lugar de leer las anteriores
+    medidor.medir('consultar_pagina (última)', filas, lambda: ar.consultar_pagina(despues_de=len(df) - 2 * ar.TAMANO_PAGINA))
+
+    # Carga de notas sin prompts (una sección completa) y luego su publicación
+    ruta = 'seccion.csv'
+    seccion = escuela.archivo_seccion(df, ruta, profesor, 'P4')
+    ar.persistencia.intervalo = 0 # La importación se mide con su escritura incluida (sin escritura diferida)
+    df = medidor.medir('importar_calificaciones_lote', seccion,
+                       lambda: ar.importar_calificaciones_lote(df, profesor, ruta, 'P4'))
+    df = medidor.medir('publicacion (importar y publicar)', seccion,
+                       lambda: ar.importar_calificaciones_lote(df, profesor, ruta, 'P4', publicar=True))
+    ar.persistencia.intervalo = ar.INTERVALO_ESCRITURA_S
+    # Publicación en lote de los borradores del profesor en P3 (una transacción, una escritura)
+    borradores = int(((df['profesor_ID'] == profesor) & (df['periodo'] == 'P3') & (df['estado_publicacion'] != True)).sum())
+    df, _ = medidor.medir('publicar_calificaciones_lote', borradores,
+                          lambda: ar.publicar_calificaciones_lote(df, profesor, 'P3'))
+
+    # Boletines de todos los estudiantes y una segunda corrida sin cambios (todos se omiten)
+    import boletines
+    medidor.medir('generar_boletines', filas, lambda: boletines.generar_boletines(df, 'boletines'))
+    medidor.medir('generar_boletines (sin cambios)', filas, lambda: boletines.generar_boletines(df, 'boletines'))
+
+    llamadas = min(filas, LIMITE_POR_FILA)
+    componentes = df[list(ar.COLUMNAS_CAMPOS.values())].head(llamadas)
+    componentes.columns = ar.CALIFICACION_CAMPOS
+    detalles = componentes.to_dict('records')
+    medidor.medir('calcular_nota_final', llamadas, lambda: [ar.calcular_nota_final(d) for d in detalles], llamadas)
+    todos = df[list(ar.COLUMNAS_CAMPOS.values())].set_axis(ar.CALIFICACION_CAMPOS, axis=1)
+    notas = medidor.medir('calcular_notas_lote', filas, lambda: ar.calcular_notas_lote(todos))['P_NOTA_FINAL']
+
+    lista_notas = notas.head(llamadas).tolist()
+    medidor.medir('convertir_a_letra', llamadas, lambda: [ar.convertir_a_letra(n) for n in lista_notas], llamadas)
+    medidor.medir('convertir_a_letra_lote', filas, lambda: ar.convertir_a_letra_lote(notas))
+
+
+def _medir_main(medidor, principal, filas):
+    """Funciones de registro en memoria de main.py (crear, publicar, apelar)."""
+    principal.REGISTROS_CALIFICACION_SIMULADOS.clear()
+    llamadas = min(filas, LIMITE_POR_FILA)
+    campos = {'participacion': 18.0, 'cuaderno': 13.0, 'practica': 18.0, 'exposicion': 18.0, 'prueba_mensual': 23.0}
+    claves = [(f"Materia {i // 4}", i % 4 + 1) for i in range(llamadas)]
+
+    resultados = medidor.medir('main.crear_o_actualizar_registro', llamadas, lambda: [
+        principal.crear_o_actualizar_registro(2005, 1001, materia, periodo, campos, 'Basada en Proyectos')
+        for materia, periodo in claves
+    ], llamadas)
+    ids = [r['registro_ID'] for r in resultados]
+    medidor.medir('main.publicar_registro_calificacion', llamadas,
+                  lambda: [principal.publicar_registro_calificacion(2005, i) for i in ids], llamadas)
+    medidor.medir('main.crear_apelacion', llamadas,
+                  lambda: [principal.crear_apelacion(1001, i, "Revisión de la nota") for i in ids], llamadas)
+
+
+def comparar(resultados, ruta_anterior):
+    """Muestra la relación de tiempos contra una corrida anterior (> 1.0 es más lento)."""
+    with open(ruta_anterior, 'r', encoding='utf-8') as f:
+        anteriores = {(r['operacion'], r['filas']): r['segundos'] for r in json.load(f)['resultados']}
+    print(f"\n--- Comparación con {ruta_anterior} ---")
+    for r in resultados:
+        anterior = anteriores.get((r['operacion'], r['filas']))
+        if anterior:
+            print(f"{r['operacion']:<36} {r['filas']:>9,} filas  x{r['segundos'] / anterior:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de AutoRegister")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS, help="Cantidades de filas a medir")
+    parser.add_argument('--salida', default='benchmark_resultados.json', help="Archivo JSON de resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+    salida = os.path.abspath(args.salida)
+    anterior = os.path.abspath(args.comparar) if args.comparar else None
+
+    medidor = Medidor()
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Todo se ejecuta en una carpeta temporal: los módulos usan rutas relativas (CSV, contador de IDs)
+        os.chdir(carpeta)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import AutoRegister as ar
+            import main as principal
+            from benchmarks import escuela
+
+        for filas in args.tamanos:
+            print(f"\n=== {filas:,} filas (backend {ar.BACKEND_ALMACENAMIENTO}) ===")
+            os.makedirs(str(filas))
+            os.chdir(os.path.join(carpeta, str(filas)))
+            _medir_autoregister(medidor, ar, escuela, filas)
+            _medir_main(medidor, principal, filas)
+            os.chdir(carpeta)
+        os.chdir(original)
+
+    informe = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'backend': ar.BACKEND_ALMACENAMIENTO,
+        'resultados': medidor.resultados,
+    }
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+    if anterior:
+        comparar(medidor.resultados, anterior)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""
+Generación masiva de boletines de calificaciones (uno por estudiante).
+
+Cada boletín tiene todas las asignaturas del estudiante (una por profesor) con sus periodos P1-P4:
+el desglose por campo con los pesos de PESOS_CALIFICACION, la nota final y su letra, el promedio
+de la asignatura y el promedio general. Solo se muestran las notas publicadas.
+
+Los estudiantes se reparten en lotes que se generan en paralelo (un proceso por núcleo). Un
+manifiesto en la carpeta de salida guarda una huella de los datos de cada estudiante: en la
+siguiente corrida solo se regeneran los boletines cuyos datos cambiaron.
+
+Uso (desde la carpeta AutoRegister):
+    python boletines.py [--formato txt|html|json] [--carpeta boletines] [--procesos 4] [--forzar]
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import AutoRegister as ar
+
+FORMATOS = ('txt', 'html', 'json')
+VERSION_FORMATO = 1 # Cambiarla obliga a regenerar todos los boletines
+LOTES_POR_PROCESO = 4 # Lotes más chicos reparten mejor la carga entre los procesos
+
+# Columnas que aparecen en el boletín: si ninguna cambia, el boletín tampoco
+COLUMNAS_BOLETIN = ['estudiante_ID', 'profesor_ID', 'periodo', 'estado_publicacion', 'P_NOTA_FINAL',
+                    'version_escala', *ar.COLUMNAS_CAMPOS.values()]
+
+
+def construir_boletin(estudiante_id, filas):
+    """
+    Boletín (dict) de un estudiante a partir de sus filas (lista de dicts con COLUMNAS_BOLETIN
+    y 'letra' ya calculada para las notas publicadas).
+    """
+    asignaturas = {}
+    for fila in filas:
+        periodos = asignaturas.setdefault(fila['profesor_ID'], {})
+        if fila['estado_publicacion'] != True:
+            periodos[fila['periodo']] = {'publicada': False}
+            continue
+        periodos[fila['periodo']] = {
+            'publicada': True,
+            'nota': float(fila['P_NOTA_FINAL']),
+            'letra': fila['letra'],
+            'componentes': {campo: None if fila[columna] != fila[columna] else fila[columna]
+                            for campo, columna in ar.COLUMNAS_CAMPOS.items()},
+        }
+
+    lista = []
+    promedios = []
+    for profesor in sorted(asignaturas):
+        periodos = asignaturas[profesor]
+        # Mismo cálculo que promedio_general: notas publicadas sumadas en el orden de PERIODOS
+        notas = [periodos[p]['nota'] for p in ar.PERIODOS if periodos.get(p, {}).get('publicada')]
+        promedio = round(sum(notas) / len(notas), 2) if notas else None
+        if promedio is not None:
+            promedios.append(promedio)
+        lista.append({
+            'profesor_ID': profesor,
+            'periodos': {p: periodos[p] for p in ar.PERIODOS if p in periodos},
+            'promedio': promedio,
+            'letra_promedio': ar.convertir_a_letra(promedio) if promedio is not None else None,
+        })
+
+    promedio_general = round(sum(promedios) / len(promedios), 2) if promedios else None
+    return {
+        'estudiante_ID': estudiante_id,
+        'fecha': date.today().isoformat(),
+        'pesos': {campo: peso for campo, peso in ar.PESOS_CALIFICACION.items()},
+        'asignaturas': lista,
+        'promedio_general': promedio_general,
+        'letra_general': ar.convertir_a_letra(promedio_general) if promedio_general is not None else None,
+    }
+
+
+def _texto_nota(valor):
+    return '-' if valor is None else f"{valor:g}"
+
+
+def formato_texto(boletin):
+    pesos = boletin['pesos']
+    campos = list(pesos)
+    lineas = [
+        "BOLETÍN DE CALIFICACIONES",
+        f"Estudiante: {boletin['estudiante_ID']}",
+        f"Fecha: {boletin['fecha']}",
+        "",
+    ]
+    titulos = [f"{c} ({pesos[c] * 100:g}%)" for c in campos]
+    anchos = [len(titulo) + 2 for titulo in titulos]
+    encabezado = f"  {'Periodo':<8}" + ''.join(f"{t:>{a}}" for t, a in zip(titulos, anchos)) + f"{'Nota':>8}  Letra"
+    for asignatura in boletin['asignaturas']:
+        lineas.append(f"Asignatura (profesor {asignatura['profesor_ID']})")
+        lineas.append(encabezado)
+        for periodo, datos in asignatura['periodos'].items():
+            if not datos['publicada']:
+                lineas.append(f"  {periodo:<8}Pendiente de publicación")
+                continue
+            componentes = ''.join(f"{_texto_nota(datos['componentes'][c]):>{a}}" for c, a in zip(campos, anchos))
+            lineas.append(f"  {periodo:<8}{componentes}{datos['nota']:>8.2f}  {datos['letra']}")
+        if asignatura['promedio'] is not None:
+            lineas.append(f"  Promedio: {asignatura['promedio']:.2f} ({asignatura['letra_promedio']})")
+        lineas.append("")
+    if boletin['promedio_general'] is not None:
+        lineas.append(f"PROMEDIO GENERAL: {boletin['promedio_general']:.2f} ({boletin['letra_general']})")
+    else:
+        lineas.append("PROMEDIO GENERAL: sin notas publicadas")
+    return "\n".join(lineas) + "\n"
+
+
+def formato_html(boletin):
+    e = html.escape
+    pesos = boletin['pesos']
+    campos = list(pesos)
+    partes = [
+        "<!DOCTYPE html>",
+        "<html lang=\"es\"><head><meta charset=\"utf-8\">",
+        f"<title>Boletín {e(str(boletin['estudiante_ID']))}</title></head><body>",
+        "<h1>Boletín de calificaciones</h1>",
+        f"<p>Estudiante: {e(str(boletin['estudiante_ID']))}<br>Fecha: {e(boletin['fecha'])}</p>",
+    ]
+    encabezado = ''.join(f"<th>{e(c)} ({pesos[c] * 100:g}%)</th>" for c in campos)
+    for asignatura in boletin['asignaturas']:
+        partes.append(f"<h2>Asignatura (profesor {e(str(asignatura['profesor_ID']))})</h2>")
+        partes.append(f"<table border=\"1\"><tr><th>Periodo</th>{encabezado}<th>Nota</th><th>Letra</th></tr>")
+        for periodo, datos in asignatura['periodos'].items():
+            if not datos['publicada']:
+                partes.append(f"<tr><td>{e(periodo)}</td><td colspan=\"{len(campos) + 2}\">Pendiente de publicación</td></tr>")
+                continue
+            celdas = ''.join(f"<td>{_texto_nota(datos['componentes'][c])}</td>" for c in campos)
+            partes.append(f"<tr><td>{e(periodo)}</td>{celdas}<td>{datos['nota']:.2f}</td><td>{e(datos['letra'])}</td></tr>")
+        partes.append("</table>")
+        if asignatura['promedio'] is not None:
+            partes.append(f"<p>Promedio: {asignatura['promedio']:.2f} ({e(asignatura['letra_promedio'])})</p>")
+    if boletin['promedio_general'] is not None:
+        partes.append(f"<h2>Promedio general: {boletin['promedio_general']:.2f} ({e(boletin['letra_general'])})</h2>")
+    else:
+        partes.append("<h2>Promedio general: sin notas publicadas</h2>")
+    partes.append("</body></html>")
+    return "\n".join(partes) + "\n"
+
+
+def formato_json(boletin):
+    # Sin sangría: json usa su codificador en C (con indent usa el de Python, varias veces más lento)
+    return json.dumps(boletin, ensure_ascii=False) + "\n"
+
+
+_RENDERIZADORES = {'txt': formato_texto, 'html': formato_html, 'json': formato_json}
+
+
+def ruta_boletin(carpeta, estudiante_id, formato):
+    # El ID forma parte del nombre del archivo: se limpia como en instrumentacion.iniciar_accion
+    nombre = ''.join(c if c.isalnum() or c in '_-' else '_' for c in str(estudiante_id))
+    return os.path.join(carpeta, f"boletin_{nombre}.{formato}")
+
+
+def _generar_lote(datos, carpeta, formato):
+    """Escribe los boletines de los estudiantes del lote (se ejecuta en un proceso del pool)."""
+    publicadas = (datos['estado_publicacion'] == True).to_numpy()
+    letras = ar.np.full(len(datos), None, dtype=object)
+    if publicadas.any():
+        notas = ar.pd.to_numeric(datos['P_NOTA_FINAL'], errors='coerce').to_numpy()[publicadas]
+        letras[publicadas] = ar.convertir_a_letra_lote(notas, datos['version_escala'].to_numpy()[publicadas])
+    # Columnas a listas y luego a dicts por fila: mucho más rápido que to_dict('records') con columnas de texto
+    columnas = [*COLUMNAS_BOLETIN, 'letra']
+    valores = [datos[columna].tolist() for columna in COLUMNAS_BOLETIN] + [letras.tolist()]
+    registros = [dict(zip(columnas, fila)) for fila in zip(*valores)]
+
+    renderizar = _RENDERIZADORES[formato]
+    generados = 0
+    inicio = 0
+    # Las filas vienen ordenadas por estudiante: cada estudiante es un tramo contiguo
+    for fin in range(1, len(registros) + 1):
+        if fin == len(registros) or registros[fin]['estudiante_ID'] != registros[inicio]['estudiante_ID']:
+            estudiante = registros[inicio]['estudiante_ID']
+            boletin = construir_boletin(estudiante, registros[inicio:fin])
+            with open(ruta_boletin(carpeta, estudiante, formato), 'w', encoding='utf-8') as f:
+                f.write(renderizar(boletin))
+            generados += 1
+            inicio = fin
+    return generados
+
+
+def _firma_general():
+    """Huella de todo lo que no depende de los datos (pesos, escalas, formato)."""
+    contenido = json.dumps([VERSION_FORMATO, ar.PESOS_CALIFICACION, sorted(ar.ESCALA_CALIFICACION.items()),
+                            ar.ESCALAS.vigente], sort_keys=True)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def huellas_estudiantes(datos):
+    """Huella de los datos de cada estudiante ({estudiante_ID: hex}); no depende del orden de las filas."""
+    por_fila = ar.pd.util.hash_pandas_object(datos[COLUMNAS_BOLETIN], index=False)
+    por_estudiante = por_fila.groupby(datos['estudiante_ID'].to_numpy()).sum() # Suma módulo 2**64
+    return {estudiante: format(int(valor), '016x') for estudiante, valor in por_estudiante.items()}
+
+
+def _leer_manifiesto(ruta):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def generar_boletines(df, carpeta='boletines', formato='txt', procesos=None, forzar=False):
+    """
+    Genera los boletines de todos los estudiantes de df en 'carpeta'.
+    Solo se escriben los de estudiantes cuyos datos cambiaron desde la corrida anterior (o cuyo
+    archivo no existe), salvo con 'forzar'. Devuelve las estadísticas de la corrida.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (use {', '.join(FORMATOS)})")
+    inicio = time.perf_counter()
+    os.makedirs(carpeta, exist_ok=True)
+    procesos = procesos or os.cpu_count() or 1
+
+    datos = ar._normalizar_tipos(df[COLUMNAS_BOLETIN].copy())
+    huellas = huellas_estudiantes(datos)
+    ruta_manifiesto = os.path.join(carpeta, f"manifiesto_{formato}.json")
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    anteriores = manifiesto.get('estudiantes', {}) if manifiesto.get('firma') == _firma_general() and not forzar else {}
+    pendientes = [estudiante for estudiante, huella in huellas.items()
+                  if anteriores.get(estudiante) != huella or not os.path.exists(ruta_boletin(carpeta, estudiante, formato))]
+
+    generados = 0
+    if pendientes:
+        datos = datos[datos['estudiante_ID'].isin(pendientes)].sort_values(['estudiante_ID', 'profesor_ID'], kind='stable')
+        # Lotes de estudiantes completos: los cortes caen donde empieza un estudiante
+        cantidad_lotes = min(len(pendientes), procesos * LOTES_POR_PROCESO)
+        estudiantes = datos['estudiante_ID'].to_numpy()
+        cortes = sorted({int(estudiantes.searchsorted(estudiantes[len(estudiantes) * i // cantidad_lotes]))
+                         for i in range(cantidad_lotes)} | {len(estudiantes)})
+        lotes = [datos.iloc[a:b] for a, b in zip(cortes, cortes[1:])]
+        if procesos == 1 or len(lotes) == 1:
+            generados = sum(_generar_lote(lote, carpeta, formato) for lote in lotes)
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                generados = sum(pool.map(_generar_lote, lotes, [carpeta] * len(lotes), [formato] * len(lotes)))
+
+    # El manifiesto se escribe al final: si la corrida se interrumpe, lo pendiente se regenera la próxima vez
+    temporal = ruta_manifiesto + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'firma': _firma_general(), 'estudiantes': huellas}, f)
+    os.replace(temporal, ruta_manifiesto)
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'estudiantes': len(huellas),
+        'generados': generados,
+        'omitidos': len(huellas) - generados,
+        'procesos': procesos,
+        'segundos': round(segundos, 3),
+        'boletines_por_segundo': round(generados / segundos, 1) if segundos > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generación de boletines de calificaciones")
+    parser.add_argument('--formato', choices=FORMATOS, default='txt')
+    parser.add_argument('--carpeta', default='boletines', help="Carpeta de salida")
+    parser.add_argument('--procesos', type=int, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--forzar', action='store_true', help="Regenerar todos los boletines")
+    args = parser.parse_args()
+
+    ar.persistencia.vaciar()
+    df = ar.cargar_datos(sincronizar=False)
+    estadisticas = generar_boletines(df, args.carpeta, args.formato, args.procesos, args.forzar)
+    print(f"Boletines: {estadisticas['generados']} generados, {estadisticas['omitidos']} sin cambios "
+          f"({estadisticas['estudiantes']} estudiantes) en {estadisticas['segundos']:.2f} s con "
+          f"{estadisticas['procesos']} proceso(s): {estadisticas['boletines_por_segundo']:,.1f} boletines/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
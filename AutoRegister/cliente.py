@@ -0,0 +1,206 @@
+"""
+Cliente del servidor de calificaciones (servidor.py).
+
+ClienteCalificaciones expone las mismas funciones que main.py, sin el parámetro del usuario que
+ejecuta la acción: ese es siempre el usuario con el que se abrió el cliente. menu() es un menú de
+terminal mínimo sobre el cliente.
+
+Uso (con el servidor ya iniciado):
+    python cliente.py [--host 127.0.0.1] [--puerto 8765] [--socket /tmp/autoregister.sock]
+"""
+import argparse
+import itertools
+import json
+import socket
+import sys
+
+from main import PESOS_CALIFICACION
+from servidor import HOST, PUERTO
+
+
+class ErrorConexion(Exception):
+    """El servidor cerró la conexión o no respondió."""
+
+
+class ClienteCalificaciones:
+    def __init__(self, usuario, host=HOST, puerto=PUERTO, socket_unix=None):
+        self.usuario = usuario
+        if socket_unix:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(socket_unix)
+        else:
+            self._socket = socket.create_connection((host, puerto))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._archivo = self._socket.makefile('rwb')
+        self._ids = itertools.count(1)
+
+    def llamar(self, accion, **parametros):
+        """Envía una petición y devuelve la respuesta del servidor (dict)."""
+        peticion = {'id': next(self._ids), 'usuario': self.usuario, 'accion': accion, 'parametros': parametros}
+        self._archivo.write(json.dumps(peticion, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._archivo.flush()
+        linea = self._archivo.readline()
+        if not linea:
+            raise ErrorConexion("el servidor cerró la conexión")
+        respuesta = json.loads(linea)
+        respuesta.pop('id', None)
+        return respuesta
+
+    def gestionar_permisos(self):
+        return self.llamar('gestionar_permisos')
+
+    def consultar_registros(self):
+        return self.llamar('consultar_registros')
+
+    def crear_o_actualizar_registro(self, estudiante_id, materia, periodo_num, campos, metodologia):
+        return self.llamar('crear_o_actualizar_registro', estudiante_id=estudiante_id, materia=materia,
+                           periodo_num=periodo_num, campos=campos, metodologia=metodologia)
+
+    def publicar_registro_calificacion(self, registro_id):
+        return self.llamar('publicar_registro_calificacion', registro_id=registro_id)
+
+    def publicar_lote(self, profesor_id, materia, periodo_num):
+        return self.llamar('publicar_lote', profesor_id=profesor_id, materia=materia, periodo_num=periodo_num)
+
+    def crear_apelacion(self, registro_id, comentario):
+        return self.llamar('crear_apelacion', registro_id=registro_id, comentario=comentario)
+
+    def gestionar_apelacion_admin(self, registro_id, apelacion_id, nuevo_estado, respuesta_admin):
+        return self.llamar('gestionar_apelacion_admin', registro_id=registro_id, apelacion_id=apelacion_id,
+                           nuevo_estado=nuevo_estado, respuesta_admin=respuesta_admin)
+
+    def listar_apelaciones(self, estado='pendiente', limite=None):
+        return self.llamar('listar_apelaciones', estado=estado, limite=limite)
+
+    def modificar_nota_apelacion(self, registro_id, apelacion_id, nuevos_campos):
+        return self.llamar('modificar_nota_apelacion', registro_id=registro_id, apelacion_id=apelacion_id,
+                           nuevos_campos=nuevos_campos)
+
+    def cerrar(self):
+        self._archivo.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def _pedir_campos(campos):
+    """Pide un valor numérico por cada campo; Enter deja el campo sin cambio."""
+    valores = {}
+    for campo in campos:
+        texto = input(f"  {campo}: ").strip()
+        if texto:
+            try:
+                valores[campo] = float(texto)
+            except ValueError:
+                print(f"  Valor inválido para {campo}, se omite.")
+    return valores
+
+
+def _mostrar_registros(cliente):
+    respuesta = cliente.consultar_registros()
+    if not respuesta['exito']:
+        print(respuesta['mensaje'])
+        return
+    if not respuesta['registros']:
+        print("No hay registros.")
+    for r in respuesta['registros']:
+        estado = 'publicado' if r['publicado'] else 'borrador'
+        print(f"{r['registro_ID']}  est. {r['estudiante_ID']}  {r['materia']} P{r['periodo_numero']}  "
+              f"{r['calificacion_numerica']} ({r['calificacion_letras']})  {estado}")
+        for a in r.get('apelaciones_activas', []):
+            print(f"    apelación {a['apelacion_id']}  {a['estado']}  {a['comentario']}")
+
+
+def _mostrar_apelaciones(cliente):
+    estado = input("Estado (pendiente/aceptada/rechazada/corregida) [pendiente]: ").strip() or 'pendiente'
+    respuesta = cliente.listar_apelaciones(estado)
+    print(respuesta['mensaje'])
+    for a in respuesta.get('apelaciones', []):
+        print(f"  {a['fecha_creacion']}  apelación {a['apelacion_id']}  registro {a['registro_ID']}  "
+              f"est. {a['estudiante_id']}  {a['comentario']}")
+
+
+def _publicar_seccion(cliente, datos):
+    profesor = input(f"ID del profesor [{datos['USUARIO_ID']}]: ").strip() or datos['USUARIO_ID']
+    respuesta = cliente.publicar_lote(int(profesor), input("Materia: ").strip(), int(input("Periodo (1-4): ")))
+    print(respuesta['mensaje'])
+    for omitido in respuesta.get('omitidos', []):
+        print(f"  omitido {omitido['registro_ID']}: {omitido['motivo']}")
+
+
+def menu(cliente):
+    """Menú de terminal: muestra solo las opciones que permite el rol del usuario."""
+    acceso = cliente.gestionar_permisos()
+    if not acceso.get('autenticado'):
+        print(acceso['mensaje'])
+        return
+    permisos = acceso['permisos']
+    datos = acceso['datos']
+    opciones = [('1', "Ver registros", lambda: _mostrar_registros(cliente))]
+    if permisos['llenar_campos']:
+        opciones.append(('2', "Crear o actualizar registro", lambda: print(cliente.crear_o_actualizar_registro(
+            int(input("ID del estudiante: ")), input("Materia: ").strip(), int(input("Periodo (1-4): ")),
+            _pedir_campos(PESOS_CALIFICACION), input("Metodología: ").strip())['mensaje'])))
+    if permisos['publicar_nota']:
+        opciones.append(('3', "Publicar registro", lambda: print(
+            cliente.publicar_registro_calificacion(input("ID del registro: ").strip())['mensaje'])))
+        opciones.append(('8', "Publicar sección completa", lambda: _publicar_seccion(cliente, datos)))
+    if datos['usuario_rol'] == 'ESTUDIANTE':
+        opciones.append(('4', "Apelar una calificación", lambda: print(cliente.crear_apelacion(
+            input("ID del registro: ").strip(), input("Comentario: ").strip())['mensaje'])))
+    if permisos['admin_usuarios'] or permisos['modificar_final']:
+        opciones.append(('5', "Gestionar apelación", lambda: print(cliente.gestionar_apelacion_admin(
+            input("ID del registro: ").strip(), input("ID de la apelación: ").strip(),
+            input("Nuevo estado (aceptada/rechazada): ").strip(), input("Respuesta: ").strip())['mensaje'])))
+        opciones.append(('7', "Ver apelaciones por estado", lambda: _mostrar_apelaciones(cliente)))
+    if permisos['llenar_campos'] or permisos['modificar_final'] or permisos['editar_7dias']:
+        opciones.append(('6', "Corregir nota por apelación", lambda: print(cliente.modificar_nota_apelacion(
+            input("ID del registro: ").strip(), input("ID de la apelación: ").strip(),
+            _pedir_campos(PESOS_CALIFICACION))['mensaje'])))
+
+    print(f"\nBienvenido/a {datos['usuario_nombre']} {datos['usuario_apellido']} ({datos['usuario_rol']})")
+    while True:
+        print()
+        for clave, texto, _ in opciones:
+            print(f"{clave}. {texto}")
+        print("X. Salir")
+        eleccion = input("Seleccione una opción: ").strip().upper()
+        if eleccion == 'X':
+            break
+        accion = next((a for clave, _, a in opciones if clave == eleccion), None)
+        if accion is None:
+            print("Opción inválida.")
+            continue
+        try:
+            accion()
+        except ValueError:
+            print("Entrada inválida.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente del servidor de calificaciones")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--puerto', type=int, default=PUERTO)
+    parser.add_argument('--socket', help="Ruta del socket Unix del servidor")
+    args = parser.parse_args()
+
+    try:
+        usuario = int(input("Ingrese su ID de Usuario: ").strip())
+    except ValueError:
+        print("ID inválido.")
+        return 1
+    try:
+        with ClienteCalificaciones(usuario, args.host, args.puerto, args.socket) as cliente:
+            menu(cliente)
+    except (OSError, ErrorConexion) as e:
+        print(f"No se pudo comunicar con el servidor: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
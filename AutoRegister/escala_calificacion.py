@@ -0,0 +1,89 @@
+"""
+Escalas de calificación compiladas (nota numérica -> letra).
+Las usan AutoRegister.py y main.py: cada escala se ordena una sola vez y la búsqueda
+es un bisect, con una variante vectorizada para columnas completas de notas.
+numpy solo se importa cuando se usa la variante vectorizada.
+"""
+from bisect import bisect_right
+
+from importacion_diferida import ModuloDiferido
+
+np = ModuloDiferido('numpy')
+
+
+class EscalaCalificacion:
+    """
+    Escala de letras compilada a partir de {límite_inferior: letra}.
+    Una nota recibe la letra del mayor límite que sea <= nota, así las notas
+    fraccionarias (92.5) caen en su tramo en lugar de quedar entre dos rangos.
+    """
+    def __init__(self, limites, letra_debajo='F'):
+        orden = sorted((float(limite), letra) for limite, letra in limites.items())
+        self._limites = [limite for limite, _ in orden]
+        self._letras = [letra for _, letra in orden]
+        self._limites_np = None # Copias en numpy para letras(), creadas en el primer uso
+        self._letras_np = None
+        self.letra_debajo = letra_debajo # Para notas menores al primer límite o vacías
+
+    @classmethod
+    def desde_rangos(cls, rangos, letra_debajo='N/A'):
+        """
+        Construye la escala desde rangos {(mínimo, máximo): letra} como ESCALA_LETRA de main.py.
+        Solo cuenta el mínimo de cada rango: el tramo llega hasta el mínimo del siguiente.
+        """
+        return cls({minimo: letra for (minimo, _), letra in rangos.items()}, letra_debajo)
+
+    def letra(self, nota):
+        """Letra de una sola nota."""
+        nota = float(nota)
+        if nota != nota: # NaN
+            return self.letra_debajo
+        posicion = bisect_right(self._limites, nota) - 1
+        return self._letras[posicion] if posicion >= 0 else self.letra_debajo
+
+    def letras(self, notas):
+        """Versión vectorizada de letra() para una columna completa de notas."""
+        if self._limites_np is None:
+            self._limites_np = np.array(self._limites, dtype=float)
+            self._letras_np = np.array(self._letras, dtype=object)
+        notas = np.asarray(notas, dtype=float)
+        posiciones = np.searchsorted(self._limites_np, notas, side='right') - 1
+        sin_letra = (posiciones < 0) | np.isnan(notas)
+        return np.where(sin_letra, self.letra_debajo, self._letras_np[posiciones.clip(0)])
+
+
+class RegistroEscalas:
+    """
+    Escalas versionadas: los periodos ya publicados conservan la escala con la que se publicaron
+    aunque la institución adopte una escala nueva. Las notas sin versión usan la vigente.
+    """
+    def __init__(self):
+        self._escalas = {}
+        self.vigente = None
+
+    def registrar(self, version, escala, vigente=True):
+        """Agrega una versión de escala (por defecto pasa a ser la vigente)."""
+        self._escalas[str(version)] = escala
+        if vigente or self.vigente is None:
+            self.vigente = str(version)
+
+    def obtener(self, version=None):
+        """Escala de una versión; si no se indica (o no existe) devuelve la vigente."""
+        if version is None or version != version: # None o NaN
+            return self._escalas[self.vigente]
+        return self._escalas.get(str(version), self._escalas[self.vigente])
+
+    def letra(self, nota, version=None):
+        return self.obtener(version).letra(nota)
+
+    def letras(self, notas, versiones=None):
+        """Letras de una columna de notas, cada una con la escala de su versión."""
+        if versiones is None:
+            return self.obtener().letras(notas)
+        notas = np.asarray(notas, dtype=float)
+        versiones = np.asarray([None if v is None or v != v else str(v) for v in versiones], dtype=object)
+        resultado = np.empty(len(notas), dtype=object)
+        for version in set(versiones):
+            mascara = versiones == version
+            resultado[mascara] = self.obtener(version).letras(notas[mascara])
+        return resultado
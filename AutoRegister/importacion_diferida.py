@@ -0,0 +1,31 @@
+"""
+Importación diferida de módulos pesados (pandas, numpy).
+
+El módulo real se importa la primera vez que se usa uno de sus atributos: importar AutoRegister.py
+o main.py no paga el costo de pandas (medio segundo o más) hasta que de verdad se toca un DataFrame.
+"""
+import importlib
+
+
+class ModuloDiferido:
+    """Representa a un módulo que se importa al usar el primero de sus atributos (pd.DataFrame, np.where...)."""
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def cargar(self):
+        """Importa el módulo (una sola vez) y lo devuelve."""
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        # Solo se llama para atributos que todavía no están copiados en esta instancia
+        valor = getattr(self.cargar(), atributo)
+        setattr(self, atributo, valor) # Los siguientes accesos ya no pasan por aquí
+        return valor
+
+    def __repr__(self):
+        estado = 'cargado' if self._modulo is not None else 'sin cargar'
+        return f"<módulo diferido '{self._nombre}' ({estado})>"
+
@@ -0,0 +1,200 @@
+"""
+Instrumentación opcional de AutoRegister (desactivada por defecto).
+
+Registra por operación: cantidad de llamadas, tiempo (wall), filas tocadas y bytes leídos/escritos.
+Cubre las funciones de almacenamiento, el cálculo de notas, la verificación de permisos y cada
+acción de los menús flujo_*. Al salir del programa vuelca las métricas en JSON o en formato
+de texto de Prometheus. Con un perfil ('cprofile' o 'tracemalloc') guarda además un archivo
+por acción de menú en la carpeta de perfiles.
+
+Se activa con los argumentos --metricas / --profile de AutoRegister.py o con las variables
+de entorno AUTOREGISTER_METRICAS (json | prometheus) y AUTOREGISTER_PERFIL.
+"""
+import atexit
+import builtins
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+
+FORMATOS = ('json', 'prometheus')
+PERFILES = ('cprofile', 'tracemalloc')
+
+_estado = {
+    'activa': False,
+    'formato': 'json',
+    'ruta': None,
+    'perfil': None,
+    'carpeta_perfiles': 'perfiles',
+    'espera_usuario': 0.0, # Segundos bloqueados en input(): no se cuentan en las acciones de menú
+}
+_metricas = defaultdict(lambda: {'llamadas': 0, 'segundos': 0.0, 'filas': 0, 'bytes_leidos': 0, 'bytes_escritos': 0})
+_accion_actual = None
+_input_original = builtins.input
+
+
+def activa():
+    return _estado['activa']
+
+
+def activar(formato='json', ruta=None, perfil=None, carpeta_perfiles='perfiles'):
+    """Activa la instrumentación y registra el volcado de métricas al salir."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de métricas no soportado: {formato} (use {' o '.join(FORMATOS)})")
+    if perfil is not None and perfil not in PERFILES:
+        raise ValueError(f"Perfil no soportado: {perfil} (use {' o '.join(PERFILES)})")
+
+    extension = 'json' if formato == 'json' else 'prom'
+    _estado.update(activa=True, formato=formato, ruta=ruta or f"metricas_autoregister.{extension}",
+                   perfil=perfil, carpeta_perfiles=carpeta_perfiles)
+    if perfil:
+        os.makedirs(carpeta_perfiles, exist_ok=True)
+    if perfil == 'tracemalloc' and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    # El tiempo que el usuario tarda en escribir no es parte del costo de una acción
+    builtins.input = _input_medido
+    atexit.register(volcar)
+
+
+def activar_desde_entorno():
+    """Activa la instrumentación si AUTOREGISTER_METRICAS o AUTOREGISTER_PERFIL están definidas."""
+    formato = os.environ.get('AUTOREGISTER_METRICAS')
+    perfil = os.environ.get('AUTOREGISTER_PERFIL')
+    if formato or perfil:
+        activar(formato or 'json', os.environ.get('AUTOREGISTER_METRICAS_ARCHIVO'), perfil)
+
+
+def _input_medido(*args):
+    inicio = time.perf_counter()
+    try:
+        return _input_original(*args)
+    finally:
+        _estado['espera_usuario'] += time.perf_counter() - inicio
+
+
+def sumar(nombre, llamadas=0, segundos=0.0, filas=0, bytes_leidos=0, bytes_escritos=0):
+    """Suma valores a la métrica 'nombre' (no hace nada si la instrumentación está apagada)."""
+    if not _estado['activa']:
+        return
+    metrica = _metricas[nombre]
+    metrica['llamadas'] += llamadas
+    metrica['segundos'] += segundos
+    metrica['filas'] += filas
+    metrica['bytes_leidos'] += bytes_leidos
+    metrica['bytes_escritos'] += bytes_escritos
+
+
+def _contar_filas(valor):
+    try:
+        return len(valor)
+    except TypeError:
+        return 0
+
+
+def instrumentar(nombre=None, filas=None):
+    """
+    Decorador: cuenta llamadas y tiempo de la función.
+    'filas' puede ser 'resultado' (len del valor devuelto) o una función (resultado, *args, **kwargs) -> int.
+    Con la instrumentación apagada solo agrega una comprobación por llamada.
+    """
+    def decorador(funcion):
+        nombre_metrica = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _estado['activa']:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            segundos = time.perf_counter() - inicio
+            if filas == 'resultado':
+                cantidad = _contar_filas(resultado)
+            elif filas is not None:
+                cantidad = filas(resultado, *args, **kwargs)
+            else:
+                cantidad = 0
+            sumar(nombre_metrica, llamadas=1, segundos=segundos, filas=cantidad)
+            return resultado
+        return envoltura
+    return decorador
+
+
+def iniciar_accion(nombre):
+    """
+    Marca el inicio de una acción de menú (se cierra con terminar_accion, al volver al menú).
+    Con --profile también empieza a perfilar la acción.
+    """
+    global _accion_actual
+    if not _estado['activa']:
+        return
+    terminar_accion()
+    # Lo que escribe el usuario puede ser cualquier texto: se limpia para usarlo como nombre de archivo
+    nombre = ''.join(c if c.isalnum() or c in '._-' else '_' for c in nombre)
+    if nombre.endswith('.'):
+        nombre += 'vacia'
+    accion = {'nombre': nombre, 'inicio': time.perf_counter(), 'espera': _estado['espera_usuario']}
+    if _estado['perfil'] == 'cprofile':
+        accion['perfilador'] = cProfile.Profile()
+        accion['perfilador'].enable()
+    elif _estado['perfil'] == 'tracemalloc':
+        accion['instantanea'] = tracemalloc.take_snapshot()
+    _accion_actual = accion
+
+
+def terminar_accion():
+    """Cierra la acción de menú en curso (si hay una) y guarda su perfil."""
+    global _accion_actual
+    accion, _accion_actual = _accion_actual, None
+    if accion is None:
+        return
+    espera = _estado['espera_usuario'] - accion['espera']
+    segundos = time.perf_counter() - accion['inicio'] - espera
+    sumar(f"accion.{accion['nombre']}", llamadas=1, segundos=segundos)
+
+    numero = _metricas[f"accion.{accion['nombre']}"]['llamadas']
+    base = os.path.join(_estado['carpeta_perfiles'], f"{accion['nombre']}_{numero}")
+    if 'perfilador' in accion:
+        accion['perfilador'].disable()
+        accion['perfilador'].dump_stats(base + ".prof")
+    elif 'instantanea' in accion:
+        diferencias = tracemalloc.take_snapshot().compare_to(accion['instantanea'], 'lineno')
+        actual, pico = tracemalloc.get_traced_memory()
+        with open(base + ".txt", 'w', encoding='utf-8') as f:
+            f.write(f"Memoria actual: {actual} bytes, pico: {pico} bytes\n")
+            for diferencia in diferencias[:25]:
+                f.write(f"{diferencia}\n")
+
+
+def metricas():
+    """Copia de las métricas acumuladas {operación: {llamadas, segundos, filas, bytes_leidos, bytes_escritos}}."""
+    return {nombre: dict(valores) for nombre, valores in sorted(_metricas.items())}
+
+
+def texto_prometheus():
+    """Métricas en formato de texto de Prometheus."""
+    lineas = []
+    for campo, descripcion in (('llamadas', 'Llamadas por operación'), ('segundos', 'Tiempo acumulado por operación'),
+                               ('filas', 'Filas tocadas por operación'), ('bytes_leidos', 'Bytes leídos por operación'),
+                               ('bytes_escritos', 'Bytes escritos por operación')):
+        metrica = f"autoregister_{campo}_total"
+        lineas.append(f"# HELP {metrica} {descripcion}")
+        lineas.append(f"# TYPE {metrica} counter")
+        for nombre, valores in metricas().items():
+            lineas.append(f'{metrica}{{operacion="{nombre}"}} {valores[campo]}')
+    return "\n".join(lineas) + "\n"
+
+
+def volcar(ruta=None):
+    """Escribe las métricas en el archivo configurado (se llama automáticamente al salir)."""
+    if not _estado['activa']:
+        return
+    terminar_accion()
+    ruta = ruta or _estado['ruta']
+    with open(ruta, 'w', encoding='utf-8') as f:
+        if _estado['formato'] == 'prometheus':
+            f.write(texto_prometheus())
+        else:
+            json.dump(metricas(), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,62 @@
+"""
+Motor de permisos compilado, compartido por AutoRegister.py y main.py.
+
+Cada tabla {rol: {permiso: bool}} se compila una sola vez: cada permiso pasa a ser un bit y cada
+rol un entero (máscara) inmutable. Verificar un permiso es entonces una búsqueda en un dict y un
+AND de bits. Los permisos de un rol también se entregan como un mapeo inmutable (MappingProxyType)
+creado una sola vez, así los que llaman pueden guardarlo sin copiarlo.
+
+Las máscaras dan exactamente lo mismo que las tablas originales: un permiso que la tabla no
+define para un rol (o un rol desconocido) equivale a False.
+"""
+from types import MappingProxyType
+
+
+class PermisosCompilados:
+    def __init__(self, tabla_roles):
+        nombres = list(dict.fromkeys(permiso for permisos in tabla_roles.values() for permiso in permisos))
+        # Dicts internos para las verificaciones (más rápidos que leer a través de MappingProxyType);
+        # hacia afuera solo se exponen las vistas inmutables
+        self._bits = {permiso: 1 << posicion for posicion, permiso in enumerate(nombres)}
+        self._mascaras = {rol: sum(self._bits[permiso] for permiso, valor in permisos.items() if valor)
+                          for rol, permisos in tabla_roles.items()}
+        self.bits = MappingProxyType(self._bits)
+        self.mascaras = MappingProxyType(self._mascaras)
+        # Vista inmutable por rol, con las mismas claves que la tabla y valores bool
+        self._vistas = {rol: MappingProxyType({permiso: bool(valor) for permiso, valor in permisos.items()})
+                        for rol, permisos in tabla_roles.items()}
+
+    def mascara(self, *permisos):
+        """Máscara con los bits de los permisos indicados (0 para permisos que no existen)."""
+        resultado = 0
+        for permiso in permisos:
+            resultado |= self._bits.get(permiso, 0)
+        return resultado
+
+    def permite(self, rol, permiso):
+        """True si el rol tiene el permiso."""
+        return self._mascaras.get(rol, 0) & self._bits.get(permiso, 0) != 0
+
+    def permite_alguno(self, rol, *permisos):
+        """True si el rol tiene al menos uno de los permisos."""
+        return bool(self._mascaras.get(rol, 0) & self.mascara(*permisos))
+
+    def permite_todos(self, rol, *permisos):
+        """True si el rol tiene todos los permisos (False si alguno no existe)."""
+        if any(permiso not in self._bits for permiso in permisos):
+            return False
+        requerida = self.mascara(*permisos)
+        return self._mascaras.get(rol, 0) & requerida == requerida
+
+    def permite_lote(self, roles, permiso):
+        """Verificación en lote: una lista de bool, uno por rol (en el mismo orden)."""
+        bit = self._bits.get(permiso, 0)
+        mascaras = self._mascaras
+        return [mascaras.get(rol, 0) & bit != 0 for rol in roles]
+
+    def permisos(self, rol):
+        """Permisos del rol como mapeo inmutable ({permiso: bool}); None si el rol no existe."""
+        return self._vistas.get(rol)
+
+    def __contains__(self, rol):
+        return rol in self._mascaras
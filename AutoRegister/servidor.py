@@ -0,0 +1,175 @@
+"""
+Servidor local de calificaciones para varios usuarios a la vez.
+
+Mantiene un único estado en memoria (los registros de main.py) y atiende las funciones de
+main.py como peticiones: gestionar_permisos, crear_o_actualizar_registro,
+publicar_registro_calificacion, publicar_lote, crear_apelacion, gestionar_apelacion_admin,
+modificar_nota_apelacion y listar_apelaciones, más consultar_registros para que los menús puedan
+mostrar los registros.
+
+Protocolo: una línea JSON por petición y una línea JSON por respuesta, en el mismo orden.
+    {"id": 1, "usuario": 2005, "accion": "publicar_registro_calificacion", "parametros": {"registro_id": "..."}}
+    {"id": 1, "exito": true, "mensaje": "..."}
+
+Cada petición se autentica por separado con las tablas de roles (USUARIOS_SIMULADOS / ROLES_PERMISOS):
+el usuario que la envía es quien ejecuta la acción, no se puede actuar en nombre de otro.
+Las funciones de main.py son rápidas y no bloquean, así que se ejecutan directamente en el bucle
+de eventos: cada petición se aplica completa antes de la siguiente y no hacen falta bloqueos.
+
+Uso (desde la carpeta AutoRegister):
+    python servidor.py [--host 127.0.0.1] [--puerto 8765]
+    python servidor.py --socket /tmp/autoregister.sock     (socket Unix, solo Linux/macOS)
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from types import MappingProxyType
+
+import instrumentacion
+import main as nucleo
+
+HOST = '127.0.0.1'
+PUERTO = 8765
+LIMITE_LINEA = 1024 * 1024 # Bytes máximos de una petición
+
+# Roles que ven todos los registros en consultar_registros (el resto solo ve los suyos)
+ROLES_VEN_TODO = ('DIRECTOR', 'ADMINISTRACION', 'ENCARGADA_REGISTRO')
+
+
+def consultar_registros(user_id: int):
+    """Registros visibles para el usuario: los propios (estudiante/profesor) o todos (roles administrativos)."""
+    permisos_data = nucleo.gestionar_permisos(user_id)
+    if not permisos_data['autenticado'] or not permisos_data['permisos'].get('ver_notas'):
+        return {'exito': False, 'mensaje': "permiso denegado: el usuario no puede ver calificaciones."}
+
+    rol = permisos_data['datos']['usuario_rol']
+    if rol in ROLES_VEN_TODO:
+        registros = list(nucleo.REGISTROS_CALIFICACION_SIMULADOS)
+    else:
+        clave = 'estudiante_ID' if rol == 'ESTUDIANTE' else 'profesor_ID'
+        registros = [r for r in nucleo.REGISTROS_CALIFICACION_SIMULADOS if r[clave] == user_id]
+    return {'exito': True, 'mensaje': f"{len(registros)} registro(s).", 'registros': registros}
+
+
+# acción -> (función, parámetro con el ID de quien la ejecuta)
+ACCIONES = {
+    'gestionar_permisos': (nucleo.gestionar_permisos, 'user_id'),
+    'consultar_registros': (consultar_registros, 'user_id'),
+    'crear_o_actualizar_registro': (nucleo.crear_o_actualizar_registro, 'profesor_id'),
+    'publicar_registro_calificacion': (nucleo.publicar_registro_calificacion, 'user_id_publicador'),
+    'publicar_lote': (nucleo.publicar_lote, 'user_id_publicador'),
+    'crear_apelacion': (nucleo.crear_apelacion, 'estudiante_id'),
+    'gestionar_apelacion_admin': (nucleo.gestionar_apelacion_admin, 'user_id_admin'),
+    'modificar_nota_apelacion': (nucleo.modificar_nota_apelacion, 'user_id_editor'),
+    'listar_apelaciones': (nucleo.listar_apelaciones, 'user_id_admin'),
+}
+
+
+def _serializable(valor):
+    """Valores que json no conoce: los permisos (mapeo inmutable) como dict y el resto como texto."""
+    return dict(valor) if isinstance(valor, MappingProxyType) else str(valor)
+
+
+class ServidorCalificaciones:
+    """Atiende las peticiones de los clientes sobre el estado en memoria de main.py."""
+    def __init__(self):
+        self.peticiones = 0
+        self.conexiones = 0
+        self._servidor = None
+
+    def atender(self, peticion):
+        """Autentica la petición, ejecuta la acción y devuelve la respuesta (dict)."""
+        if not isinstance(peticion, dict):
+            return {'exito': False, 'mensaje': "error: la petición debe ser un objeto JSON."}
+        accion = peticion.get('accion')
+        if accion not in ACCIONES:
+            return {'exito': False, 'mensaje': f"error: acción desconocida '{accion}'."}
+        funcion, parametro_usuario = ACCIONES[accion]
+
+        usuario = peticion.get('usuario')
+        if not isinstance(usuario, int) or not nucleo.gestionar_permisos(usuario)['autenticado']:
+            return {'exito': False, 'mensaje': "permiso denegado: usuario no autenticado."}
+
+        parametros = dict(peticion.get('parametros') or {})
+        if parametros.setdefault(parametro_usuario, usuario) != usuario:
+            return {'exito': False, 'mensaje': "permiso denegado: no puede ejecutar acciones en nombre de otro usuario."}
+
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(**parametros)
+        except TypeError as e:
+            return {'exito': False, 'mensaje': f"error: parámetros inválidos para '{accion}': {e}"}
+        except Exception as e:
+            return {'exito': False, 'mensaje': f"error interno al ejecutar '{accion}': {e}"}
+        finally:
+            instrumentacion.sumar(f"servidor.{accion}", llamadas=1, segundos=time.perf_counter() - inicio)
+        return resultado
+
+    async def _conexion(self, lector, escritor):
+        self.conexiones += 1
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    escritor.write(b'{"exito": false, "mensaje": "error: peticion demasiado grande."}\n')
+                    break
+                except ConnectionError:
+                    break
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                self.peticiones += 1
+                try:
+                    peticion = json.loads(linea)
+                except ValueError:
+                    respuesta = {'exito': False, 'mensaje': "error: la petición no es JSON válido."}
+                else:
+                    respuesta = self.atender(peticion)
+                    if isinstance(peticion, dict) and 'id' in peticion:
+                        respuesta = {'id': peticion['id'], **respuesta}
+                escritor.write(json.dumps(respuesta, ensure_ascii=False, default=_serializable).encode('utf-8') + b'\n')
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.conexiones -= 1
+            escritor.close()
+
+    async def iniciar(self, host=HOST, puerto=PUERTO, socket_unix=None):
+        """Empieza a escuchar (TCP en host:puerto o un socket Unix) y devuelve la dirección."""
+        if socket_unix:
+            self._servidor = await asyncio.start_unix_server(self._conexion, path=socket_unix, limit=LIMITE_LINEA)
+            return socket_unix
+        self._servidor = await asyncio.start_server(self._conexion, host, puerto, limit=LIMITE_LINEA)
+        host, puerto = self._servidor.sockets[0].getsockname()[:2]
+        return f"{host}:{puerto}"
+
+    async def servir(self, host=HOST, puerto=PUERTO, socket_unix=None):
+        direccion = await self.iniciar(host, puerto, socket_unix)
+        print(f"Servidor de calificaciones escuchando en {direccion}", flush=True)
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de calificaciones (main.py)")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--puerto', type=int, default=PUERTO, help="Puerto TCP (0 = uno libre)")
+    parser.add_argument('--socket', help="Ruta de un socket Unix (en lugar de TCP)")
+    args = parser.parse_args()
+
+    instrumentacion.activar_desde_entorno()
+    servidor = ServidorCalificaciones()
+    try:
+        asyncio.run(servidor.servir(args.host, args.puerto, args.socket))
+    except KeyboardInterrupt:
+        print(f"\nServidor detenido ({servidor.peticiones} peticiones atendidas).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
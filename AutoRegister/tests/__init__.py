@@ -0,0 +1,6 @@
+"""
+Pruebas de AutoRegister (unittest, sin dependencias extra).
+
+Uso (desde la carpeta AutoRegister):
+    python -m unittest discover -s tests -t .
+"""
@@ -0,0 +1,67 @@
+"""Base de las pruebas: cada caso trabaja en una carpeta temporal con su propio CSV."""
+import builtins
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import pandas as pd
+    import AutoRegister as ar
+
+
+def registro(registro_id, estudiante, profesor, periodo, nota=80.0, publicado=False, metodo='Clase práctica'):
+    """Fila completa de COLUMNS con las notas de todos los campos iguales a 'nota'."""
+    return {
+        'ID_REGISTRO': registro_id, 'estudiante_ID': estudiante, 'profesor_ID': profesor, 'periodo': periodo,
+        'fecha_publicacion': '2026-01-10 08:00:00' if publicado else None, 'estado_publicacion': publicado,
+        'estado_revision': ar.ESTADO_INICIAL_NOTA, 'P_NOTA_FINAL': nota, 'P_METODO_ENS': metodo,
+        **{columna: nota for columna in ar.COLUMNAS_CAMPOS.values()},
+        'promedio_general': None, 'version_escala': ar.ESCALAS.vigente if publicado else None, 'version': 0,
+    }
+
+
+class CasoConDatos(unittest.TestCase):
+    """Carpeta temporal como directorio de trabajo, estado del módulo limpio y guardado diferido en 0 s."""
+    def setUp(self):
+        self._carpeta_original = os.getcwd()
+        self._temporal = tempfile.TemporaryDirectory()
+        os.chdir(self._temporal.name)
+        self.addCleanup(self._limpiar)
+        ar._sincronizacion.update(firma_base=None, offset_journal=0, filas_journal=0)
+        ar.cache_tablas.invalidar()
+        ar.indice_paginas = ar.IndicePaginas()
+        ar._almacen_sqlite = None # La ruta de la base es relativa a la carpeta de trabajo
+        self._persistencia_original = ar.persistencia
+        ar.persistencia = ar.PersistenciaDiferida(intervalo=0.01)
+
+    def _limpiar(self):
+        ar.persistencia.detener()
+        ar.persistencia = self._persistencia_original
+        if ar._almacen_sqlite is not None:
+            if ar._almacen_sqlite._conexion is not None:
+                ar._almacen_sqlite._conexion.close()
+            ar._almacen_sqlite = None
+        os.chdir(self._carpeta_original)
+        self._temporal.cleanup()
+
+    def escribir_csv(self, registros):
+        pd.DataFrame(registros, columns=ar.COLUMNS).to_csv(ar.ARCHIVO_CSV, index=False, encoding='utf-8')
+
+    def cargar(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ar.cargar_datos()
+
+    def ejecutar(self, funcion, *args, respuestas=(), **kwargs):
+        """Llama a funcion con input() respondiendo 'respuestas' en orden; devuelve (resultado, salida)."""
+        pendientes = iter(respuestas)
+        original = builtins.input
+        builtins.input = lambda prompt='': next(pendientes)
+        salida = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(salida):
+                resultado = funcion(*args, **kwargs)
+        finally:
+            builtins.input = original
+        return resultado, salida.getvalue()
@@ -0,0 +1,39 @@
+"""Contadores de alertas (IndiceAlertas) frente a una recarga del archivo."""
+import contextlib
+import io
+import unittest
+
+from tests.base import CasoConDatos, registro, ar
+
+
+class BorradorSinMetodo(CasoConDatos):
+    """'' y ESTADO_INICIAL_NOTA cuentan como método faltante igual que después de recargar (NaN)."""
+    def setUp(self):
+        super().setUp()
+        self.escribir_csv([registro('b1', '2001', '101', 'P1'), registro('b2', '2002', '101', 'P1')])
+
+    def _sin_metodo(self):
+        return ar.indice_alertas.sin_metodo[('101', 'P1')]
+
+    def test_contador_igual_antes_y_despues_de_recargar(self):
+        for valor in ('', '   ', ar.ESTADO_INICIAL_NOTA):
+            with self.subTest(valor=valor):
+                df = self.cargar()
+                self.assertEqual(self._sin_metodo(), 0)
+                ar.asignar_valores(df, df.index[df['ID_REGISTRO'] == 'b1'], 'P_METODO_ENS', valor)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertTrue(ar.guardar_datos(df, ['b1']))
+                self.assertEqual(self._sin_metodo(), 1)
+
+                self.cargar()
+                self.assertEqual(self._sin_metodo(), 1)
+
+                # Se restaura el método para la siguiente variante
+                df = self.cargar()
+                ar.asignar_valores(df, df.index[df['ID_REGISTRO'] == 'b1'], 'P_METODO_ENS', 'Clase práctica')
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertTrue(ar.guardar_datos(df, ['b1']))
+
+
+if __name__ == '__main__':
+    unittest.main()
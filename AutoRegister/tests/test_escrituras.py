@@ -0,0 +1,24 @@
+"""Escrituras de los menús al DataFrame de trabajo: pasan por asignar_valores (esquema de tipos)."""
+import unittest
+
+from tests.base import CasoConDatos, registro, ar
+
+
+class SolicitarRevision(CasoConDatos):
+    """La categoría 'PENDIENTE' no tiene que estar precargada en estado_revision."""
+    def setUp(self):
+        super().setUp()
+        self.escribir_csv([registro('p1', '2001', '101', 'P1', publicado=True)])
+
+    def test_categoria_nueva(self):
+        df = self.cargar()
+        df['estado_revision'] = df['estado_revision'].cat.set_categories([ar.ESTADO_INICIAL_NOTA])
+        df, salida = self.ejecutar(ar.solicitar_revision, df, '2001', 'P1', respuestas=['La nota no incluye la exposición'])
+        self.assertIn('enviada', salida)
+        self.assertEqual(df.at[df.index[0], 'estado_revision'], 'PENDIENTE')
+        ar.persistencia.vaciar(df)
+        self.assertEqual(self.cargar().at[0, 'estado_revision'], 'PENDIENTE')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Paginación por clave del CSV (consultar_pagina) frente a la tabla completa de cargar_datos."""
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from tests.base import CasoConDatos, registro, ar
+
+
+class PaginacionCsv(CasoConDatos):
+    """Índice de posiciones chico para que las páginas crucen varios saltos del archivo base."""
+    COLUMNAS = ['ID_REGISTRO', 'estudiante_ID', 'profesor_ID', 'periodo', 'P_NOTA_FINAL', 'P_METODO_ENS']
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(mock.patch.object(ar.IndicePaginas, 'PASO', 7))
+        registros = [registro(f'r{n:03d}', str(2000 + n % 13), str(100 + n % 3), ar.PERIODOS[n % 4], nota=50.0 + n % 50)
+                     for n in range(120)]
+        # Un campo entre comillas con coma, comillas y salto de línea no debe correr las posiciones
+        registros[30]['P_METODO_ENS'] = 'Taller, "grupal"\ny exposición'
+        self.escribir_csv(registros)
+
+    def _paginas(self, tamano, **filtros):
+        """Todas las páginas seguidas con la clave que devuelve cada una."""
+        partes, despues_de = [], None
+        while True:
+            pagina, despues_de = ar.consultar_pagina(self.COLUMNAS, despues_de, tamano, **filtros)
+            partes.append(pagina)
+            if despues_de is None:
+                return ar.pd.concat(partes)
+
+    def _comparar(self, tamano, **filtros):
+        tabla = ar.consultar_registros(None, self.COLUMNAS, **filtros)
+        paginas = self._paginas(tamano, **filtros)
+        self.assertEqual(paginas['ID_REGISTRO'].astype(str).tolist(), tabla['ID_REGISTRO'].astype(str).tolist())
+        self.assertEqual(paginas['P_NOTA_FINAL'].tolist(), tabla['P_NOTA_FINAL'].tolist())
+        self.assertEqual(paginas['P_METODO_ENS'].astype(str).tolist(), tabla['P_METODO_ENS'].astype(str).tolist())
+
+    def test_paginas_recorren_la_tabla(self):
+        for tamano in (1, 5, 7, 11, 50):
+            with self.subTest(tamano=tamano):
+                self._comparar(tamano)
+        self._comparar(4, profesor_ID='101')
+        self._comparar(3, periodo='P2', profesor_ID='100')
+
+    def test_journal_reemplaza_y_agrega(self):
+        df = self.cargar()
+        ar.asignar_valores(df, df.index[df['ID_REGISTRO'] == 'r050'], 'P_NOTA_FINAL', 10.0)
+        df = ar.concatenar_registros(df, ar.pd.DataFrame(
+            [registro(f'n{n}', '3000', '101', 'P1', nota=70.0 + n) for n in range(9)], columns=ar.COLUMNS))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(ar.guardar_datos(df, ['r050', *[f'n{n}' for n in range(9)]]))
+        self._comparar(8)
+        self._comparar(2, profesor_ID='101')
+
+    def test_pagina_no_relee_el_archivo_base(self):
+        self._paginas(10)
+        self.assertEqual(ar.indice_paginas.construcciones, 1)
+        df = self.cargar()
+        df = ar.concatenar_registros(df, ar.pd.DataFrame([registro('n0', '3000', '101', 'P1')], columns=ar.COLUMNS))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(ar.guardar_datos(df, ['n0']))
+
+        # Escribir en el journal no cambia el archivo base: el índice sigue valiendo
+        with mock.patch.object(ar, '_leer_csv', wraps=ar._leer_csv) as leer:
+            pagina, _ = ar.consultar_pagina(self.COLUMNAS, 99, 10)
+            ultima, siguiente = ar.consultar_pagina(self.COLUMNAS, 119, 10)
+        self.assertEqual(pagina.index.tolist(), list(range(100, 110)))
+        self.assertEqual(ultima['ID_REGISTRO'].astype(str).tolist(), ['n0'])
+        self.assertIsNone(siguiente)
+        self.assertEqual(ar.indice_paginas.construcciones, 1)
+        # Cada página salta a su posición: a lo sumo descarta menos de PASO filas
+        saltos = [llamada.kwargs['skiprows'] for llamada in leer.call_args_list if 'skiprows' in llamada.kwargs]
+        self.assertEqual(saltos, [100 % 7]) # La página empieza en la fila 100
+
+        # Compactar reescribe el archivo base: el índice se rearma con la nueva versión
+        ar.compactar_journal(self.cargar())
+        self._comparar(10)
+        self.assertEqual(ar.indice_paginas.construcciones, 2)
+
+    def test_promedios_sin_leer_la_tabla(self):
+        df = self.cargar()
+        publicar = df.index[df['periodo'].isin(['P1', 'P2'])]
+        ar.asignar_valores(df, publicar, 'estado_publicacion', True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(ar.guardar_datos(df)) # Publicadas en el archivo base
+        ar.asignar_valores(df, df.index[df['ID_REGISTRO'] == 'r001'], 'P_NOTA_FINAL', 12.0)
+        ar.asignar_valores(df, df.index[df['ID_REGISTRO'] == 'r002'], 'estado_publicacion', True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(ar.guardar_datos(df, ['r001', 'r002'])) # Y cambios en el journal
+        tabla = ar.consultar_registros(None)
+
+        # Una página nunca carga la tabla completa: el promedio se calcula con las claves de la página
+        with mock.patch.object(ar, 'cargar_datos', side_effect=AssertionError("la página cargó la tabla")):
+            partes, despues_de = [], None
+            while True:
+                pagina, despues_de = ar.consultar_pagina(None, despues_de, 25)
+                partes.append(pagina)
+                if despues_de is None:
+                    break
+        paginas = ar.pd.concat(partes)
+        self.assertEqual(list(paginas.columns), ar.COLUMNS)
+        self.assertEqual(ar._difieren(paginas['promedio_general'].reset_index(drop=True),
+                                      tabla['promedio_general'].reset_index(drop=True)).sum(), 0)
+        self.assertTrue(paginas['promedio_general'].notna().any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Guardado diferido (PersistenciaDiferida) desde los menús y journal de cambios."""
+import contextlib
+import io
+import os
+import unittest
+
+from tests.base import CasoConDatos, ar, registro
+
+
+class GuardadoSinCambios(CasoConDatos):
+    def setUp(self):
+        super().setUp()
+        # Todo el P1 del profesor 101 ya está publicado: el profesor no puede modificar nada
+        self.escribir_csv([registro('a1', '2001', '101', 'P1', publicado=True),
+                           registro('a2', '2002', '101', 'P1', publicado=True)])
+        self.df = self.cargar()
+
+    def test_programar_sin_filas_no_falla(self):
+        self.assertTrue(ar.persistencia.programar(self.df, []))
+        self.assertTrue(ar.persistencia.programar(self.df, ['no_existe']))
+        ar.persistencia.vaciar(self.df)
+        self.assertFalse(os.path.exists(ar.ruta_journal()))
+        self.assertEqual(self.df['version'].tolist(), [0, 0])
+
+    def test_gestionar_periodo_publicado_no_guarda(self):
+        df, salida = self.ejecutar(ar.gestionar_calificaciones, self.df, '101', 'P1', respuestas=['no'])
+        self.assertIn("YA PUBLICADA", salida)
+        ar.persistencia.vaciar(df)
+        self.assertFalse(os.path.exists(ar.ruta_journal()))
+
+
+
+class JournalCortado(CasoConDatos):
+    """Un lote cortado a mitad de escritura dentro de un campo con saltos de línea se descarta entero."""
+    METODO = 'Debate, "mesa redonda"\ny exposición'
+
+    def setUp(self):
+        super().setUp()
+        self.escribir_csv([registro('a1', '2001', '101', 'P1'), registro('a2', '2002', '101', 'P1')])
+
+    def _guardar(self, df, registro_id, columna, valor):
+        ar.asignar_valores(df, df.index[df['ID_REGISTRO'] == registro_id], columna, valor)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(ar.guardar_datos(df, [registro_id]))
+
+    def _otro_proceso(self):
+        """Carga como un proceso recién iniciado (sin el estado de sincronización de este)."""
+        ar._sincronizacion.update(firma_base=None, offset_journal=0, filas_journal=0)
+        return self.cargar().set_index('ID_REGISTRO')
+
+    def test_lote_cortado_en_campo_con_salto_de_linea(self):
+        df = self.cargar()
+        self._guardar(df, 'a1', 'P_NOTA_FINAL', 91.0)
+        self._guardar(df, 'a2', 'P_METODO_ENS', self.METODO)
+        with open(ar.ruta_journal(), 'rb') as f:
+            contenido = f.read()
+        # Corte justo después del salto de línea dentro de las comillas
+        corte = contenido.index('\ny exposición'.encode('utf-8')) + 1
+        with open(ar.ruta_journal(), 'wb') as f:
+            f.write(contenido[:corte])
+
+        cargado = self._otro_proceso()
+        self.assertEqual(sorted(cargado.index.astype(str)), ['a1', 'a2'])
+        self.assertEqual(cargado.loc['a1', 'P_NOTA_FINAL'], 91.0)
+        self.assertEqual(cargado.loc['a2', 'P_METODO_ENS'], 'Clase práctica')
+
+        # El siguiente guardado descarta el resto del lote cortado y el journal sigue legible
+        df = cargado.reset_index()
+        self._guardar(df, 'a2', 'P_METODO_ENS', self.METODO)
+        cargado = self._otro_proceso()
+        self.assertEqual(len(cargado), 2)
+        self.assertEqual(cargado.loc['a2', 'P_METODO_ENS'], self.METODO)
+        self.assertEqual(cargado.loc['a1', 'P_NOTA_FINAL'], 91.0)
+
+    def test_journal_del_formato_anterior(self):
+        pd = ar.pd
+        filas = pd.DataFrame([registro('a1', '2001', '101', 'P1', nota=77.0)], columns=ar.COLUMNS).assign(version=1)
+        filas.to_csv(ar.ruta_journal(), index=False, encoding='utf-8')
+        cargado = self._otro_proceso()
+        self.assertEqual(cargado.loc['a1', 'P_NOTA_FINAL'], 77.0)
+        # Se incorporó al archivo base para que los lotes nuevos no queden detrás de filas sin marca
+        self.assertFalse(os.path.exists(ar.ruta_journal()))
+
+
+if __name__ == '__main__':
+    unittest.main()
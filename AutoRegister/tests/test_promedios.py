@@ -0,0 +1,120 @@
+"""promedio_general incremental (AgregadoPromedios) y guardados de varias terminales."""
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import textwrap
+import unittest
+
+from tests.base import CasoConDatos, ar, registro
+
+CARPETA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Otra terminal: carga, cambia la nota de P4, espera una línea en stdin y guarda
+OTRA_TERMINAL = textwrap.dedent("""
+    import contextlib, io, sys
+    sys.path.insert(0, {carpeta!r})
+    with contextlib.redirect_stdout(io.StringIO()):
+        import AutoRegister as ar
+        df = ar.cargar_datos()
+        idx = df.index[df['ID_REGISTRO'] == 'p4'][0]
+        ar.asignar_valores(df, idx, 'P_NOTA_FINAL', 60.0)
+    print('listo', flush=True)
+    sys.stdin.readline()
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        if {diferido!r}:
+            ar.persistencia.programar(df, ['p4'])
+            ar.persistencia.vaciar(df)
+            guardado = 'CONFLICTO' not in salida.getvalue()
+        else:
+            guardado = ar.guardar_datos(df, ['p4'])
+    print(guardado, ar.verificar_promedios(df), flush=True)
+""")
+
+
+class PromediosIncrementales(CasoConDatos):
+    def test_ediciones_aleatorias_coinciden_con_recalculo(self):
+        from benchmarks import escuela
+        escuela.generar_escuela(400).to_csv(ar.ARCHIVO_CSV, index=False, encoding='utf-8', columns=ar.COLUMNS)
+        df = self.cargar()
+        azar = random.Random(7)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for paso in range(150):
+                idx = df.index[azar.randrange(len(df))]
+                accion = azar.random()
+                if accion < 0.3:
+                    df.loc[idx, 'estado_publicacion'] = not df.at[idx, 'estado_publicacion']
+                elif accion < 0.45:
+                    # La fila pasa a otra clave (estudiante_ID, profesor_ID) que aún no tiene ese periodo:
+                    # el promedio de la clave anterior también cambia
+                    columna = azar.choice(['estudiante_ID', 'profesor_ID'])
+                    clave = {'estudiante_ID': df.at[idx, 'estudiante_ID'], 'profesor_ID': df.at[idx, 'profesor_ID'],
+                             columna: str(azar.randrange(9000, 9004))}
+                    ocupada = ((df['estudiante_ID'] == clave['estudiante_ID']) & (df['profesor_ID'] == clave['profesor_ID'])
+                               & (df['periodo'] == df.at[idx, 'periodo'])).any()
+                    if not ocupada:
+                        ar.asignar_valores(df, idx, columna, clave[columna])
+                else:
+                    ar.asignar_valores(df, idx, 'P_NOTA_FINAL', azar.choice([round(azar.uniform(50, 100), 1), None]))
+                registro_id = df.at[idx, 'ID_REGISTRO']
+                if paso % 2:
+                    self.assertTrue(ar.guardar_datos(df, [registro_id]))
+                else:
+                    ar.persistencia.programar(df, [registro_id])
+                self.assertEqual(ar.verificar_promedios(df), 0, f"paso {paso}")
+            ar.persistencia.vaciar(df)
+        recargado = self.cargar()
+        self.assertEqual(ar.verificar_promedios(recargado), 0)
+        self.assertEqual(ar._difieren(recargado['promedio_general'], df['promedio_general']).sum(), 0)
+
+
+class DosTerminales(CasoConDatos):
+    """Una terminal guarda P1 mientras otra edita P4 del mismo estudiante y materia: no hay conflicto."""
+    def setUp(self):
+        super().setUp()
+        self.escribir_csv([registro(f'p{n}', '2001', '101', f'P{n}', nota=80.0 + n, publicado=True) for n in range(1, 5)])
+
+    def _editar_a_la_vez(self, diferido=False, entorno=None):
+        self.cargar() # Crea los archivos auxiliares antes de lanzar la otra terminal
+        otra = subprocess.Popen([sys.executable, '-c', OTRA_TERMINAL.format(carpeta=CARPETA_APP, diferido=diferido)],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                                env=dict(os.environ, **(entorno or {})))
+        self.assertEqual(otra.stdout.readline().strip(), 'listo')
+
+        df = self.cargar()
+        idx = df.index[df['ID_REGISTRO'] == 'p1'][0]
+        ar.asignar_valores(df, idx, 'P_NOTA_FINAL', 70.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(ar.guardar_datos(df, ['p1']))
+
+        salida, _ = otra.communicate('\n', timeout=60)
+        self.assertEqual(salida.split(), ['True', '0'])
+
+        final = self.cargar().set_index('ID_REGISTRO')
+        self.assertEqual(final.loc['p1', 'P_NOTA_FINAL'], 70.0)
+        self.assertEqual(final.loc['p4', 'P_NOTA_FINAL'], 60.0)
+        esperado = [round((70.0 + 82.0 + 83.0 + 60.0) / 4, 2)] * 4
+        self.assertEqual(final['promedio_general'].tolist(), esperado)
+        # Las consultas de solo lectura tampoco muestran el promedio guardado antes del cambio
+        consulta = ar.consultar_registros(None, columnas=['ID_REGISTRO', 'promedio_general'], estudiante_ID='2001')
+        self.assertEqual(consulta['promedio_general'].tolist(), esperado)
+        pagina, _ = ar.consultar_pagina(columnas=['promedio_general'])
+        self.assertEqual(pagina['promedio_general'].tolist(), esperado)
+
+    def test_csv(self):
+        self._editar_a_la_vez()
+
+    def test_csv_guardado_diferido(self):
+        self._editar_a_la_vez(diferido=True, entorno={'AUTOREGISTER_INTERVALO_ESCRITURA': '0.05'})
+
+    def test_sqlite(self):
+        ar.BACKEND_ALMACENAMIENTO = 'sqlite'
+        self.addCleanup(setattr, ar, 'BACKEND_ALMACENAMIENTO', 'csv')
+        self._editar_a_la_vez(entorno={'AUTOREGISTER_BACKEND': 'sqlite'})
+
+
+if __name__ == '__main__':
+    unittest.main()
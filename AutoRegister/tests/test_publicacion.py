@@ -0,0 +1,50 @@
+"""Publicación al importar una sección (importar_calificaciones_lote con publicar=True)."""
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tests.base import CasoConDatos, registro, ar
+
+
+class ImportarYPublicar(CasoConDatos):
+    """Solo se publica lo importado, y en la transacción de publicar_calificaciones_lote."""
+    def setUp(self):
+        super().setUp()
+        # Borrador de la misma sección que no viene en el archivo: no debe publicarse
+        self.escribir_csv([registro('x1', '2002', '101', 'P2')])
+        pd.DataFrame([{'estudiante_ID': '2001', 'P_METODO_ENS': 'Taller',
+                       **{campo: 90 for campo in ar.CALIFICACION_CAMPOS}}]).to_csv('seccion.csv', index=False)
+
+    def _importar(self):
+        df, salida = self.ejecutar(ar.importar_calificaciones_lote, self.cargar(), '101', 'seccion.csv', 'P2', publicar=True)
+        ar.persistencia.vaciar(df)
+        return df.set_index('ID_REGISTRO'), self.cargar().set_index('ID_REGISTRO'), salida
+
+    def _importado(self, tabla):
+        return tabla[tabla['estudiante_ID'] == '2001'].iloc[0]
+
+    def test_publica_solo_lo_importado(self):
+        df, disco, _ = self._importar()
+        for tabla in (df, disco):
+            self.assertTrue(self._importado(tabla)['estado_publicacion'])
+            self.assertEqual(self._importado(tabla)['version_escala'], ar.ESCALAS.vigente)
+            self.assertFalse(tabla.loc['x1', 'estado_publicacion'])
+
+    def test_publicacion_fallida_se_deshace(self):
+        guardar = ar.guardar_datos
+        def guardar_con_conflicto(df, registros_modificados=None, todo_o_nada=False):
+            return False if todo_o_nada else guardar(df, registros_modificados)
+        with mock.patch.object(ar, 'guardar_datos', side_effect=guardar_con_conflicto):
+            df, disco, salida = self._importar()
+
+        self.assertIn('PUBLICACIÓN CANCELADA', salida)
+        for tabla in (df, disco):
+            importado = self._importado(tabla)
+            self.assertFalse(importado['estado_publicacion'])
+            self.assertTrue(pd.isna(importado['fecha_publicacion']))
+            self.assertEqual(importado['P_NOTA_FINAL'], 90.0) # La importación sí quedó guardada
+
+
+if __name__ == '__main__':
+    unittest.main()
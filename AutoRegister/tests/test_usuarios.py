@@ -0,0 +1,44 @@
+"""Índice de usuarios de main.py: gestionar_permisos después de modificar USUARIOS_SIMULADOS."""
+import contextlib
+import copy
+import io
+import unittest
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import main as principal
+
+
+class RecargarUsuarios(unittest.TestCase):
+    """Mismo número de usuarios, distinto contenido: recargar_usuarios() debe reflejarlo."""
+    def setUp(self):
+        originales = copy.deepcopy(principal.USUARIOS_SIMULADOS)
+        self.addCleanup(principal.recargar_usuarios)
+        self.addCleanup(principal.USUARIOS_SIMULADOS.__setitem__, slice(None), originales)
+
+    def test_cambio_de_rol(self):
+        self.assertFalse(principal.gestionar_permisos(1001)['permisos']['publicar_nota'])
+        principal.USUARIOS_SIMULADOS[0]['usuario_rol'] = 'PROFESOR'
+        principal.recargar_usuarios()
+        acceso = principal.gestionar_permisos(1001)
+        self.assertTrue(acceso['permisos']['publicar_nota'])
+        self.assertEqual(acceso['datos']['usuario_rol'], 'PROFESOR')
+
+    def test_usuario_reemplazado(self):
+        principal.USUARIOS_SIMULADOS[1] = {'USUARIO_ID': 2006, 'usuario_nombre': 'Luisa', 'usuario_apellido': 'Rosario',
+                                           'usuario_rol': 'ADMINISTRACION'}
+        principal.recargar_usuarios()
+        self.assertFalse(principal.gestionar_permisos(2005)['autenticado'])
+        acceso = principal.gestionar_permisos(2006)
+        self.assertTrue(acceso['autenticado'])
+        self.assertTrue(acceso['permisos']['admin_usuarios'])
+
+    def test_rol_inexistente(self):
+        principal.USUARIOS_SIMULADOS[2]['usuario_rol'] = 'CONSERJE'
+        principal.recargar_usuarios()
+        acceso = principal.gestionar_permisos(3001)
+        self.assertFalse(acceso['autenticado'])
+        self.assertIn('CONSERJE', acceso['mensaje'])
+
+
+if __name__ == '__main__':
+    unittest.main()